@@ -0,0 +1,187 @@
+# accounts/async_views.py
+"""
+Native async versions of the read-only list / detail endpoints.
+
+Under ASGI a sync @api_view occupies a thread from the sync_to_async pool
+for its whole lifetime; these views are coroutines, so a slow client or a
+slow query only parks a task on the event loop.  Same filters, same
+response bodies as the sync views in accounts/views.py — served under
+/api/async/... so both can be compared side by side (bench_async).
+
+DRF's APIView is sync-only, so authentication (CachedJWTAuthentication),
+IsAuthenticated and the {"detail": ...} error bodies are handled by
+the `async_api` decorator below.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import Permission
+from django.http import Http404, JsonResponse
+from django.shortcuts import aget_object_or_404
+from rest_framework import status
+from rest_framework.exceptions import APIException, MethodNotAllowed, NotAuthenticated, NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from ecommerce_Api.routers import use_replica
+
+from .authentication import CachedJWTAuthentication
+from .models import User
+from .pagination import KeysetPagination, wants_cursor
+from .perms import aprime_permissions
+from .serializers import GroupSerializer, PermissionSerializer, UserListSerializer
+from .views import filter_groups, filter_users, group_queryset
+
+
+def _json(data, status_code=status.HTTP_200_OK, headers=None):
+    return JsonResponse(
+        data, status=status_code, headers=headers, safe=False,
+        encoder=JSONEncoder, json_dumps_params={"ensure_ascii": False},
+    )
+
+
+def async_api(view):
+    """
+    @api_view(["GET"]) + IsAuthenticated for `async def` views.
+    The view gets a DRF Request (query_params, request.user, ...).
+    """
+    authenticator = CachedJWTAuthentication()
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            if request.method not in ("GET", "HEAD"):
+                raise MethodNotAllowed(request.method)
+
+            result = await authenticator.aauthenticate(request)
+            if result is None:
+                raise NotAuthenticated()
+            drf_request = Request(request)
+            drf_request.user, drf_request.auth = result
+
+            return await view(drf_request, *args, **kwargs)
+        except Http404 as exc:
+            exc = NotFound(*exc.args)
+            return _json({"detail": exc.detail}, exc.status_code)
+        except APIException as exc:
+            headers = {}
+            if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+                headers["WWW-Authenticate"] = authenticator.authenticate_header(request)
+            detail = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+            return _json(detail, exc.status_code, headers)
+
+    return wrapper
+
+
+# ---------- page-number pagination (same links / errors as PageNumberPagination) ----------
+async def _apaginate(queryset, request, page_size, page_size_query_param=None):
+    paginator = PageNumberPagination()
+    paginator.page_size = page_size
+    paginator.page_size_query_param = page_size_query_param
+    size = paginator.get_page_size(request)
+
+    raw = request.query_params.get(paginator.page_query_param) or 1
+    try:
+        number = int(raw)
+        if number < 1:
+            raise ValueError
+    except (TypeError, ValueError):
+        raise NotFound("Invalid page.")
+
+    count = await queryset.acount()
+    pages = max(1, -(-count // size))
+    if number > pages:
+        raise NotFound("Invalid page.")
+
+    offset = (number - 1) * size
+    rows   = [obj async for obj in queryset[offset: offset + size]]
+
+    url = request.build_absolute_uri()
+    next_link = previous_link = None
+    if number < pages:
+        next_link = replace_query_param(url, paginator.page_query_param, number + 1)
+    if number > 1:
+        previous_link = (
+            remove_query_param(url, paginator.page_query_param) if number == 2
+            else replace_query_param(url, paginator.page_query_param, number - 1)
+        )
+
+    def wrap(data):
+        return {"count": count, "next": next_link, "previous": previous_link, "results": data}
+    return rows, wrap
+
+
+async def _apage(queryset, request, ordering, page_size_query_param=None):
+    """→ (rows, wrap) where wrap(data) builds the paginated body"""
+    if wants_cursor(request):
+        paginator = KeysetPagination(
+            ordering=ordering, page_size_query_param=page_size_query_param,
+        )
+        rows = await paginator.apaginate_queryset(queryset, request)
+        return rows, paginator.get_paginated_data
+    return await _apaginate(queryset, request, 2, page_size_query_param)
+
+
+# ---------- users ----------
+@async_api
+@use_replica
+async def user_list(request):
+    # ?search= probes the FTS index (a query) to pick the plan — that runs in a thread
+    queryset = await sync_to_async(filter_users)(User.objects.all(), request.query_params)
+    page, wrap = await _apage(queryset, request, ("-date_joined", "-id"))
+    await aprime_permissions(page)
+
+    serializer = UserListSerializer(page, many=True)
+    return _json(wrap({
+        "message": "User list fetched successfully.",
+        "users": serializer.data
+    }))
+
+
+@async_api
+@use_replica
+async def user_detail(request, pk):
+    user = await aget_object_or_404(User, pk=pk)
+    await aprime_permissions([user])
+    serializer = UserListSerializer(user)
+    return _json({
+        "message": "User detail retrieved successfully.",
+        "detail": f"Details for user id {pk}",
+        "data": serializer.data
+    })
+
+
+# ---------- groups ----------
+@async_api
+@use_replica
+async def group_list(request):
+    queryset = filter_groups(group_queryset(), request.query_params)
+    page, wrap = await _apage(queryset, request, ("id",), page_size_query_param="page_size")
+
+    serializer = GroupSerializer(page, many=True)
+    return _json(wrap({
+        "message": "Group list fetched successfully.",
+        "groups": serializer.data
+    }))
+
+
+@async_api
+@use_replica
+async def group_detail(request, pk):
+    group = await aget_object_or_404(group_queryset(), pk=pk)
+    serializer = GroupSerializer(group)
+    return _json({
+        "message": "Group detail fetched successfully.",
+        "detail": serializer.data
+    })
+
+
+# ---------- permissions ----------
+@async_api
+@use_replica
+async def permission_list_view(request):
+    permissions_qs = [perm async for perm in Permission.objects.all()]
+    serializer = PermissionSerializer(permissions_qs, many=True)
+    return _json(serializer.data)
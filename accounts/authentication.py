@@ -0,0 +1,66 @@
+# accounts/authentication.py
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .user_cache import get_user_cache
+
+
+def _check_token_user(user):
+    if user is None:
+        raise AuthenticationFailed(_("User not found"), code="user_not_found")
+    if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+        raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+    return user
+
+
+def resolve_token_user(user_id):
+    """Same checks as JWTAuthentication.get_user, but served from the user cache."""
+    return _check_token_user(get_user_cache().get(user_id))
+
+
+async def aresolve_token_user(user_id):
+    return _check_token_user(await get_user_cache().aget(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the token's user from
+    accounts.user_cache instead of SELECTing the row on every request.
+    """
+
+    def _user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+    def _check_revoked(self, validated_token, user):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+        return user
+
+    def get_user(self, validated_token):
+        user = resolve_token_user(self._user_id(validated_token))
+        return self._check_revoked(validated_token, user)
+
+    async def aauthenticate(self, request):
+        """authenticate() for plain Django async views → (user, token) or None"""
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        user = await aresolve_token_user(self._user_id(validated_token))
+        return self._check_revoked(validated_token, user), validated_token
@@ -1,21 +1,82 @@
 # accounts/backends.py
+import logging
+
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+
+from . import hashing
+from .perms import prime_permissions
+from .validators import normalize_phone
 
 UserModel = get_user_model()
 
+logger = logging.getLogger(__name__)
+
+# normalized lookup column → the raw (unique) column it is derived from
+RAW_FIELDS = {"username_lower": "username", "email_lower": "email", "phone_e164": "phone"}
+
+
+def classify_identifier(identifier):
+    """
+    Decide up front which normalized column a login identifier targets.
+    Returns (field, value) for a single indexed equality lookup.
+    """
+    identifier = identifier.strip()
+    if "@" in identifier:
+        return "email_lower", identifier.lower()
+    phone = normalize_phone(identifier)
+    if phone:
+        return "phone_e164", phone
+    return "username_lower", identifier.lower()
+
+
 class UsernameEmailPhoneBackend(ModelBackend):
     def authenticate(self, request, username=None, password=None, **kwargs):
-        try:
-            user = UserModel.objects.get(
-                Q(username__iexact=username) |
-                Q(email__iexact=username)    |
-                Q(phone__iexact=username)
-            )
-        except UserModel.DoesNotExist:
+        if username is None or password is None:
+            return None
+
+        field, value = classify_identifier(username)
+        user = self._lookup(field, value, username.strip())
+        if user is None and field != "username_lower":
+            # usernames may contain "@" or look like numbers
+            user = self._lookup("username_lower", username.strip().lower(), username.strip())
+        if user is None:
+            # hash anyway so unknown logins take as long as wrong passwords
+            # (ModelBackend's timing equaliser) — on the pool like every hash
+            hashing.make_password(password)
             return None
 
-        if user.check_password(password) and self.user_can_authenticate(user):
+        # PBKDF2 runs on the bounded hashing pool (503 when it is full)
+        if hashing.check_password(user, password) and self.user_can_authenticate(user):
             return user
         return None
+
+    def _lookup(self, field, value, identifier):
+        """
+        The user whose normalized `field` is `value`.  Those columns aren't
+        unique ("MgMg" and "mgmg" can both exist): when several match, only
+        an exact match on the raw column picks one.
+        """
+        users = list(UserModel.objects.filter(**{field: value})[:2])
+        if len(users) < 2:
+            return users[0] if users else None
+
+        raw = RAW_FIELDS[field]
+        if raw == "email":
+            identifier = UserModel.objects.normalize_email(identifier)
+        user = UserModel.objects.filter(**{raw: identifier}).first()
+        if user is None:
+            logger.warning("login %r matches several users on %s and none exactly", identifier, field)
+        return user
+
+    def _get_permissions(self, user_obj, obj, from_name):
+        """
+        ModelBackend._get_permissions, but a cold user is filled from the
+        shared permission cache (accounts/perms.py) instead of the M2M tables.
+        """
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        perm_cache_name = "_%s_perm_cache" % from_name
+        if not hasattr(user_obj, perm_cache_name):
+            prime_permissions([user_obj], with_groups=False)
+        return getattr(user_obj, perm_cache_name)
@@ -0,0 +1,288 @@
+# accounts/benchmarks.py
+"""
+Endpoint benchmarks (bench_endpoints) and the per-endpoint query budgets
+the test suite holds the same endpoints to.
+
+    ENDPOINTS       name → how to call it + max queries per request
+    seed()          synthetic users / groups / permissions at one scale
+    run_in_process  django.test.Client, queries counted on every alias
+    run_server      threaded local WSGI server driven by N client threads
+
+Budgets don't depend on the scale: a query count that grows with the
+number of users is exactly the regression they exist to catch.
+"""
+import copy
+import itertools
+import json
+import random
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from contextlib import ExitStack
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import User
+
+BENCH_PASSWORD = "bench-pass-123"
+
+# the configured OPTIONS per alias (copied: a connection's settings_dict *is* the settings entry)
+CONFIGURED_OPTIONS = {
+    alias: copy.deepcopy(conf.get("OPTIONS", {})) for alias, conf in settings.DATABASES.items()
+}
+
+
+def use_scratch_database(path, options=None):
+    """
+    Point this process's connections (default + replica) at the SQLite file
+    `path`.  options: {alias: OPTIONS} — default: the configured ones.
+    """
+    options = CONFIGURED_OPTIONS if options is None else options
+    for alias in connections:
+        conn = connections[alias]
+        conn.close()
+        conn.settings_dict["NAME"] = str(path)
+        conn.settings_dict["OPTIONS"] = dict(options.get(alias, {}))
+
+
+# ---------- endpoints ----------
+_serial = itertools.count(1)            # unique register payloads across threads
+
+
+def _login(state):
+    user = random.choice(state["usernames"])
+    return "POST", reverse("token_obtain_pair"), {"login": user, "password": BENCH_PASSWORD}
+
+
+def _register(state):
+    n = next(_serial)
+    username = f"bench{state['scale']}r{n}"
+    return "POST", reverse("register"), {
+        "username":         username,
+        "email":            f"{username}@example.com",
+        "phone":            f"+9596{n:08d}",
+        "password":         BENCH_PASSWORD,
+        "confirm_password": BENCH_PASSWORD,
+    }
+
+
+def _user_list(state):
+    return "GET", reverse("user-list"), {"page": random.randint(1, 3)}
+
+
+def _group_list(state):
+    return "GET", reverse("group-list"), {}
+
+
+def _token_refresh(state):
+    # refresh tokens rotate: every request spends the one the previous returned
+    return "POST", reverse("token_refresh"), {"refresh": state["refresh"]}
+
+
+def _keep_refresh(state, data):
+    state["refresh"] = data.get("refresh", state["refresh"])
+
+
+ENDPOINTS = {
+    #                  request builder    max queries (cold caches), ok status, hashes a password
+    "login":         {"request": _login,         "queries": 2, "status": 200, "slow": True},
+    "register":      {"request": _register,      "queries": 5, "status": 201, "slow": True},
+    "user_list":     {"request": _user_list,     "queries": 6, "status": 200, "slow": False},
+    "group_list":    {"request": _group_list,    "queries": 4, "status": 200, "slow": False},
+    "token_refresh": {"request": _token_refresh, "queries": 4, "status": 200, "slow": False,
+                      "after": _keep_refresh},
+}
+
+
+# ---------- data ----------
+def seed(scale, prefix="bench"):
+    """
+    `scale` users (+ one admin), scale // 100 groups (at least 5) with a few
+    permissions each; every user in one or two groups with one direct
+    permission.  Returns the admin.
+    """
+    rng      = random.Random(scale)
+    password = make_password(BENCH_PASSWORD)     # hashed once, shared by every user
+    perms    = list(Permission.objects.order_by("id"))
+    groups   = Group.objects.bulk_create(
+        [Group(name=f"{prefix}-group-{n}") for n in range(max(5, scale // 100))]
+    )
+    Group.permissions.through.objects.bulk_create(
+        [
+            Group.permissions.through(group_id=group.pk, permission_id=perm.pk)
+            for group in groups for perm in rng.sample(perms, 4)
+        ],
+        batch_size=1000,
+    )
+
+    admin = User.objects.create_user(
+        username=f"{prefix}-admin", email=f"{prefix}-admin@example.com",
+        phone="+959499999999", password=BENCH_PASSWORD, is_staff=True, is_superuser=True,
+    )
+    users = [
+        User(username=f"{prefix}{n}", email=f"{prefix}{n}@example.com",
+             phone=f"+9595{n:08d}", password=password)
+        for n in range(scale)
+    ]
+    for user in users:
+        user.refresh_lookup_fields()            # bulk_create skips save(); logins look these up
+    users = User.objects.bulk_create(users, batch_size=1000)
+    User.groups.through.objects.bulk_create(
+        [
+            User.groups.through(user_id=user.pk, group_id=group.pk)
+            for user in users for group in rng.sample(groups, rng.randint(1, 2))
+        ],
+        batch_size=1000,
+    )
+    User.user_permissions.through.objects.bulk_create(
+        [User.user_permissions.through(user_id=user.pk, permission_id=rng.choice(perms).pk)
+         for user in users],
+        batch_size=1000,
+    )
+    return admin
+
+
+def client_state(scale, admin, sample=200):
+    """Per-client state: usernames to log in as, a bearer token, a refresh token."""
+    refresh = RefreshToken.for_user(admin)
+    return {
+        "scale":     scale,
+        "usernames": list(User.objects.filter(is_staff=False).values_list("username", flat=True)[:sample]),
+        "access":    str(refresh.access_token),
+        "refresh":   str(refresh),
+    }
+
+
+# ---------- measuring ----------
+def summarize(latencies, errors, wall, max_queries=None):
+    latencies = sorted(latencies)
+    if len(latencies) >= 2:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else 0.0
+    return {
+        "requests":    len(latencies) + errors,
+        "errors":      errors,
+        "rps":         round((len(latencies) + errors) / wall, 1) if wall else 0.0,
+        "p50_ms":      round(p50 * 1000, 2),
+        "p95_ms":      round(p95 * 1000, 2),
+        "p99_ms":      round(p99 * 1000, 2),
+        "max_queries": max_queries,
+    }
+
+
+def _counter(executed):
+    """execute_wrapper that records statements (doesn't open a connection, unlike CaptureQueriesContext)"""
+    def wrapper(execute, sql, params, many, context):
+        executed.append(sql)
+        return execute(sql, params, many, context)
+    return wrapper
+
+
+def run_in_process(name, state, requests):
+    """
+    Drive one endpoint through django.test.Client; count queries on every
+    alias.  Starts from an empty cache, so max_queries is the cold request.
+    """
+    cache.clear()
+    spec   = ENDPOINTS[name]
+    client = Client(HTTP_AUTHORIZATION=f"Bearer {state['access']}")
+    latencies, errors, max_queries = [], 0, 0
+    started = time.perf_counter()
+    for _ in range(requests):
+        method, path, data = spec["request"](state)
+        executed = []
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(_counter(executed)))
+            t0 = time.perf_counter()
+            if method == "GET":
+                response = client.get(path, data)
+            else:
+                response = client.post(path, data, content_type="application/json")
+            elapsed = time.perf_counter() - t0
+        max_queries = max(max_queries, len(executed))
+        if response.status_code != spec["status"]:
+            errors += 1
+            continue
+        latencies.append(elapsed)
+        if "after" in spec:
+            spec["after"](state, response.json())
+    return summarize(latencies, errors, time.perf_counter() - started, max_queries)
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def start_server():
+    """Threaded WSGI server on a free local port → (server, base_url)."""
+    server = ThreadedWSGIServer(("127.0.0.1", 0), _QuietHandler, allow_reuse_address=True)
+    server.daemon_threads = True
+    server.set_app(get_wsgi_application())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
+
+
+def _http(base_url, method, path, data, token):
+    headers = {"Authorization": f"Bearer {token}"}
+    body = None
+    if method == "GET":
+        path = f"{path}?{urlencode(data)}" if data else path
+    else:
+        body = json.dumps(data).encode()
+        headers["Content-Type"] = "application/json"
+    request = urllib.request.Request(base_url + path, data=body, headers=headers, method=method)
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.read()
+
+
+def run_server(name, states, base_url, requests):
+    """`len(states)` client threads share `requests` calls to one endpoint on the local server."""
+    spec    = ENDPOINTS[name]
+    tickets = iter(range(requests))
+    lock    = threading.Lock()
+    latencies, errors = [], [0]
+
+    def client(state):
+        while True:
+            with lock:
+                if next(tickets, None) is None:
+                    return
+            method, path, data = spec["request"](state)
+            t0 = time.perf_counter()
+            code, body = _http(base_url, method, path, data, state["access"])
+            elapsed = time.perf_counter() - t0
+            with lock:
+                if code != spec["status"]:
+                    errors[0] += 1
+                    continue
+                latencies.append(elapsed)
+            if "after" in spec:
+                spec["after"](state, json.loads(body))
+
+    threads = [threading.Thread(target=client, args=(state,)) for state in states]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, errors[0], time.perf_counter() - started)
@@ -0,0 +1,185 @@
+# accounts/hashing.py
+"""
+Bounded off-thread password hashing.
+
+PBKDF2 is pure CPU for tens of milliseconds.  `hashlib.pbkdf2_hmac` releases
+the GIL while it runs, so a small thread pool lets hashes run in parallel
+without starving the interpreter, and the bounded queue means a login spike
+gets fast 503s instead of tying up every worker.
+
+    settings.PASSWORD_HASHING = {
+        "WORKERS":   4,     # threads doing hashes (default: CPU count)
+        "MAX_QUEUE": 32,    # hashes allowed to wait on top of WORKERS
+        "TIMEOUT":   10,    # seconds a caller waits for its result
+    }
+"""
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from ecommerce_Api.middleware import timer as request_timer
+
+
+class HashingPoolFull(APIException):
+    status_code    = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Server is busy, please try again shortly."
+    default_code   = "hashing_pool_full"
+
+
+class HashingTimeout(HashingPoolFull):
+    """waited TIMEOUT seconds for a hash — overloaded all the same, so also a 503"""
+    default_code = "hashing_timeout"
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    idx = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return round(values[idx] * 1000, 3)          # → ms
+
+
+class HashingPool:
+    def __init__(self, workers=None, max_queue=32, timeout=10, sample_size=1000):
+        self.workers   = workers or os.cpu_count() or 2
+        self.max_queue = max_queue
+        self.timeout   = timeout
+
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pwhash")
+        self._slots    = threading.BoundedSemaphore(self.workers + self.max_queue)
+        self._lock     = threading.Lock()
+
+        self._pending   = 0                      # submitted, not finished
+        self._running   = 0
+        self._completed = 0
+        self._rejected  = 0
+        self._timed_out = 0
+        self._hash_times = deque(maxlen=sample_size)
+        self._wait_times = deque(maxlen=sample_size)
+
+    def _timed(self, fn, args, queued_at):
+        started = time.perf_counter()
+        with self._lock:
+            self._running += 1
+        try:
+            return fn(*args)
+        finally:
+            done = time.perf_counter()
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._wait_times.append(started - queued_at)
+                self._hash_times.append(done - started)
+
+    def _release(self, future=None):
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def run(self, fn, *args):
+        """Run `fn(*args)` on the pool and wait for it; 503 straight away if full or after TIMEOUT."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HashingPoolFull()
+        with self._lock:
+            self._pending += 1
+        try:
+            future = self._executor.submit(self._timed, fn, args, time.perf_counter())
+        except BaseException:
+            self._release()
+            raise
+        # the slot is given back when the hash is done (or cancelled), not when
+        # we stop waiting: a timed-out hash still occupies a worker
+        future.add_done_callback(self._release)
+        try:
+            with request_timer("hash"):
+                return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()                     # still queued → never runs
+            with self._lock:
+                self._timed_out += 1
+            raise HashingTimeout()
+
+    def stats(self):
+        with self._lock:
+            hash_times = list(self._hash_times)
+            wait_times = list(self._wait_times)
+            return {
+                "workers":     self.workers,
+                "max_queue":   self.max_queue,
+                "running":     self._running,
+                "queue_depth": self._pending - self._running,
+                "completed":   self._completed,
+                "rejected":    self._rejected,
+                "timed_out":   self._timed_out,
+                "hash_ms": {
+                    "p50": _percentile(hash_times, 50),
+                    "p95": _percentile(hash_times, 95),
+                    "p99": _percentile(hash_times, 99),
+                },
+                "wait_ms": {
+                    "p50": _percentile(wait_times, 50),
+                    "p95": _percentile(wait_times, 95),
+                    "p99": _percentile(wait_times, 99),
+                },
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                conf = getattr(settings, "PASSWORD_HASHING", {})
+                _pool = HashingPool(
+                    workers=conf.get("WORKERS"),
+                    max_queue=conf.get("MAX_QUEUE", 32),
+                    timeout=conf.get("TIMEOUT", 10),
+                )
+    return _pool
+
+
+def make_password(raw_password):
+    """hashers.make_password, off-thread"""
+    if raw_password is None:
+        return hashers.make_password(None)       # unusable password, no hashing
+    return get_pool().run(hashers.make_password, raw_password)
+
+
+def check_password(user, raw_password):
+    """
+    Same contract as `user.check_password()` (including the hasher upgrade),
+    but the hash comparison runs on the pool.
+    """
+    if raw_password is None or not user.password:
+        return False
+    is_correct, must_update = get_pool().run(
+        hashers.verify_password, raw_password, user.password
+    )
+    if is_correct and must_update:
+        user.password = make_password(raw_password)
+        user.save(update_fields=["password"])
+    return is_correct
+
+
+# ---------- process-pool helpers (bulk imports, accounts/importers.py) ----------
+# Kept free of model imports so spawned workers can unpickle them without
+# setting up the app registry.
+def init_hash_worker(settings_module):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+
+
+def make_password_in_worker(raw_password):
+    return hashers.make_password(raw_password or None)
@@ -1,6 +1,11 @@
 # accounts/helpers.py
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from django.utils import timezone
 from django.utils.timezone import localtime
 from django.utils.dateformat import format as dj_format
+from django.utils.translation import get_language, gettext
 
 def mmt(dt):
     """
@@ -11,3 +16,66 @@ def mmt(dt):
     # Y = 4-digit year │ m = 2-digit month │ d = 2-digit day
     # h = 12-hour (01-12) │ i = minutes │ s = seconds │ A = AM/PM
     return dj_format(localtime(dt), "Y-m-d h:i:s A")
+
+
+# ---------- precompiled mmt ----------
+# Asia/Yangon has been a fixed UTC+06:30 (no DST) since 1945-05-03, so
+# for the active "Asia/Yangon" zone we can skip localtime() + dateformat's
+# per-call format parsing and build the string directly.  Anything the
+# shortcut can't guarantee to be identical for (other zones, naive or
+# older datetimes) goes through `mmt`.
+MMT_ZONE     = "Asia/Yangon"
+MMT_OFFSET   = timedelta(hours=6, minutes=30)
+MMT_FIXED_AT = datetime(1945, 5, 3)         # naive UTC
+
+
+def mmt_day_start(day):
+    """Aware datetime for 00:00 Myanmar time on `day` (a date)"""
+    return datetime.combine(day, time.min, tzinfo=ZoneInfo(MMT_ZONE))
+
+
+_meridiem_cache = {}                        # language → ("AM", "PM") as dateformat renders them
+
+
+def _mmt_fast_ok():
+    return getattr(timezone.get_current_timezone(), "key", None) == MMT_ZONE
+
+
+def _meridiem():
+    lang = get_language()
+    pair = _meridiem_cache.get(lang)
+    if pair is None:
+        pair = _meridiem_cache[lang] = (gettext("AM"), gettext("PM"))
+    return pair
+
+
+def _format(dt, am, pm):
+    offset = dt.utcoffset()
+    if offset is None:
+        return mmt(dt)                      # naive → let localtime() raise as before
+    utc = dt.replace(tzinfo=None) - offset
+    if utc < MMT_FIXED_AT:
+        return mmt(dt)
+    t = utc + MMT_OFFSET
+    hour = t.hour
+    return "%04d-%02d-%02d %02d:%02d:%02d %s" % (
+        t.year, t.month, t.day, hour % 12 or 12, t.minute, t.second,
+        pm if hour > 11 else am,
+    )
+
+
+def mmt_fast(dt):
+    """Byte-identical to `mmt(dt)`, without dateformat's per-call overhead."""
+    if dt is None:
+        return None
+    if not _mmt_fast_ok():
+        return mmt(dt)
+    return _format(dt, *_meridiem())
+
+
+def mmt_many(dts):
+    """`mmt` for a whole column at once (zone / AM-PM lookups done once)."""
+    if not _mmt_fast_ok():
+        return [mmt(dt) for dt in dts]
+    am, pm = _meridiem()
+    return [None if dt is None else _format(dt, am, pm) for dt in dts]
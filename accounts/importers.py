@@ -0,0 +1,261 @@
+# accounts/importers.py
+"""
+Streaming bulk user import (CSV or JSON Lines).
+
+Rows are read lazily and handled in fixed-size batches: validate the batch
+(phone numbers in one call, uniqueness in one query), hash its passwords
+across a process pool, then bulk_create it.  Only the current batch and a
+capped error list are held in memory, whatever the file size.
+
+Uploads share one process pool per worker (get_import_pool), started on
+first use; a small file never touches it — its passwords hash in the
+request's own process until POOL_MIN_ROWS rows have been read.
+
+    settings.USER_IMPORT = {
+        "PROCESSES":     None,      # shared pool size, None → os.cpu_count()
+        "POOL_MIN_ROWS": 500,
+    }
+
+Expected columns / keys: username, email, phone, password (password may be
+empty → unusable password, user must reset it).
+"""
+import csv
+import io
+import json
+import multiprocessing
+import os
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from .hashing import init_hash_worker, make_password_in_worker
+from .models import User
+from .validators import check_phone_numbers
+
+IMPORT_FIELDS = ("username", "email", "phone", "password")
+FORMATS = ("csv", "jsonl")
+
+# unique fields → the key duplicates are compared on (phone: its E.164 form,
+# "+95 9 ..." and "+959..." are the same number)
+UNIQUE_FIELDS = {"username": "username", "email": "email", "phone": "phone_e164"}
+
+
+# ---------- reading ----------
+def guess_format(filename, default="csv"):
+    name = (filename or "").lower()
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if name.endswith(".csv"):
+        return "csv"
+    return default
+
+
+def read_rows(stream, fmt):
+    """Yield (row_number, dict) from a text stream, one row at a time."""
+    if fmt == "csv":
+        for number, row in enumerate(csv.DictReader(stream), start=2):   # 1 = header
+            yield number, row
+    elif fmt == "jsonl":
+        for number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                row = None
+            yield number, row if isinstance(row, dict) else {"__invalid__": line}
+    else:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+
+
+def text_stream(binary):
+    """Wrap an uploaded / opened binary file for read_rows()."""
+    return io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+
+
+# ---------- shared hashing pool ----------
+def _new_pool(processes):
+    # imported here, not at module level: concurrent.futures.process pulls in multiprocessing's
+    # connection / queues machinery, which only a multi-process import needs
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_hash_worker,
+        initargs=(os.environ.get("DJANGO_SETTINGS_MODULE", "ecommerce_Api.settings"),),
+    )
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_import_pool():
+    """This worker's one hashing pool for uploads → (executor, processes)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                processes = getattr(settings, "USER_IMPORT", {}).get("PROCESSES") or os.cpu_count() or 2
+                _pool = (_new_pool(processes), processes)
+    return _pool
+
+
+class UserImporter:
+    def __init__(self, batch_size=500, processes=None, max_errors=1000, pool_min_rows=0):
+        """
+        processes=None → the shared pool (get_import_pool), N → a pool of N
+                         for this run only, 0 → hash in this process (tests)
+        pool_min_rows  → hash in this process until this many rows were read
+        max_errors     → per-row errors kept in the report; the rest are only counted
+        """
+        self.batch_size    = batch_size
+        self.processes     = processes
+        self.pool_min_rows = pool_min_rows
+        self.max_errors    = max_errors
+        self.report = {"processed": 0, "created": 0, "failed": 0, "errors": []}
+        self._pool = None                      # (executor, processes) once needed
+
+    # ---------- validation ----------
+    def _clean(self, batch):
+        """→ list of (row_number, cleaned dict) that passed; errors go to the report"""
+        phones = check_phone_numbers([str(r.get("phone") or "").strip() for _, r in batch])
+
+        candidates = []
+        seen = {field: set() for field in UNIQUE_FIELDS}
+        for (number, row), (e164, phone_error) in zip(batch, phones):
+            if "__invalid__" in row:
+                self._fail(number, {"row": ["Invalid JSON object."]})
+                continue
+
+            data   = {f: str(row.get(f) or "").strip() for f in IMPORT_FIELDS}
+            errors = {}
+            for field in UNIQUE_FIELDS:
+                max_length = User._meta.get_field(field).max_length
+                if not data[field]:
+                    errors[field] = ["This field is required."]
+                elif len(data[field]) > max_length:
+                    errors[field] = [f"Ensure this field has no more than {max_length} characters."]
+            if data["email"] and "email" not in errors:
+                data["email"] = User.objects.normalize_email(data["email"])
+                try:
+                    validate_email(data["email"])
+                except ValidationError as exc:
+                    errors["email"] = list(exc.messages)
+            if data["phone"] and phone_error and "phone" not in errors:
+                errors["phone"] = [phone_error]
+
+            keys = {"username": data["username"], "email": data["email"], "phone": e164}
+            for field in seen:                          # duplicates inside this batch
+                if keys[field] and keys[field] in seen[field]:
+                    errors.setdefault(field, []).append("Duplicate value in import file.")
+            if errors:
+                self._fail(number, errors)
+                continue
+            for field in seen:
+                seen[field].add(keys[field])
+            candidates.append((number, data, keys))
+
+        if not candidates:
+            return []
+
+        # one query for clashes with existing users (incl. earlier batches)
+        columns = list(UNIQUE_FIELDS.values())
+        taken   = {field: set() for field in UNIQUE_FIELDS}
+        rows = User.objects.filter(
+            Q(username__in=seen["username"]) | Q(email__in=seen["email"]) | Q(phone_e164__in=seen["phone"])
+        ).values_list(*columns)
+        for row in rows:
+            for field, value in zip(UNIQUE_FIELDS, row):
+                taken[field].add(value)
+
+        valid = []
+        for number, data, keys in candidates:
+            errors = {
+                field: [f"User with this {field} already exists."]
+                for field in taken if keys[field] in taken[field]
+            }
+            if errors:
+                self._fail(number, errors)
+            else:
+                valid.append((number, data))
+        return valid
+
+    def _fail(self, number, errors):
+        self.report["failed"] += 1
+        if len(self.report["errors"]) < self.max_errors:
+            self.report["errors"].append({"row": number, "errors": errors})
+
+    # ---------- write ----------
+    def _get_pool(self):
+        if self.processes == 0 or self.report["processed"] < self.pool_min_rows:
+            return None
+        if self._pool is None:
+            self._pool = get_import_pool() if self.processes is None else (
+                _new_pool(self.processes), self.processes,
+            )
+        return self._pool
+
+    def _hash_all(self, passwords):
+        pool = self._get_pool()
+        if pool is None:
+            return [make_password_in_worker(p) for p in passwords]
+        executor, processes = pool
+        chunk = max(1, len(passwords) // (processes * 4))
+        return list(executor.map(make_password_in_worker, passwords, chunksize=chunk))
+
+    def _import_batch(self, batch):
+        self.report["processed"] += len(batch)
+        valid = self._clean(batch)
+        if not valid:
+            return
+
+        hashes = self._hash_all([data["password"] for _, data in valid])
+        users = []
+        for (_, data), password in zip(valid, hashes):
+            user = User(
+                username=data["username"], email=data["email"], phone=data["phone"],
+                password=password,
+            )
+            user.refresh_lookup_fields()        # bulk_create skips save()
+            users.append(user)
+
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users, batch_size=self.batch_size)
+        except IntegrityError:
+            # someone registered one of these between our check and the insert,
+            # and the whole batch rolled back: retry it row by row
+            for (number, _), user in zip(valid, users):
+                try:
+                    with transaction.atomic():
+                        User.objects.bulk_create([user])
+                except IntegrityError:
+                    self._fail(number, {"row": ["Conflicts with a user created during the import."]})
+                else:
+                    self.report["created"] += 1
+            return
+        self.report["created"] += len(users)
+
+    def run(self, rows):
+        """Consume (row_number, dict) pairs; returns the report."""
+        try:
+            batch = []
+            for number, row in rows:
+                batch.append((number, row))
+                if len(batch) >= self.batch_size:
+                    self._import_batch(batch)
+                    batch = []
+            if batch:
+                self._import_batch(batch)
+        finally:
+            if self._pool is not None and self.processes:
+                self._pool[0].shutdown()       # this run's own pool, not the shared one
+        self.report["errors_truncated"] = self.report["failed"] > len(self.report["errors"])
+        return self.report
@@ -0,0 +1,113 @@
+# accounts/last_login.py
+"""
+Buffered last_login writes.
+
+A login only records its timestamp in memory; the buffer is written back
+with one bulk UPDATE when it reaches BATCH_SIZE users, FLUSH_INTERVAL
+seconds after the first buffered login, or when the process exits.
+
+    settings.LAST_LOGIN = {
+        "FLUSH_INTERVAL": 5,     # seconds (0 → only batch size / exit flushes)
+        "BATCH_SIZE":     100,
+    }
+"""
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, DateTimeField, Value, When
+
+logger = logging.getLogger(__name__)
+
+UPDATE_CHUNK = 300      # keeps each UPDATE well under SQLite's variable limit
+
+
+class LastLoginRecorder:
+    def __init__(self, interval=5, batch_size=100):
+        self.interval   = interval
+        self.batch_size = batch_size
+        self._buffer = {}                      # user_id → newest login datetime
+        self._lock   = threading.Lock()
+        self._timer  = None
+
+    def record(self, user_id, when):
+        with self._lock:
+            prev = self._buffer.get(user_id)
+            if prev is None or when > prev:
+                self._buffer[user_id] = when
+            full = len(self._buffer) >= self.batch_size
+            if not full and self._timer is None and self.interval:
+                self._timer = threading.Timer(self.interval, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def pending(self):
+        with self._lock:
+            return dict(self._buffer)
+
+    def flush(self):
+        """Write every buffered timestamp; returns the number of users updated."""
+        with self._lock:
+            batch, self._buffer = self._buffer, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not batch:
+            return 0
+
+        from .models import User
+
+        items = list(batch.items())
+        try:
+            for i in range(0, len(items), UPDATE_CHUNK):
+                chunk = items[i:i + UPDATE_CHUNK]
+                User.objects.filter(pk__in=[pk for pk, _ in chunk]).update(
+                    last_login=Case(
+                        *[When(pk=pk, then=Value(ts)) for pk, ts in chunk],
+                        output_field=DateTimeField(),
+                    )
+                )
+        except Exception:
+            logger.exception("last_login flush failed; %d users re-buffered", len(batch))
+            with self._lock:
+                for pk, ts in batch.items():
+                    if pk not in self._buffer:
+                        self._buffer[pk] = ts
+            return 0
+        return len(batch)
+
+    def _flush_from_timer(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        finally:
+            connection.close()                 # timer threads don't get request cleanup
+
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+
+def get_recorder():
+    global _recorder
+    if _recorder is None:
+        with _recorder_lock:
+            if _recorder is None:
+                conf = getattr(settings, "LAST_LOGIN", {})
+                _recorder = LastLoginRecorder(
+                    interval=conf.get("FLUSH_INTERVAL", 5),
+                    batch_size=conf.get("BATCH_SIZE", 100),
+                )
+                atexit.register(_recorder.flush)
+    return _recorder
+
+
+def record_login(user, when):
+    """Set `user.last_login` in memory and queue the DB write."""
+    user.last_login = when
+    get_recorder().record(user.pk, when)
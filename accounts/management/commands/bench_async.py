@@ -0,0 +1,125 @@
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import User
+
+# (sync path, async path) under /api/
+ENDPOINTS = {
+    "user_list":   ("users/", "async/users/"),
+    "group_list":  ("groups/", "async/groups/"),
+    "permissions": ("permissions/", "async/permissions/"),
+}
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    idx = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[idx] * 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Concurrency benchmark: sync @api_view endpoints vs their native async "
+        "versions (accounts/async_views.py) on one ASGI worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", help="already running server, e.g. http://127.0.0.1:8000 "
+                                               "(default: start uvicorn with one worker)")
+        parser.add_argument("--port", type=int, default=8765, help="port for the uvicorn we start")
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--requests", type=int, default=500, help="per endpoint and mode")
+        parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), action="append")
+        parser.add_argument("--token", help="access token (default: minted for the first staff user)")
+
+    def handle(self, *args, **options):
+        token = options["token"] or self._token()
+        server = None
+        base_url = options["base_url"]
+        if not base_url:
+            server, base_url = self._start_uvicorn(options["port"])
+        base_url = base_url.rstrip("/") + "/api/"
+
+        try:
+            self.stdout.write(
+                f"{'endpoint':<12} {'mode':<6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+                f"{'p99 ms':>8} {'errors':>7}"
+            )
+            for name in options["endpoint"] or ENDPOINTS:
+                for mode, path in zip(("sync", "async"), ENDPOINTS[name]):
+                    result = self._run(base_url + path, token, options["concurrency"], options["requests"])
+                    self.stdout.write(
+                        f"{name:<12} {mode:<6} {result['rps']:8.1f} {result['p50']:8.1f} "
+                        f"{result['p95']:8.1f} {result['p99']:8.1f} {result['errors']:7d}"
+                    )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=10)
+
+    # ---------- setup ----------
+    def _token(self):
+        user = User.objects.filter(is_staff=True).order_by("date_joined").first()
+        if user is None:
+            raise CommandError("No staff user to authenticate as — create one or pass --token.")
+        return str(RefreshToken.for_user(user).access_token)
+
+    def _start_uvicorn(self, port):
+        if importlib.util.find_spec("uvicorn") is None:
+            raise CommandError("uvicorn is not installed — pip install uvicorn, or pass --base-url.")
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "ecommerce_Api.asgi:application",
+             "--port", str(port), "--workers", "1", "--log-level", "warning"],
+            env=dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get(
+                "DJANGO_SETTINGS_MODULE", "ecommerce_Api.settings")),
+        )
+        deadline = time.monotonic() + 15
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+                return server, f"http://127.0.0.1:{port}"
+            except OSError:
+                if server.poll() is not None:
+                    raise CommandError("uvicorn exited during startup")
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError("uvicorn did not start within 15s")
+
+    # ---------- load ----------
+    def _run(self, url, token, concurrency, total):
+        headers = {"Authorization": f"Bearer {token}"}
+
+        def one(_):
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=30) as res:
+                    json.load(res)
+                    ok = res.status == 200
+            except (urllib.error.URLError, OSError, ValueError):
+                ok = False
+            return ok, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(one, range(total)))
+        elapsed = time.perf_counter() - started
+
+        times = [t for _, t in results]
+        return {
+            "rps":    total / elapsed,
+            "p50":    _percentile(times, 50),
+            "p95":    _percentile(times, 95),
+            "p99":    _percentile(times, 99),
+            "errors": sum(1 for ok, _ in results if not ok),
+        }
@@ -0,0 +1,140 @@
+import json
+import platform
+import shutil
+import tempfile
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import override_settings
+from django.utils import timezone
+
+from accounts.benchmarks import (
+    ENDPOINTS, client_state, run_in_process, run_server, seed, start_server, use_scratch_database,
+)
+from accounts.last_login import get_recorder
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark login / register / user_list / group_list / token refresh at several data "
+        "sizes (in-process + threaded local server), write JSON, fail on a blown budget."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scales", type=int, nargs="+", default=[1000, 10000],
+                            help="number of seeded users per run")
+        parser.add_argument("--requests", type=int, default=200,
+                            help="requests per endpoint (a tenth for login / register)")
+        parser.add_argument("--concurrency", type=int, default=8, help="client threads against the server")
+        parser.add_argument("--endpoint", action="append", choices=sorted(ENDPOINTS),
+                            help="only these endpoints (repeatable)")
+        parser.add_argument("--skip-server", action="store_true", help="in-process only")
+        parser.add_argument("--output", default="bench_endpoints.json")
+        parser.add_argument("--baseline", help="earlier --output to compare p95 against")
+        parser.add_argument("--tolerance", type=float, default=0.25,
+                            help="allowed p95 slowdown vs --baseline (0.25 = 25%%)")
+
+    def handle(self, *args, **options):
+        if settings.DATABASES["default"]["ENGINE"] != "django.db.backends.sqlite3":
+            raise CommandError("bench_endpoints seeds throwaway SQLite files; default must be SQLite")
+
+        names = options["endpoint"] or list(ENDPOINTS)
+        runs  = []
+        workdir = Path(tempfile.mkdtemp(prefix="bench_endpoints-"))
+        try:
+            template = workdir / "template.sqlite3"
+            use_scratch_database(template)
+            call_command("migrate", verbosity=0)
+            connections.close_all()
+
+            for scale in options["scales"]:
+                path = workdir / f"scale-{scale}.sqlite3"
+                shutil.copy(template, path)
+                use_scratch_database(path)
+                cache.clear()
+                admin = seed(scale)
+                self.stdout.write(f"\n{scale} users")
+                runs += self._run_scale(scale, admin, names, options)
+                get_recorder().flush()          # buffered last_login → this file, not at exit
+                connections.close_all()
+        finally:
+            connections.close_all()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        violations = self._violations(runs, options)
+        report = {
+            "created":     timezone.now().isoformat(),
+            "python":      platform.python_version(),
+            "django":      django.get_version(),
+            "requests":    options["requests"],
+            "concurrency": options["concurrency"],
+            "runs":        runs,
+            "violations":  violations,
+        }
+        Path(options["output"]).write_text(json.dumps(report, indent=2))
+        self.stdout.write(f"\nwrote {options['output']}")
+
+        if violations:
+            for line in violations:
+                self.stderr.write(self.style.ERROR(line))
+            raise CommandError(f"{len(violations)} budget(s) exceeded")
+
+    def _requests(self, name, options):
+        return max(1, options["requests"] // 10) if ENDPOINTS[name]["slow"] else options["requests"]
+
+    def _run_scale(self, scale, admin, names, options):
+        runs  = []
+        state = client_state(scale, admin)
+        # django.test.Client sends Host: testserver (the test runner allows it, runserver doesn't)
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            for name in names:
+                result = run_in_process(name, state, self._requests(name, options))
+                runs.append(self._record(scale, name, "in_process", result))
+
+        if not options["skip_server"]:
+            server, base_url = start_server()
+            try:
+                states = [client_state(scale, admin) for _ in range(options["concurrency"])]
+                for name in names:
+                    result = run_server(name, states, base_url, self._requests(name, options))
+                    runs.append(self._record(scale, name, "server", result))
+            finally:
+                server.shutdown()
+                server.server_close()
+        return runs
+
+    def _record(self, scale, name, mode, result):
+        run = {"scale": scale, "endpoint": name, "mode": mode,
+               "query_budget": ENDPOINTS[name]["queries"], **result}
+        queries = "" if run["max_queries"] is None else f"queries {run['max_queries']}/{run['query_budget']}"
+        self.stdout.write(
+            f"  {name:<14} {mode:<10} {run['rps']:8.1f} req/s  p50 {run['p50_ms']:8.2f}  "
+            f"p95 {run['p95_ms']:8.2f}  p99 {run['p99_ms']:8.2f} ms  errors {run['errors']:<3} {queries}"
+        )
+        return run
+
+    def _violations(self, runs, options):
+        problems = []
+        for run in runs:
+            label = f"{run['endpoint']} ({run['mode']}, {run['scale']} users)"
+            if run["max_queries"] is not None and run["max_queries"] > run["query_budget"]:
+                problems.append(f"{label}: {run['max_queries']} queries > budget {run['query_budget']}")
+            if run["errors"]:
+                problems.append(f"{label}: {run['errors']} failed requests")
+
+        if options["baseline"]:
+            baseline = json.loads(Path(options["baseline"]).read_text())
+            before = {(r["scale"], r["endpoint"], r["mode"]): r for r in baseline["runs"]}
+            for run in runs:
+                old = before.get((run["scale"], run["endpoint"], run["mode"]))
+                if old and old["p95_ms"] and run["p95_ms"] > old["p95_ms"] * (1 + options["tolerance"]):
+                    problems.append(
+                        f"{run['endpoint']} ({run['mode']}, {run['scale']} users): p95 "
+                        f"{run['p95_ms']} ms vs {old['p95_ms']} ms in {options['baseline']}"
+                    )
+        return problems
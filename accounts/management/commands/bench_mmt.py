@@ -0,0 +1,40 @@
+import random
+import timeit
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand
+
+from accounts.helpers import mmt, mmt_fast, mmt_many
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark: accounts.helpers.mmt vs mmt_fast / mmt_many."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        rng   = random.Random(42)
+        start = datetime(2020, 1, 1, tzinfo=dt_timezone.utc)
+        dts   = [start + timedelta(seconds=rng.randrange(10 * 365 * 86400)) for _ in range(rows)]
+
+        if [mmt(d) for d in dts] != mmt_many(dts):
+            self.stderr.write(self.style.ERROR("output mismatch"))
+            return
+
+        cases = {
+            "mmt":      lambda: [mmt(d) for d in dts],
+            "mmt_fast": lambda: [mmt_fast(d) for d in dts],
+            "mmt_many": lambda: mmt_many(dts),
+        }
+        base = None
+        for name, fn in cases.items():
+            best = min(timeit.repeat(fn, number=1, repeat=repeat))
+            per_row = best / rows * 1e6
+            base = base or best
+            self.stdout.write(
+                f"{name:<9} {best * 1000:8.2f} ms / {rows} rows  "
+                f"{per_row:6.2f} µs/row  x{base / best:5.1f}"
+            )
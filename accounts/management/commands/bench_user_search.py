@@ -0,0 +1,79 @@
+import random
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import User
+from accounts.user_search import icontains_filter
+from accounts.views import filter_users
+
+DOMAINS = ["gmail.com", "yahoo.com", "outlook.com", "mptmail.net.mm", "ooredoo.com.mm"]
+NAMES   = "aung kyaw min thant zaw htet hla myo su thandar nilar win phyo khin".split()
+QUERIES = ("user0004217", "aung.1", "+95970004", "kyaw", "mptmail", "zzqx")
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Benchmark: user_list ?search= (trigram index) vs plain icontains, on throwaway users."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, action="append",
+                            help="table size(s) to measure at, e.g. --users 100000 --users 1000000 "
+                                 "(users are created, then rolled back)")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        sizes = sorted(options["users"] or [100_000])
+        try:
+            with transaction.atomic():
+                rng = random.Random(42)
+                for size in sizes:
+                    self._seed(rng, size)
+                    self._bench(options["repeat"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, rng, size):
+        start = User.objects.count()
+        now   = timezone.now()
+        started = timeit.default_timer()
+        for offset in range(start, size, 10_000):
+            User.objects.bulk_create(
+                [
+                    User(
+                        username=f"user{n:07d}{rng.choice(NAMES)}",
+                        email=f"{rng.choice(NAMES)}.{n}@{rng.choice(DOMAINS)}",
+                        phone=f"+9597{n:08d}",
+                        password="!",
+                        date_joined=now,
+                    )
+                    for n in range(offset, min(offset + 10_000, size))
+                ],
+                batch_size=1000,
+            )
+        self.stdout.write(
+            f"\n{size} users (seeded {size - start} in {timeit.default_timer() - started:.1f} s)"
+        )
+
+    def _user_list(self, queryset):
+        """what user_list does: COUNT + the first page"""
+        return queryset.count(), list(queryset.order_by("-date_joined", "-id")[:2])
+
+    def _bench(self, repeat):
+        for q in QUERIES:
+            indexed = lambda: self._user_list(filter_users(User.objects.all(), {"search": q}))
+            plain   = lambda: self._user_list(User.objects.filter(icontains_filter(q)))
+            hits    = indexed()[0]
+            assert hits == plain()[0]
+            t_plain = min(timeit.repeat(plain, number=1, repeat=repeat))
+            t_index = min(timeit.repeat(indexed, number=1, repeat=repeat))
+            self.stdout.write(
+                f"q={q!r:<14} hits={hits:<7} icontains {t_plain * 1000:9.2f} ms   "
+                f"trigram {t_index * 1000:9.2f} ms   x{t_plain / t_index:6.1f}"
+            )
@@ -0,0 +1,40 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.importers import FORMATS, UserImporter, guess_format, read_rows, text_stream
+
+
+class Command(BaseCommand):
+    help = "Stream users from a CSV / JSON Lines file into the database in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--processes", type=int, default=None,
+                            help="hashing processes (default: USER_IMPORT['PROCESSES'] or the CPU count, 0 = in-process)")
+        parser.add_argument("--max-errors", type=int, default=1000)
+        parser.add_argument("--report", help="write the JSON report here instead of stdout")
+
+    def handle(self, *args, **options):
+        fmt = options["format"] or guess_format(options["path"])
+        importer = UserImporter(
+            batch_size=options["batch_size"],
+            processes=options["processes"],
+            max_errors=options["max_errors"],
+        )
+        try:
+            with open(options["path"], "rb") as fh:
+                report = importer.run(read_rows(text_stream(fh), fmt))
+        except OSError as exc:
+            raise CommandError(exc)
+
+        if options["report"]:
+            with open(options["report"], "w") as out:
+                json.dump(report, out, indent=2)
+        else:
+            self.stdout.write(json.dumps(report, indent=2))
+        self.stderr.write(self.style.SUCCESS(
+            f"processed {report['processed']}, created {report['created']}, failed {report['failed']}"
+        ))
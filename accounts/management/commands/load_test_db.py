@@ -0,0 +1,135 @@
+import multiprocessing
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+from contextlib import closing
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+from django.utils import timezone
+
+from accounts.benchmarks import use_scratch_database
+from accounts.models import User
+from ecommerce_Api.routers import replica_reads
+
+# what settings.DATABASES looked like before WAL / IMMEDIATE / timeout
+STOCK_OPTIONS = {}
+
+
+def _use_database(path, tuned):
+    use_scratch_database(path, None if tuned else STOCK_OPTIONS)
+
+
+def _worker(args):
+    """login / registration / list traffic until the deadline → (ops, locked, other, latencies)"""
+    seed, path, tuned, deadline, user_ids = args
+    _use_database(path, tuned)
+    rng = random.Random(seed)
+    ops = locked = other = 0
+    latencies = []
+    n = 0
+    while time.time() < deadline:
+        roll    = rng.random()
+        started = time.perf_counter()
+        try:
+            if roll < 0.6:                      # user_list-style read
+                with replica_reads():
+                    User.objects.count()
+                    list(User.objects.order_by("-date_joined", "-id")[:20])
+            elif roll < 0.9:                    # login: read the user, stamp last_login
+                with transaction.atomic():
+                    user = User.objects.get(pk=rng.choice(user_ids))
+                    User.objects.filter(pk=user.pk).update(last_login=timezone.now())
+            else:                               # registration: uniqueness check + insert
+                n += 1
+                username = f"load{seed}x{n}"
+                with transaction.atomic():
+                    if not User.objects.filter(username=username).exists():
+                        User.objects.create(
+                            username=username, email=f"{username}@example.com",
+                            phone=f"+959{seed:02d}{n:07d}", password="!",
+                        )
+            ops += 1
+            latencies.append(time.perf_counter() - started)
+        except OperationalError as exc:
+            if "locked" in str(exc):
+                locked += 1
+            else:
+                other += 1
+    connections.close_all()
+    return ops, locked, other, latencies
+
+
+class Command(BaseCommand):
+    help = (
+        "Multi-process SQLite load test (reads + last_login writes + registrations) on "
+        "throwaway copies of the schema: stock options vs the configured WAL / IMMEDIATE setup."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=8)
+        parser.add_argument("--seconds", type=float, default=10)
+        parser.add_argument("--users", type=int, default=500, help="users seeded before the run")
+        parser.add_argument("--profile", choices=["stock", "tuned", "both"], default="both")
+
+    def handle(self, *args, **options):
+        if settings.DATABASES["default"]["ENGINE"] != "django.db.backends.sqlite3":
+            self.stderr.write("load_test_db only makes sense on SQLite")
+            return
+
+        workdir = Path(tempfile.mkdtemp(prefix="load_test_db-"))
+        try:
+            template = workdir / "template.sqlite3"
+            self.stdout.write("migrating a scratch database ...")
+            _use_database(template, tuned=False)
+            call_command("migrate", verbosity=0)
+            User.objects.bulk_create(
+                [
+                    User(username=f"seed{n}", email=f"seed{n}@example.com",
+                         phone=f"+9599{n:08d}", password="!")
+                    for n in range(options["users"])
+                ],
+                batch_size=1000,
+            )
+            user_ids = list(User.objects.values_list("pk", flat=True))
+            connections.close_all()
+
+            profiles = ["stock", "tuned"] if options["profile"] == "both" else [options["profile"]]
+            for profile in profiles:
+                path = workdir / f"{profile}.sqlite3"
+                shutil.copy(template, path)
+                # migrate left the template in WAL (0007); the stock run gets SQLite's default back
+                with closing(sqlite3.connect(path)) as db:
+                    db.execute(f"PRAGMA journal_mode={'WAL' if profile == 'tuned' else 'DELETE'}")
+                self._run(profile, path, user_ids, options)
+        finally:
+            connections.close_all()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def _run(self, profile, path, user_ids, options):
+        deadline = time.time() + options["seconds"]
+        jobs = [(seed, path, profile == "tuned", deadline, user_ids)
+                for seed in range(options["processes"])]
+        with multiprocessing.get_context("fork").Pool(options["processes"]) as pool:
+            results = pool.map(_worker, jobs)
+
+        ops       = sum(r[0] for r in results)
+        locked    = sum(r[1] for r in results)
+        other     = sum(r[2] for r in results)
+        latencies = sorted(t for r in results for t in r[3])
+        if len(latencies) >= 2:
+            cuts = statistics.quantiles(latencies, n=100)
+            p50, p95, p99 = (cuts[i] * 1000 for i in (49, 94, 98))
+        else:
+            p50 = p95 = p99 = 0.0
+        self.stdout.write(
+            f"{profile:<6} {options['processes']} procs  {ops / options['seconds']:8.0f} ops/s  "
+            f"locked errors {locked:<5} other errors {other:<3} "
+            f"p50 {p50:6.1f} ms  p95 {p95:7.1f} ms  p99 {p99:7.1f} ms"
+        )
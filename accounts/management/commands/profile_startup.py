@@ -0,0 +1,67 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ecommerce_Api.startup import check_budget, profile
+
+
+class Command(BaseCommand):
+    help = (
+        "Cold-start profile of a worker in fresh interpreters: boot (django.setup + WSGI "
+        "handler) and URLconf time, import time and memory per module and per app."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=3, help="cold starts to take the median of")
+        parser.add_argument("--top", type=int, default=25, help="modules to list")
+        parser.add_argument("--no-memory", action="store_true", help="skip the (slow) tracemalloc run")
+        parser.add_argument("--output", help="write the full report as JSON")
+        parser.add_argument("--check", action="store_true",
+                            help="fail when settings.STARTUP_BUDGET is exceeded")
+
+    def handle(self, *args, **options):
+        report = profile(repeat=max(1, options["repeat"]), memory=not options["no_memory"])
+        imports = report["imports"]
+        out = self.stdout.write
+
+        out(
+            f"cold start (median of {len(report['runs'])}): "
+            f"boot {report['boot_ms']:.1f} ms / {report['boot_rss_mb']:.1f} MB / "
+            f"{report['boot_modules']} modules,  + urls → {report['total_ms']:.1f} ms / "
+            f"{report['rss_mb']:.1f} MB / {report['modules']} modules  "
+            f"(whole process {report['process_ms']:.0f} ms)"
+        )
+        if report["from_source"]:
+            out(self.style.WARNING(
+                f"{len(report['from_source'])} modules have no up-to-date .pyc and are compiled on "
+                f"every start (read-only tree / PYTHONDONTWRITEBYTECODE?) — run compileall at build "
+                f"time: {', '.join(report['from_source'][:10])}"
+            ))
+
+        out(f"\n{'app / package':<32} {'modules':>7} {'boot ms':>9} {'urls ms':>9} {'memory KB':>10}")
+        groups = sorted(report["groups"].items(),
+                        key=lambda item: -(item[1]["boot_ms"] + item[1]["urls_ms"]))
+        for name, group in groups[:options["top"]]:
+            out(f"{name:<32} {group['modules']:>7} {group['boot_ms']:>9.1f} "
+                f"{group['urls_ms']:>9.1f} {group['memory_kb']:>10.0f}")
+
+        out(f"\n{'module':<48} {'phase':<5} {'self ms':>8} {'cum ms':>8} {'self KB':>8} {'cum KB':>8}")
+        slowest = sorted(imports.items(), key=lambda item: -item[1]["self_ms"])
+        for name, row in slowest[:options["top"]]:
+            self_kb = "" if row["self_kb"] is None else f"{row['self_kb']:.0f}"
+            cum_kb  = "" if row["cum_kb"] is None else f"{row['cum_kb']:.0f}"
+            out(f"{name:<48} {row['phase']:<5} {row['self_ms']:>8.2f} {row['cum_ms']:>8.2f} "
+                f"{self_kb:>8} {cum_kb:>8}")
+
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, indent=2))
+            out(f"\nwrote {options['output']}")
+
+        problems = check_budget(report)
+        for line in problems:
+            self.stderr.write(self.style.ERROR(line))
+        if problems and options["check"]:
+            raise CommandError(f"{len(problems)} startup budget(s) exceeded")
+        if not problems:
+            out(self.style.SUCCESS("\nwithin STARTUP_BUDGET"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from accounts.revocation import get_store
+
+
+class Command(BaseCommand):
+    help = "Delete revoked refresh tokens whose expiry has passed."
+
+    def handle(self, *args, **options):
+        deleted = get_store().purge_expired()
+        self.stdout.write(self.style.SUCCESS(f"Purged {deleted} expired revoked token(s)."))
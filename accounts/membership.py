@@ -0,0 +1,90 @@
+# accounts/membership.py
+"""
+Set-based group / permission membership changes for many users at once
+(user_bulk_membership).
+
+Each operation works on the m2m `through` table directly:
+
+    add     → one SELECT of the pairs that already exist, bulk INSERT of the rest
+              (500 rows per statement)
+    remove  → one DELETE ... WHERE user_id IN (...) AND <fk> IN (...)
+    set     → one DELETE of everything outside the new set, then `add`
+
+so the query count depends on the operations (and on rows / 500 for the
+inserts), not on a per-user diff.  Bulk writes skip m2m_changed, so the caches those signals keep
+fresh (auth version, per-user rows) are bumped here explicitly.
+"""
+from django.db import transaction
+
+from .models import User
+from .perms import bump_auth_version
+from .user_cache import bump_user
+
+RELATIONS = {
+    # payload key → (through model, fk column on it)
+    "groups":      (User.groups.through, "group_id"),
+    "permissions": (User.user_permissions.through, "permission_id"),
+}
+
+
+def _add(through, fk, user_ids, ids):
+    if not ids:
+        return 0
+    existing = set(
+        through.objects.filter(user_id__in=user_ids, **{f"{fk}__in": ids})
+        .values_list("user_id", fk)
+    )
+    rows = [
+        through(user_id=user_id, **{fk: pk})
+        for user_id in user_ids for pk in ids
+        if (user_id, pk) not in existing
+    ]
+    through.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
+
+
+def _remove(through, fk, user_ids, ids):
+    if not ids:
+        return 0
+    deleted, _ = through.objects.filter(user_id__in=user_ids, **{f"{fk}__in": ids}).delete()
+    return deleted
+
+
+def _replace(through, fk, user_ids, ids):
+    deleted, _ = through.objects.filter(user_id__in=user_ids).exclude(**{f"{fk}__in": ids}).delete()
+    return _add(through, fk, user_ids, ids), deleted
+
+
+def apply_membership(user_ids, changes):
+    """
+    user_ids → validated list of User pks
+    changes  → {"groups": {"add": [...], "remove": [...], "set": [...]}, "permissions": {...}}
+               ("set" replaces, and is never combined with add/remove)
+    Returns  {"users": n, "groups": {"added": a, "removed": r}, "permissions": {...}}
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    summary  = {"users": len(user_ids)}
+
+    with transaction.atomic():
+        for key, (through, fk) in RELATIONS.items():
+            ops = changes.get(key) or {}
+            if "set" in ops:
+                added, removed = _replace(through, fk, user_ids, list(dict.fromkeys(ops["set"])))
+            else:
+                added   = _add(through, fk, user_ids, list(dict.fromkeys(ops.get("add", []))))
+                removed = _remove(through, fk, user_ids, list(dict.fromkeys(ops.get("remove", []))))
+            summary[key] = {"added": added, "removed": removed}
+
+    if any(summary[key]["added"] or summary[key]["removed"] for key in RELATIONS):
+        bump_auth_version()                    # permission cache + group responses
+        bump_user(*user_ids)
+    return summary
+
+
+def missing_ids(model, ids):
+    """ids (from the payload) that don't exist — one query"""
+    ids = set(ids)
+    if not ids:
+        return []
+    found = set(model.objects.filter(pk__in=ids).values_list("pk", flat=True))
+    return sorted((str(pk) for pk in ids - found))
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:40
+
+from django.db import migrations, models
+
+
+def normalize_phone(value):
+    # frozen copy of accounts.validators.normalize_phone as of this
+    # migration: the backfill must not change when the app code does
+    import phonenumbers
+
+    if not value:
+        return None
+    value = value.strip()
+    if not (value[0] == "+" or value[0].isdigit()):
+        return None
+    try:
+        number = phonenumbers.parse(value, None)
+    except phonenumbers.NumberParseException:
+        return None
+    if not phonenumbers.is_valid_number(number):
+        return None
+    return phonenumbers.format_number(number, phonenumbers.PhoneNumberFormat.E164)
+
+
+def backfill_lookup_fields(apps, schema_editor):
+    User = apps.get_model("accounts", "User")
+    db = schema_editor.connection.alias
+    batch = []
+    for user in User.objects.using(db).only("id", "username", "email", "phone").iterator(chunk_size=1000):
+        user.username_lower = (user.username or "").lower()
+        user.email_lower    = (user.email or "").lower()
+        user.phone_e164     = normalize_phone(user.phone) or (user.phone or "")
+        batch.append(user)
+        if len(batch) >= 1000:
+            User.objects.using(db).bulk_update(batch, ["username_lower", "email_lower", "phone_e164"])
+            batch = []
+    if batch:
+        User.objects.using(db).bulk_update(batch, ["username_lower", "email_lower", "phone_e164"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_joined_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='email_lower',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='phone_e164',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='username_lower',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=150),
+        ),
+        migrations.RunPython(backfill_lookup_fields, migrations.RunPython.noop),
+    ]
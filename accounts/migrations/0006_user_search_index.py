@@ -0,0 +1,93 @@
+# Substring search index for user_list ?search= (accounts/user_search.py)
+#
+#   SQLite      FTS5 trigram table over username / email / phone, kept in
+#               sync by triggers (covers save(), bulk_create, update(), raw SQL)
+#   PostgreSQL  pg_trgm GIN indexes on UPPER(col), the expression Django's
+#               icontains compiles to
+#   others      nothing (plain icontains)
+
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    # FTS rowid ↔ user id; INTEGER PRIMARY KEY so VACUUM can't renumber it
+    """CREATE TABLE accounts_user_search_ids (
+        id INTEGER PRIMARY KEY,
+        user_id char(32) NOT NULL UNIQUE
+    )""",
+    """CREATE VIRTUAL TABLE accounts_user_fts USING fts5(
+        username, email, phone, tokenize='trigram'
+    )""",
+    """CREATE TRIGGER accounts_user_search_ai AFTER INSERT ON accounts_user BEGIN
+        INSERT INTO accounts_user_search_ids (user_id) VALUES (new.id);
+        INSERT INTO accounts_user_fts (rowid, username, email, phone)
+        VALUES ((SELECT id FROM accounts_user_search_ids WHERE user_id = new.id),
+                new.username, new.email, new.phone);
+    END""",
+    """CREATE TRIGGER accounts_user_search_ad AFTER DELETE ON accounts_user BEGIN
+        DELETE FROM accounts_user_fts
+        WHERE rowid = (SELECT id FROM accounts_user_search_ids WHERE user_id = old.id);
+        DELETE FROM accounts_user_search_ids WHERE user_id = old.id;
+    END""",
+    """CREATE TRIGGER accounts_user_search_au AFTER UPDATE OF username, email, phone ON accounts_user BEGIN
+        UPDATE accounts_user_fts
+        SET username = new.username, email = new.email, phone = new.phone
+        WHERE rowid = (SELECT id FROM accounts_user_search_ids WHERE user_id = old.id);
+    END""",
+    # existing users
+    "INSERT INTO accounts_user_search_ids (user_id) SELECT id FROM accounts_user",
+    """INSERT INTO accounts_user_fts (rowid, username, email, phone)
+       SELECT s.id, u.username, u.email, u.phone
+       FROM accounts_user u JOIN accounts_user_search_ids s ON s.user_id = u.id""",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS accounts_user_search_au",
+    "DROP TRIGGER IF EXISTS accounts_user_search_ad",
+    "DROP TRIGGER IF EXISTS accounts_user_search_ai",
+    "DROP TABLE IF EXISTS accounts_user_fts",
+    "DROP TABLE IF EXISTS accounts_user_search_ids",
+]
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    'CREATE INDEX IF NOT EXISTS accounts_user_username_trgm ON accounts_user USING gin (UPPER("username"::text) gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS accounts_user_email_trgm ON accounts_user USING gin (UPPER("email"::text) gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS accounts_user_phone_trgm ON accounts_user USING gin (UPPER("phone"::text) gin_trgm_ops)',
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS accounts_user_phone_trgm",
+    "DROP INDEX IF EXISTS accounts_user_email_trgm",
+    "DROP INDEX IF EXISTS accounts_user_username_trgm",
+]
+
+STATEMENTS = {
+    "sqlite":     (SQLITE_FORWARD, SQLITE_BACKWARD),
+    "postgresql": (POSTGRES_FORWARD, POSTGRES_BACKWARD),
+}
+
+
+def _run(schema_editor, direction):
+    statements = STATEMENTS.get(schema_editor.connection.vendor)
+    if statements:
+        for sql in statements[direction]:
+            schema_editor.execute(sql)
+
+
+def forward(apps, schema_editor):
+    _run(schema_editor, 0)
+
+
+def backward(apps, schema_editor):
+    _run(schema_editor, 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_user_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(forward, backward),
+    ]
@@ -0,0 +1,34 @@
+# SQLite: put the database file in WAL mode (readers and the writer don't
+# block each other).  journal_mode=WAL is persistent — it lives in the file
+# header — so it is set once here rather than in every connection's
+# init_command, where even a read-only manage.py command rewrote the header
+# of the checked-in db.sqlite3.
+
+from django.db import migrations
+
+
+def _journal_mode(schema_editor, mode):
+    connection = schema_editor.connection
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA journal_mode={mode}")
+
+
+def forward(apps, schema_editor):
+    _journal_mode(schema_editor, "WAL")
+
+
+def backward(apps, schema_editor):
+    _journal_mode(schema_editor, "DELETE")
+
+
+class Migration(migrations.Migration):
+    atomic = False          # SQLite can't change the journal mode inside a transaction
+
+    dependencies = [
+        ('accounts', '0006_user_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(forward, backward),
+    ]
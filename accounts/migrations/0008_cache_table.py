@@ -0,0 +1,37 @@
+# The default cache (settings.CACHES) is a DatabaseCache whose table lives in
+# the "cache" database (ecommerce_Api/routers.py).  Create it — in WAL mode,
+# like the app's database — as part of `migrate`, so a fresh checkout needs
+# no extra createcachetable step.  Under the test runner CACHES points at a
+# directory and there's nothing to create.
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.db import DatabaseCache
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections, migrations
+
+from ecommerce_Api.routers import cache_db
+
+
+def forward(apps, schema_editor):
+    if schema_editor.connection.alias != DEFAULT_DB_ALIAS:
+        return
+    if not any(isinstance(caches[alias], DatabaseCache) for alias in settings.CACHES):
+        return
+    database = cache_db()
+    connection = connections[database]
+    if connection.vendor == "sqlite" and database != DEFAULT_DB_ALIAS:
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode=WAL")
+    call_command("createcachetable", database=database, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_sqlite_wal'),
+    ]
+
+    operations = [
+        migrations.RunPython(forward, migrations.RunPython.noop),
+    ]
@@ -5,7 +5,8 @@ from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseU
 from django.utils import timezone
 from django.core.validators import RegexValidator
 from django.conf import settings
-from .validators import validate_phone_number  # ဒါ import လုပ်ပါ
+from .validators import validate_phone_number, normalize_phone  # ဒါ import လုပ်ပါ
+from . import hashing
 import uuid
 
 class UserManager(BaseUserManager):
@@ -24,7 +25,8 @@ class UserManager(BaseUserManager):
             phone=phone,
             **extra
         )
-        user.set_password(password)
+        user.password  = hashing.make_password(password)   # off-thread PBKDF2
+        user._password = password
         user.save(using=self._db)
         return user
 
@@ -47,10 +49,56 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_staff  = models.BooleanField(default=False)
     date_joined = models.DateTimeField(default=timezone.now)
 
+    # 🔎 normalized copies for indexed login lookups (kept in sync by save())
+    username_lower = models.CharField(max_length=150, db_index=True, editable=False, default="")
+    email_lower    = models.CharField(max_length=254, db_index=True, editable=False, default="")
+    phone_e164     = models.CharField(max_length=16,  db_index=True, editable=False, default="")
+
     objects = UserManager()
 
     USERNAME_FIELD  = "username"
     REQUIRED_FIELDS = ["email", "phone"]
 
+    class Meta:
+        indexes = [
+            # keyset pagination in user_list (?pagination=cursor)
+            models.Index(fields=["date_joined", "id"], name="user_joined_id_idx"),
+            # user_list filters: ?status= / ?is_active= (+ date range, newest first)
+            models.Index(fields=["is_active", "date_joined", "id"], name="user_active_joined_idx"),
+            # ?role=admin|staff|user (+ date range, newest first)
+            models.Index(
+                fields=["is_superuser", "is_staff", "date_joined", "id"],
+                name="user_role_joined_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.username
+
+    LOOKUP_SOURCE_FIELDS = {"username", "email", "phone"}
+    LOOKUP_FIELDS        = ["username_lower", "email_lower", "phone_e164"]
+
+    def refresh_lookup_fields(self):
+        """Recompute username_lower / email_lower / phone_e164 from the raw fields"""
+        self.username_lower = (self.username or "").lower()
+        self.email_lower    = (self.email or "").lower()
+        self.phone_e164     = normalize_phone(self.phone) or (self.phone or "")
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            self.refresh_lookup_fields()
+        elif self.LOOKUP_SOURCE_FIELDS.intersection(update_fields):
+            self.refresh_lookup_fields()
+            kwargs["update_fields"] = {*update_fields, *self.LOOKUP_FIELDS}
+        super().save(*args, **kwargs)
+
+
+class RevokedToken(models.Model):
+    """Revoked refresh-token jti's; rows past `expires_at` can be purged."""
+    jti        = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.jti
@@ -0,0 +1,163 @@
+# accounts/pagination.py
+import base64
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def wants_cursor(request):
+    """Opt-in: ?pagination=cursor (or any request that already carries a cursor)"""
+    params = request.query_params
+    return params.get("pagination") == "cursor" or "cursor" in params
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination.
+
+    Pages are fetched with `WHERE (key) < (last key seen) ORDER BY key LIMIT n`
+    instead of OFFSET, and no COUNT(*) is run — so page 1000 costs the same
+    as page 1.  The cursor is an opaque base64 blob holding the ordering
+    values of the boundary row.
+    """
+    cursor_query_param    = "cursor"
+    page_size             = 2
+    page_size_query_param = None
+    max_page_size         = 100
+    ordering              = ("-date_joined", "-id")
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self, ordering=None, page_size=None, page_size_query_param=None):
+        if ordering is not None:
+            self.ordering = tuple(ordering)
+        if page_size is not None:
+            self.page_size = page_size
+        if page_size_query_param is not None:
+            self.page_size_query_param = page_size_query_param
+
+    # ---------- cursor encoding ----------
+    def encode_cursor(self, values, reverse=False):
+        raw = json.dumps({"v": [str(v) for v in values], "r": int(reverse)})
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            data   = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            values = [
+                model._meta.get_field(name.lstrip("-")).to_python(raw)
+                for name, raw in zip(self.ordering, data["v"], strict=True)
+            ]
+            return values, bool(data.get("r"))
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    # ---------- keyset filter ----------
+    def _seek(self, values, reverse):
+        """
+        (a, b) after (x, y)  ==>  a > x  OR  (a = x AND b > y)
+        direction per field follows `ordering` (flipped when paging backwards)
+        """
+        q, equal = Q(), Q()
+        for name, value in zip(self.ordering, values):
+            field = name.lstrip("-")
+            descending = name.startswith("-") != reverse
+            lookup = "lt" if descending else "gt"
+            q |= equal & Q(**{f"{field}__{lookup}": value})
+            equal &= Q(**{field: value})
+        return q
+
+    def _reversed_ordering(self):
+        return [n[1:] if n.startswith("-") else f"-{n}" for n in self.ordering]
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                size = int(request.query_params[self.page_size_query_param])
+                if size > 0:
+                    return min(size, self.max_page_size)
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def _key(self, obj):
+        return [getattr(obj, name.lstrip("-")) for name in self.ordering]
+
+    # ---------- BasePagination API ----------
+    def _page_query(self, queryset, request):
+        self.request   = request
+        self.page_size = self.get_page_size(request)
+
+        values, reverse = self.decode_cursor(request, queryset.model)
+        order = self._reversed_ordering() if reverse else list(self.ordering)
+
+        queryset = queryset.order_by(*order)
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, reverse))
+        return queryset[: self.page_size + 1], values, reverse
+
+    def _set_page(self, rows, values, reverse):
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+
+        self.page = rows
+        return rows
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset, values, reverse = self._page_query(queryset, request)
+        return self._set_page(list(queryset), values, reverse)
+
+    async def apaginate_queryset(self, queryset, request):
+        """paginate_queryset for async views"""
+        queryset, values, reverse = self._page_query(queryset, request)
+        return self._set_page([obj async for obj in queryset], values, reverse)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self._key(self.page[-1]))
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param,
+            self.encode_cursor(self._key(self.page[0]), reverse=True),
+        )
+
+    def get_paginated_data(self, data):
+        return {
+            "next":     self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results":  data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next":     {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results":  schema,
+            },
+        }
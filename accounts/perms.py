@@ -0,0 +1,245 @@
+# accounts/perms.py
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import aprefetch_related_objects, prefetch_related_objects
+
+from .models import User
+
+# ---------- shared permission cache ----------
+# Entries are keyed by user id + an auth version; any change to groups /
+# permissions / memberships bumps the version, so stale entries are simply
+# never read again (and expire after PERMISSION_CACHE_TTL).  Both live in
+# Django's default cache, which must be shared by every worker process
+# (settings.CACHES; checked by require_shared_cache() at startup) — with a
+# per-process cache the other workers would keep granting a revoked
+# permission until the TTL ran out.
+AUTH_VERSION_KEY = "accounts:auth-ver"           # time_ns() of the last bump
+
+PER_PROCESS_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def require_shared_cache():
+    backend = settings.CACHES.get("default", {}).get("BACKEND", "")
+    if backend in PER_PROCESS_CACHES:
+        raise ImproperlyConfigured(
+            f"CACHES['default'] is {backend}: the permission cache and auth version need a "
+            f"cache shared by every worker process (file-based, Redis, Memcached, database)."
+        )
+
+
+def _new_version():
+    # a fresh token rather than incr(): incr isn't atomic on every backend (two
+    # bumps could land on the same number), and an evicted key must never
+    # come back as a value some process has already cached under
+    return time.time_ns()
+
+
+def _auth_version_steps():
+    version = yield _CacheCall("get", AUTH_VERSION_KEY)
+    if version is None:
+        yield _CacheCall("add", AUTH_VERSION_KEY, _new_version(), None)
+        version = yield _CacheCall("get", AUTH_VERSION_KEY)
+    return version
+
+
+def auth_version():
+    return _run(_auth_version_steps())
+
+
+def auth_version_info():
+    """
+    (version, modified) — the version is the time_ns() of the last bump, so
+    it doubles as the Last-Modified of cached responses and every worker
+    derives the same one
+    """
+    version = auth_version()
+    return version, version / 1e9
+
+
+def _bump():
+    version = _new_version()
+    cache.set(AUTH_VERSION_KEY, version, None)
+    return version
+
+
+def bump_auth_version():
+    """
+    New auth version now, and again once the surrounding transaction commits:
+    a request that read the first bump but loaded the rows before our commit
+    would otherwise cache the old permissions under the new version.
+    """
+    version = _bump()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(_bump)
+    return version
+
+
+def _cache_key(version, user):
+    return f"accounts:perms:{version}:{user.pk}:{int(user.is_superuser)}"
+
+
+def _perm_rows(qs, key):
+    """(key, 'app_label.codename') pairs for a through-table queryset"""
+    return qs.values_list(
+        key, "permission__content_type__app_label", "permission__codename"
+    ).order_by()
+
+
+# The loaders below are written as generators that `yield` each queryset
+# they need and get its rows sent back, so the same logic serves the sync
+# views (_run) and the async ones (_arun) without threads.  Cache lookups
+# are yielded too (_CacheCall): the cache may be a database (settings.CACHES),
+# which async code must reach through the cache's a*() methods.
+class _CacheCall:
+    def __init__(self, method, *args):
+        self.method = method
+        self.args   = args
+
+
+def _run(steps):
+    try:
+        step = next(steps)
+        while True:
+            if isinstance(step, _CacheCall):
+                step = steps.send(getattr(cache, step.method)(*step.args))
+            else:
+                step = steps.send(list(step))
+    except StopIteration as done:
+        return done.value
+
+
+async def _arun(steps):
+    try:
+        step = next(steps)
+        while True:
+            if isinstance(step, _CacheCall):
+                step = steps.send(await getattr(cache, f"a{step.method}")(*step.args))
+            else:
+                step = steps.send([row async for row in step])
+    except StopIteration as done:
+        return done.value
+
+
+def _load_permissions(users, group_ids_of):
+    """{user.pk: (user perms, group perms)} straight from the auth tables"""
+    result = {}
+    regular = [u for u in users if not u.is_superuser]
+
+    user_perms  = defaultdict(set)
+    group_perms = defaultdict(set)
+    if regular:
+        # direct permissions
+        rows = yield _perm_rows(
+            User.user_permissions.through.objects.filter(
+                user_id__in=[u.pk for u in regular]
+            ),
+            "user_id",
+        )
+        for user_id, app_label, codename in rows:
+            user_perms[user_id].add(f"{app_label}.{codename}")
+
+        # group permissions
+        group_ids = {gid for u in regular for gid in group_ids_of[u.pk]}
+        if group_ids:
+            rows = yield _perm_rows(
+                Group.permissions.through.objects.filter(group_id__in=group_ids),
+                "group_id",
+            )
+            for group_id, app_label, codename in rows:
+                group_perms[group_id].add(f"{app_label}.{codename}")
+
+    # superusers get every permission (one query, shared by all of them)
+    all_perms = None
+    if len(regular) != len(users):
+        rows = yield Permission.objects.values_list(
+            "content_type__app_label", "codename"
+        ).order_by()
+        all_perms = frozenset(f"{app_label}.{codename}" for app_label, codename in rows)
+
+    for user in users:
+        if user.is_superuser:
+            result[user.pk] = (all_perms, all_perms)
+        else:
+            from_groups = set()
+            for gid in group_ids_of[user.pk]:
+                from_groups |= group_perms[gid]
+            result[user.pk] = (frozenset(user_perms[user.pk]), frozenset(from_groups))
+    return result
+
+
+def _prime_steps(users, with_groups):
+    active  = [u for u in users if u.is_active]
+    version = yield from _auth_version_steps()
+    keys    = {u.pk: _cache_key(version, u) for u in active}
+    cached  = (yield _CacheCall("get_many", list(keys.values()))) if keys else {}
+
+    misses = [u for u in active if keys[u.pk] not in cached]
+    if misses:
+        group_ids_of = defaultdict(list)
+        if with_groups:
+            for user in misses:
+                group_ids_of[user.pk] = [g.pk for g in user.groups.all()]
+        else:
+            rows = yield User.groups.through.objects.filter(
+                user_id__in=[u.pk for u in misses]
+            ).values_list("user_id", "group_id")
+            for user_id, group_id in rows:
+                group_ids_of[user_id].append(group_id)
+
+        loaded = yield from _load_permissions(misses, group_ids_of)
+        fresh  = {keys[pk]: perms for pk, perms in loaded.items()}
+        yield _CacheCall("set_many", fresh, getattr(settings, "PERMISSION_CACHE_TTL", 300))
+        cached.update(fresh)
+
+    for user in users:
+        if user.is_active:
+            from_user, from_groups = cached[keys[user.pk]]
+            from_user, from_groups = set(from_user), set(from_groups)
+        else:
+            # backend returns set() for inactive users before reading the cache
+            from_user, from_groups = set(), set()
+
+        user._user_perm_cache  = from_user
+        user._group_perm_cache = from_groups
+        user._perm_cache       = from_user | from_groups
+
+    return users
+
+
+def prime_permissions(users, with_groups=True):
+    """
+    Load groups + direct perms + group perms for a whole page of users
+    in a constant number of queries (no matter how many users).
+
+    Permission sets come from the shared cache when possible; only the
+    misses are loaded from the auth tables (in one batch) and written back.
+    Results are stored on the same attributes ModelBackend uses
+    (`_user_perm_cache`, `_group_perm_cache`, `_perm_cache`), so
+    `user.get_all_permissions()` / `has_perm()` don't hit the DB again.
+    `with_groups` also prefetches `user.groups` for GroupMiniSerializer.
+    """
+    users = [u for u in users if u is not None]
+    if not users:
+        return users
+    if with_groups:
+        prefetch_related_objects(users, "groups")
+    return _run(_prime_steps(users, with_groups))
+
+
+async def aprime_permissions(users, with_groups=True):
+    """prime_permissions for async views (async ORM, same queries)"""
+    users = [u for u in users if u is not None]
+    if not users:
+        return users
+    if with_groups:
+        await aprefetch_related_objects(users, "groups")
+    return await _arun(_prime_steps(users, with_groups))
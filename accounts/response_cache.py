@@ -0,0 +1,90 @@
+# accounts/response_cache.py
+"""
+Response cache + conditional GET for the auth-data read endpoints
+(permission list, group list / detail).
+
+Cached bodies are keyed on the auth version (accounts.perms), which every
+group / permission / membership change bumps, so there is nothing to
+invalidate by hand: after a bump the old entries are never read again.
+
+    ETag           "<auth version>-<hash of the request URL>"
+    Last-Modified  time of the last auth version bump — left out while that
+                   is still the current second: HTTP dates have 1 s
+                   resolution, so a second change in the same second would
+                   carry the same date and If-Modified-Since would 304 it
+
+A matching If-None-Match / If-Modified-Since gets a 304 straight away; a
+warm cache hit returns the stored data without touching the ORM.
+Authentication and permission checks still run first (the decorator sits
+under @api_view).
+
+    settings.RESPONSE_CACHE_TTL = 600     # seconds
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.response import Response
+
+from .perms import auth_version_info
+
+
+def _url_hash(request):
+    return hashlib.md5(request.build_absolute_uri().encode()).hexdigest()[:16]
+
+
+def versioned_response(version_info, prefix):
+    """
+    Decorator factory: cache a GET view's 200 response data under
+    `version_info(**view_kwargs)` → (version, unix time it was modified), or
+    None to just run the view.  Used for the auth data here and for the
+    category catalog (api/views.py).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != "GET":
+                return view(request, *args, **kwargs)
+
+            info = version_info(**kwargs)
+            if info is None:
+                return view(request, *args, **kwargs)
+            version, modified = info
+            url_hash = _url_hash(request)
+            headers  = {"ETag": f'"{version}-{url_hash}"'}
+
+            last_modified = int(modified)
+            if last_modified < int(time.time()):
+                headers["Last-Modified"] = http_date(last_modified)
+            else:
+                last_modified = None        # changed this second: ETag only
+
+            not_modified = get_conditional_response(
+                request, etag=headers["ETag"], last_modified=last_modified,
+            )
+            if not_modified is not None:
+                for name, value in headers.items():
+                    not_modified.headers[name] = value
+                return not_modified
+
+            key  = f"{prefix}:{version}:{url_hash}"
+            data = cache.get(key)
+            if data is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                data = response.data
+                cache.set(key, data, getattr(settings, "RESPONSE_CACHE_TTL", 600))
+            return Response(data, status=status.HTTP_200_OK, headers=headers)
+
+        return wrapper
+    return decorator
+
+
+# auth data: permission list, group list / detail
+cached_auth_response = versioned_response(lambda **kwargs: auth_version_info(), "accounts:resp")
@@ -0,0 +1,163 @@
+# accounts/revocation.py
+"""
+Refresh-token revocation store.
+
+Each process keeps the unexpired revoked jti's in memory: a bloom filter
+answers "definitely not revoked" for almost every token, and an exact
+jti → expiry dict confirms the rare positives.  The RevokedToken table is
+the source of truth; each process pulls rows newer than the last one it
+saw at most every SYNC_INTERVAL seconds, so a refresh normally never
+waits on the database for the revocation check.
+
+    settings.TOKEN_REVOCATION = {
+        "SYNC_INTERVAL": 2,          # seconds between incremental DB syncs
+        "BLOOM_CAPACITY": 100_000,
+        "BLOOM_ERROR_RATE": 0.001,
+    }
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size     = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes   = max(1, int(round(self.size / capacity * math.log(2))))
+        self._bits    = bytearray((self.size + 7) // 8)
+        self.count    = 0
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+def exp_to_datetime(exp):
+    return datetime.fromtimestamp(exp, tz=dt_timezone.utc)
+
+
+class RevocationStore:
+    def __init__(self, sync_interval=2, capacity=100_000, error_rate=0.001):
+        self.sync_interval = sync_interval
+        self.capacity      = capacity
+        self.error_rate    = error_rate
+
+        self._lock      = threading.Lock()
+        self._revoked   = {}                   # jti → expires_at
+        self._bloom     = BloomFilter(capacity, error_rate)
+        self._last_id   = 0
+        self._last_sync = None                 # monotonic time of last DB sync
+
+    # ---------- memory ----------
+    def _remember(self, jti, expires_at):
+        if jti not in self._revoked:
+            self._bloom.add(jti)
+        self._revoked[jti] = expires_at
+
+    def _drop_expired(self, now):
+        expired = [jti for jti, exp in self._revoked.items() if exp <= now]
+        for jti in expired:
+            del self._revoked[jti]
+        # bloom filters can't delete — rebuild once it is mostly stale / full
+        if expired and (self._bloom.count > 2 * len(self._revoked) or self._bloom.count > self.capacity):
+            self._bloom = BloomFilter(max(self.capacity, 2 * len(self._revoked)), self.error_rate)
+            for jti in self._revoked:
+                self._bloom.add(jti)
+
+    # ---------- DB sync ----------
+    def sync(self, force=False):
+        """Pull revocations written since the last sync (by any process)."""
+        from .models import RevokedToken
+
+        tick = time.monotonic()
+        with self._lock:
+            if not force and self._last_sync is not None and tick - self._last_sync < self.sync_interval:
+                return
+            self._last_sync = tick
+            last_id = self._last_id
+
+        now  = timezone.now()
+        rows = list(
+            RevokedToken.objects.filter(id__gt=last_id, expires_at__gt=now)
+            .order_by("id").values_list("id", "jti", "expires_at")
+        )
+        with self._lock:
+            for row_id, jti, expires_at in rows:
+                self._remember(jti, expires_at)
+                self._last_id = max(self._last_id, row_id)
+            self._drop_expired(now)
+
+    # ---------- public API ----------
+    def is_revoked(self, jti):
+        self.sync()
+        with self._lock:
+            if jti not in self._bloom:
+                return False
+            expires_at = self._revoked.get(jti)
+        return expires_at is not None and expires_at > timezone.now()
+
+    def revoke(self, jti, expires_at):
+        """
+        Persist + remember a revocation.  Returns False when the jti was
+        already revoked (e.g. two concurrent refreshes of one token).
+        """
+        from .models import RevokedToken
+
+        try:
+            with transaction.atomic():
+                row = RevokedToken.objects.create(jti=jti, expires_at=expires_at)
+        except IntegrityError:
+            with self._lock:
+                self._remember(jti, expires_at)
+            return False
+        with self._lock:
+            self._remember(jti, expires_at)
+            # our own rows don't need to come back on the next sync
+            if row.id == self._last_id + 1:
+                self._last_id = row.id
+        return True
+
+    def purge_expired(self):
+        """Delete expired rows; returns how many were removed."""
+        from .models import RevokedToken
+
+        now = timezone.now()
+        deleted, _ = RevokedToken.objects.filter(expires_at__lte=now).delete()
+        with self._lock:
+            self._drop_expired(now)
+        return deleted
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                conf = getattr(settings, "TOKEN_REVOCATION", {})
+                _store = RevocationStore(
+                    sync_interval=conf.get("SYNC_INTERVAL", 2),
+                    capacity=conf.get("BLOOM_CAPACITY", 100_000),
+                    error_rate=conf.get("BLOOM_ERROR_RATE", 0.001),
+                )
+    return _store
@@ -2,12 +2,17 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from rest_framework_simplejwt.tokens import RefreshToken
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.models import Group, Permission
 from .models import User
-from accounts.helpers import mmt  # ✅ Myanmar time formatter
+from accounts.helpers import mmt_fast as mmt  # ✅ Myanmar time formatter (precompiled)
+from .last_login import record_login
+from .revocation import get_store as get_revocation_store, exp_to_datetime
+from .authentication import resolve_token_user
+from .membership import missing_ids
 from django.utils import timezone    
 
 class CustomTokenObtainPairSerializer(serializers.Serializer):
@@ -30,10 +35,8 @@ class CustomTokenObtainPairSerializer(serializers.Serializer):
         if not user.is_active:
             raise AuthenticationFailed(_("Account is disabled."), code="authorization")
 
-        # ➋  last_login ကို Myanmar time aware datetime နဲ့ သိမ်း
-        user.last_login = timezone.now()           # (settings.TIME_ZONE = 'Asia/Yangon')
-        user.save(update_fields=["last_login"])
-        user.refresh_from_db(fields=["last_login"])  # memory ထဲကို sync
+        # ➋  last_login — buffered, written back in bulk (accounts/last_login.py)
+        record_login(user, timezone.now())         # (settings.TIME_ZONE = 'Asia/Yangon')
 
         refresh = RefreshToken.for_user(user)
 
@@ -52,6 +55,46 @@ class CustomTokenObtainPairSerializer(serializers.Serializer):
         }
 
 
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    TokenRefreshSerializer + our in-memory revocation store
+    (simplejwt's token_blacklist app would hit the DB on every refresh),
+    with the token's user resolved through the user cache.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        jti = refresh[jwt_settings.JTI_CLAIM]
+
+        store = get_revocation_store()
+        if store.is_revoked(jti):
+            raise InvalidToken(_("Token is blacklisted"))
+
+        # same checks as TokenRefreshSerializer, user served from the user cache
+        user_id = refresh.payload.get(jwt_settings.USER_ID_CLAIM, None)
+        if user_id:
+            user = resolve_token_user(user_id)
+            if not jwt_settings.USER_AUTHENTICATION_RULE(user):
+                raise AuthenticationFailed(
+                    self.error_messages["no_active_account"], "no_active_account",
+                )
+
+        data = {"access": str(refresh.access_token)}
+
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            if jwt_settings.BLACKLIST_AFTER_ROTATION:
+                # unique jti in the table → a concurrent refresh of the same token loses
+                if not store.revoke(jti, exp_to_datetime(refresh["exp"])):
+                    raise InvalidToken(_("Token is blacklisted"))
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data["refresh"] = str(refresh)
+
+        return data
+
+
 class UserRegisterSerializer(serializers.ModelSerializer):
     password        = serializers.CharField(write_only=True, style={"input_type": "password"})
     confirm_password = serializers.CharField(write_only=True, style={"input_type": "password"})
@@ -97,7 +140,9 @@ class PermissionSerializer(serializers.ModelSerializer):
 # ========= Main Group Serializer =========
 class GroupSerializer(serializers.ModelSerializer):
     # -------- OUTPUT --------
-    permissions = PermMiniSerializer(many=True, read_only=True)
+    permissions      = PermMiniSerializer(many=True, read_only=True)
+    member_count     = serializers.SerializerMethodField()
+    permission_count = serializers.SerializerMethodField()
 
     # -------- INPUT (IDs only) --------
     permission_ids = serializers.PrimaryKeyRelatedField(
@@ -110,25 +155,74 @@ class GroupSerializer(serializers.ModelSerializer):
 
     class Meta:
         model  = Group
-        fields = ["id", "name", "permissions", "permission_ids"]
+        fields = ["id", "name", "permissions", "permission_ids", "member_count", "permission_count"]
+
+    # counts come annotated from views.group_queryset(); create/update fall back to queries
+    def get_member_count(self, obj):
+        count = getattr(obj, "member_count", None)
+        return obj.user_set.count() if count is None else count
+
+    def get_permission_count(self, obj):
+        count = getattr(obj, "permission_count", None)
+        return len(obj.permissions.all()) if count is None else count
 
     # -------- create / update override --------
     def create(self, validated_data):
         perms = validated_data.pop("permissions", [])   # IDs come via `permission_ids`
         group = Group.objects.create(**validated_data)
         if perms:
-            group.permissions.set(perms)
+            group.permissions.set(perms)                # m2m_changed bumps the auth version
         return group
 
     def update(self, instance, validated_data):
         perms = validated_data.pop("permissions", None)
         instance = super().update(instance, validated_data)
         if perms is not None:                           # if key present → replace
-            instance.permissions.set(perms)
+            instance.permissions.set(perms)             # (post_save / m2m_changed bump the auth version)
         return instance
 
 
 
+# ========= Bulk membership (user_bulk_membership) =========
+class MembershipOpsSerializer(serializers.Serializer):
+    add    = serializers.ListField(child=serializers.IntegerField(), required=False)
+    remove = serializers.ListField(child=serializers.IntegerField(), required=False)
+    set    = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+    def validate(self, attrs):
+        if "set" in attrs and ("add" in attrs or "remove" in attrs):
+            raise serializers.ValidationError("Use either 'set' or 'add'/'remove', not both.")
+        both = set(attrs.get("add", [])) & set(attrs.get("remove", []))
+        if both:
+            raise serializers.ValidationError(f"IDs in both 'add' and 'remove': {sorted(both)}")
+        return attrs
+
+
+class BulkMembershipSerializer(serializers.Serializer):
+    user_ids    = serializers.ListField(child=serializers.UUIDField(), allow_empty=False, max_length=1000)
+    groups      = MembershipOpsSerializer(required=False)
+    permissions = MembershipOpsSerializer(required=False)
+
+    def validate(self, attrs):
+        if not attrs.get("groups") and not attrs.get("permissions"):
+            raise serializers.ValidationError("Send 'groups' and/or 'permissions' operations.")
+
+        # one existence query per model, however many IDs were sent
+        errors = {}
+        checks = {
+            "user_ids":    (User, attrs["user_ids"]),
+            "groups":      (Group, [pk for ids in (attrs.get("groups") or {}).values() for pk in ids]),
+            "permissions": (Permission, [pk for ids in (attrs.get("permissions") or {}).values() for pk in ids]),
+        }
+        for field, (model, ids) in checks.items():
+            missing = missing_ids(model, ids)
+            if missing:
+                errors[field] = [f"Not found: {', '.join(missing)}"]
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
+
+
 class UserListSerializer(serializers.ModelSerializer):
     status      = serializers.SerializerMethodField()
     role        = serializers.SerializerMethodField()
@@ -0,0 +1,56 @@
+# accounts/signals.py
+from django.contrib.auth.models import Group, Permission
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from .models import User
+from .perms import bump_auth_version
+from .user_cache import bump_all_users, bump_user
+from .user_search import ensure_search_index
+
+
+@receiver(post_save, sender=User, dispatch_uid="accounts.user_saved")
+def user_saved(sender, instance, **kwargs):
+    bump_user(instance.pk)
+
+
+@receiver(post_delete, sender=User, dispatch_uid="accounts.user_deleted")
+def user_deleted(sender, instance, **kwargs):
+    bump_user(instance.pk)
+    bump_auth_version()                        # group member counts (cascade skips m2m_changed)
+
+
+@receiver(m2m_changed, sender=User.groups.through, dispatch_uid="accounts.user_groups_changed")
+@receiver(m2m_changed, sender=User.user_permissions.through, dispatch_uid="accounts.user_perms_changed")
+def user_access_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    bump_auth_version()
+    if not reverse:
+        bump_user(instance.pk)                 # user.groups.set(...) etc.
+    elif pk_set:
+        bump_user(*pk_set)                     # group.user_set.add(...)
+    else:
+        bump_all_users()                       # group.user_set.clear()
+
+
+@receiver(m2m_changed, sender=Group.permissions.through, dispatch_uid="accounts.group_perms_changed")
+def group_perms_changed(sender, action, **kwargs):
+    if action.startswith("post_"):
+        bump_auth_version()
+
+
+@receiver(post_save, sender=Group, dispatch_uid="accounts.group_saved")
+@receiver(post_delete, sender=Group, dispatch_uid="accounts.group_deleted")
+@receiver(post_save, sender=Permission, dispatch_uid="accounts.permission_saved")
+@receiver(post_delete, sender=Permission, dispatch_uid="accounts.permission_deleted")
+def auth_data_changed(sender, **kwargs):
+    bump_auth_version()                        # cached group / permission responses
+
+
+# ---------- user search index (accounts/user_search.py) ----------
+@receiver(post_migrate, dispatch_uid="accounts.search_index_migrated")
+def search_index_migrated(sender, using, **kwargs):
+    # a SQLite ALTER that rebuilds accounts_user drops the FTS sync triggers
+    if sender.name == "accounts":
+        ensure_search_index(using)
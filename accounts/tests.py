@@ -1,3 +1,1493 @@
-from django.test import TestCase
+import importlib
+import csv
+import io
+import json
+import os
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import closing
+from datetime import datetime, timedelta, timezone as dt_timezone
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.apps import apps
+from django.contrib.auth import authenticate
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache, caches
+from django.db import connection, connections, transaction
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone, translation
+from django.utils.http import http_date
+from django.http import HttpResponse, QueryDict
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import hashing, importers, last_login, perms, revocation, user_cache, user_search, validators
+from .exporters import export_rows
+from .importers import UserImporter, read_rows
+from .backends import classify_identifier
+from .benchmarks import ENDPOINTS, client_state, run_in_process, seed
+from .helpers import mmt, mmt_fast, mmt_many
+from .models import RevokedToken, User
+from .serializers import UserListSerializer
+from .perms import auth_version, prime_permissions
+from .user_search import icontains_filter, search_filter
+from .views import filter_users
+from ecommerce_Api.middleware import RequestMetricsMiddleware, metrics as request_metrics
+from ecommerce_Api.routers import ReplicaRouter, replica_reads
+from ecommerce_Api import startup
+
+
+def make_user(n, **extra):
+    return User.objects.create_user(
+        username=f"user{n}",
+        email=f"user{n}@example.com",
+        phone=f"+9597{n:08d}",
+        **extra,
+    )
+
+
+class PrimePermissionsTests(TestCase):
+    def setUp(self):
+        self.perms = list(Permission.objects.order_by("id")[:4])
+        self.group = Group.objects.create(name="editors")
+        self.group.permissions.set(self.perms[:2])
+
+        self.users = []
+        for n in range(10):
+            user = make_user(n)
+            user.groups.add(self.group)
+            user.user_permissions.add(self.perms[2 + n % 2])
+            self.users.append(user)
+
+    def test_matches_model_backend(self):
+        expected = {u.pk: u.get_all_permissions() for u in User.objects.all()}
+
+        users = list(User.objects.all())
+        prime_permissions(users)
+        for user in users:
+            self.assertEqual(user.get_all_permissions(), expected[user.pk])
+
+    def test_constant_queries(self):
+        users = list(User.objects.all())
+        # groups, direct perms, group perms
+        with self.assertNumQueries(3):
+            prime_permissions(users)
+            for user in users:
+                user.get_all_permissions()
+                list(user.groups.all())
+
+    def test_superuser_and_inactive(self):
+        admin = make_user(100, is_superuser=True)
+        inactive = make_user(101, is_active=False)
+        inactive.user_permissions.add(self.perms[0])
+
+        prime_permissions([admin, inactive])
+        self.assertEqual(len(admin.get_all_permissions()), Permission.objects.count())
+        self.assertEqual(inactive.get_all_permissions(), set())
+
+
+class UserQueryCountTests(APITestCase):
+    def setUp(self):
+        self.admin = make_user(0, is_staff=True)
+        self.client.force_authenticate(self.admin)
+
+        group = Group.objects.create(name="support")
+        group.permissions.set(Permission.objects.all()[:3])
+        for n in range(1, 8):
+            user = make_user(n)
+            user.groups.add(group)
+            user.user_permissions.add(Permission.objects.all()[5 + n])
+
+    def test_user_list_queries(self):
+        # count, page, groups, direct perms, group perms
+        for page in (1, 2, 3):
+            with self.assertNumQueries(5):
+                res = self.client.get(reverse("user-list"), {"page": page})
+            self.assertEqual(res.status_code, 200)
+
+    def test_user_detail_queries(self):
+        user = User.objects.get(username="user3")
+        # user, groups, direct perms, group perms
+        with self.assertNumQueries(4):
+            res = self.client.get(reverse("user-detail", args=[user.pk]))
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            sorted(res.data["data"]["permissions"]),
+            sorted(user.get_all_permissions()),
+        )
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.admin = make_user(0, is_staff=True)
+        self.client.force_authenticate(self.admin)
+        for n in range(1, 8):
+            make_user(n, is_staff=n % 2 == 0)
+
+    def walk(self, url, params, key="users"):
+        seen = []
+        res = self.client.get(url, params)
+        while True:
+            self.assertEqual(res.status_code, 200)
+            seen.extend(res.data["results"][key])
+            if not res.data["next"]:
+                return seen, res
+            res = self.client.get(res.data["next"])
+
+    def test_walks_every_user_in_order(self):
+        users, _ = self.walk(reverse("user-list"), {"pagination": "cursor"})
+        expected = list(
+            User.objects.order_by("-date_joined", "-id").values_list("username", flat=True)
+        )
+        self.assertEqual([u["username"] for u in users], expected)
+
+    def test_previous_link(self):
+        first = self.client.get(reverse("user-list"), {"pagination": "cursor"})
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+        self.assertEqual(back.data["results"], first.data["results"])
+        self.assertIsNone(back.data["previous"])
+
+    def test_keeps_filters(self):
+        users, _ = self.walk(reverse("user-list"), {"pagination": "cursor", "role": "staff"})
+        self.assertEqual(
+            {u["username"] for u in users},
+            set(User.objects.filter(is_staff=True).values_list("username", flat=True)),
+        )
+
+    def test_no_count_query(self):
+        first = self.client.get(reverse("user-list"), {"pagination": "cursor"})
+        # page, groups (no perms on these users → no group-perm query), direct perms
+        with self.assertNumQueries(3) as ctx:
+            self.client.get(first.data["next"])
+        self.assertFalse(any("COUNT(" in q["sql"] for q in ctx.captured_queries))
+
+    def test_group_list_cursor(self):
+        for n in range(5):
+            Group.objects.create(name=f"g{n}")
+        groups, _ = self.walk(reverse("group-list"), {"pagination": "cursor"}, key="groups")
+        self.assertEqual([g["name"] for g in groups], [f"g{n}" for n in range(5)])
+
+    def test_bad_cursor(self):
+        res = self.client.get(reverse("user-list"), {"cursor": "nope"})
+        self.assertEqual(res.status_code, 404)
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class IdentifierLoginTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="MgMg", email="MgMg@Example.com", phone="+959 7800 00001",
+            password="s3cret-pass",
+        )
+
+    def test_lookup_fields_saved(self):
+        self.assertEqual(self.user.username_lower, "mgmg")
+        self.assertEqual(self.user.email_lower, "mgmg@example.com")
+        self.assertEqual(self.user.phone_e164, "+959780000001")
+
+        self.user.email = "New@Example.com"
+        self.user.save(update_fields=["email"])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.email_lower, "new@example.com")
+
+    def test_classify(self):
+        self.assertEqual(classify_identifier(" A@B.com "), ("email_lower", "a@b.com"))
+        self.assertEqual(classify_identifier("+959780000001"), ("phone_e164", "+959780000001"))
+        self.assertEqual(classify_identifier("MgMg"), ("username_lower", "mgmg"))
+
+    def test_single_indexed_lookup(self):
+        for login in ("mgmg", "MGMG@example.COM", "+959780000001"):
+            with self.assertNumQueries(1) as ctx:
+                user = authenticate(username=login, password="s3cret-pass")
+            self.assertEqual(user, self.user)
+            sql = ctx.captured_queries[0]["sql"]
+            self.assertNotIn("LIKE", sql)
+
+    def test_wrong_password(self):
+        self.assertIsNone(authenticate(username="mgmg", password="nope"))
+
+    def test_username_with_at_sign(self):
+        odd = User.objects.create_user(
+            username="me@home", email="other@example.com", phone="+959780000002",
+            password="s3cret-pass",
+        )
+        self.assertEqual(authenticate(username="ME@home", password="s3cret-pass"), odd)
+
+    def test_case_variants_of_one_username(self):
+        lower = User.objects.create_user(
+            username="mgmg", email="mgmg2@example.com", phone="+959780000003", password="s3cret-pass",
+        )
+        self.assertEqual(authenticate(username="mgmg", password="s3cret-pass"), lower)
+        self.assertEqual(authenticate(username="MgMg", password="s3cret-pass"), self.user)
+        with self.assertLogs("accounts.backends", "WARNING"):
+            self.assertIsNone(authenticate(username="MGMG", password="s3cret-pass"))
+
+    def test_backfill_migration(self):
+        User.objects.update(username_lower="", email_lower="", phone_e164="")
+        migration = importlib.import_module("accounts.migrations.0003_user_lookup_fields")
+        migration.backfill_lookup_fields(apps, SimpleNamespace(connection=connection))
+        self.user.refresh_from_db()
+        self.assertEqual(
+            (self.user.username_lower, self.user.email_lower, self.user.phone_e164),
+            ("mgmg", "mgmg@example.com", "+959780000001"),
+        )
+        # its own frozen normalizer, not the app's
+        self.assertIsNot(migration.normalize_phone, validators.normalize_phone)
+        for value in ("+959 7800 00001", "09780000001", "nope", "", "+95912"):
+            self.assertEqual(migration.normalize_phone(value), validators.normalize_phone(value))
+
+
+class HashingPoolTests(TestCase):
+    def test_rejects_when_full(self):
+        pool = hashing.HashingPool(workers=1, max_queue=0, timeout=5)
+        release = threading.Event()
+        started = threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(5)
+            return "done"
+
+        t = threading.Thread(target=pool.run, args=(slow,))
+        t.start()
+        started.wait(5)
+        with self.assertRaises(hashing.HashingPoolFull):
+            pool.run(lambda: None)
+        self.assertEqual(pool.stats()["running"], 1)
+        release.set()
+        t.join()
+
+        stats = pool.stats()
+        self.assertEqual((stats["completed"], stats["rejected"]), (1, 1))
+        self.assertIsNotNone(stats["hash_ms"]["p50"])
+
+    def wait_idle(self, pool):
+        for _ in range(200):
+            if pool.stats()["running"] == 0 and pool._pending == 0:
+                return
+            time.sleep(0.01)
+
+    def test_timeout_is_503_and_keeps_the_slot(self):
+        pool = hashing.HashingPool(workers=1, max_queue=0, timeout=0.05)
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        with self.assertRaises(hashing.HashingTimeout) as ctx:
+            pool.run(release.wait, 5)
+        self.assertEqual(ctx.exception.status_code, 503)
+        # the hash is still running: its slot stays taken until it finishes
+        with self.assertRaises(hashing.HashingPoolFull) as ctx:
+            pool.run(lambda: None)
+        self.assertNotIsInstance(ctx.exception, hashing.HashingTimeout)
+
+        release.set()
+        self.wait_idle(pool)
+        self.assertEqual(pool.run(lambda: "ok"), "ok")
+        self.assertEqual((pool.stats()["timed_out"], pool.stats()["rejected"]), (1, 1))
+
+    def test_timed_out_queued_hash_is_cancelled(self):
+        pool = hashing.HashingPool(workers=1, max_queue=1, timeout=0.05)
+        release = threading.Event()
+        self.addCleanup(release.set)
+        ran = []
+
+        with self.assertRaises(hashing.HashingTimeout):
+            pool.run(release.wait, 5)
+        with self.assertRaises(hashing.HashingTimeout):
+            pool.run(ran.append, "queued")
+        # cancelled before it ran, so its slot is free again: a timeout, not "full"
+        with self.assertRaises(hashing.HashingTimeout):
+            pool.run(ran.append, "queued again")
+
+        release.set()
+        self.wait_idle(pool)
+        self.assertEqual(ran, [])
+        self.assertEqual(pool.stats()["timed_out"], 3)
+
+    @override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+    def test_make_and_check(self):
+        user = make_user(1, password="s3cret-pass")
+        self.assertTrue(hashing.check_password(user, "s3cret-pass"))
+        self.assertFalse(hashing.check_password(user, "wrong"))
+        self.assertFalse(make_user(2).has_usable_password())
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class HashingPoolEndpointTests(APITestCase):
+    def test_login_503_when_pool_full(self):
+        make_user(1, password="s3cret-pass")
+        full = hashing.HashingPool(workers=1, max_queue=0)
+        full._slots = threading.BoundedSemaphore(1)
+        full._slots.acquire()
+        with mock.patch.object(hashing, "_pool", full):
+            res = self.client.post(
+                reverse("token_obtain_pair"), {"login": "user1", "password": "s3cret-pass"}
+            )
+        self.assertEqual(res.status_code, 503)
+
+    @override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+    def test_failed_logins_never_hash_on_the_request_thread(self):
+        from django.contrib.auth.hashers import MD5PasswordHasher
+        make_user(1, password="s3cret-pass")
+        threads = []
+        encode, verify = MD5PasswordHasher.encode, MD5PasswordHasher.verify
+
+        def record(fn):
+            def wrapper(self, *args):
+                threads.append(threading.current_thread())
+                return fn(self, *args)
+            return wrapper
+
+        with mock.patch.object(MD5PasswordHasher, "encode", record(encode)), \
+                mock.patch.object(MD5PasswordHasher, "verify", record(verify)):
+            for login in ("user1", "nobody", "nobody@example.com", "09123456789"):
+                res = self.client.post(
+                    reverse("token_obtain_pair"), {"login": login, "password": "wrong-pass"}
+                )
+                self.assertEqual(res.status_code, 401, login)
+
+        # wrong password → verify, unknown user → the timing-equaliser encode;
+        # all of them on the pool
+        self.assertGreaterEqual(len(threads), 4)
+        self.assertNotIn(threading.current_thread(), threads)
+        self.assertTrue(all(t.name.startswith("pwhash") for t in threads))
+
+    def test_metrics_admin_only(self):
+        self.client.force_authenticate(make_user(1))
+        self.assertEqual(self.client.get(reverse("hashing-metrics")).status_code, 403)
+        self.client.force_authenticate(make_user(2, is_staff=True))
+        res = self.client.get(reverse("hashing-metrics"))
+        self.assertEqual(res.status_code, 200)
+        self.assertIn("queue_depth", res.data)
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class LastLoginRecorderTests(APITestCase):
+    def setUp(self):
+        self.recorder = last_login.LastLoginRecorder(interval=0, batch_size=3)
+        patcher = mock.patch.object(last_login, "_recorder", self.recorder)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_login_buffers_without_db_write(self):
+        user = make_user(1, password="s3cret-pass")
+        res = self.client.post(
+            reverse("token_obtain_pair"), {"login": "user1", "password": "s3cret-pass"}
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertIsNotNone(res.data["user"]["last_login"])
+
+        user.refresh_from_db()
+        self.assertIsNone(user.last_login)
+        self.assertIn(user.pk, self.recorder.pending())
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.recorder.flush(), 1)
+        user.refresh_from_db()
+        self.assertIsNotNone(user.last_login)
+
+    def test_flushes_at_batch_size(self):
+        users = [make_user(n) for n in range(3)]
+        stamps = [timezone.now() - timedelta(minutes=n) for n in range(3)]
+        with self.assertNumQueries(1):
+            for user, ts in zip(users, stamps):
+                self.recorder.record(user.pk, ts)
+        self.assertEqual(self.recorder.pending(), {})
+        for user, ts in zip(users, stamps):
+            user.refresh_from_db()
+            self.assertEqual(user.last_login, ts)
+
+    def test_keeps_newest(self):
+        user = make_user(1)
+        now = timezone.now()
+        self.recorder.record(user.pk, now)
+        self.recorder.record(user.pk, now - timedelta(hours=1))
+        self.assertEqual(self.recorder.pending()[user.pk], now)
+
+
+class RevocationStoreTests(APITestCase):
+    def setUp(self):
+        self.store = revocation.RevocationStore(sync_interval=60)
+        patcher = mock.patch.object(revocation, "_store", self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = make_user(1)
+
+    def refresh(self, token):
+        return self.client.post(reverse("token_refresh"), {"refresh": str(token)})
+
+    def test_rotated_token_is_revoked(self):
+        token = RefreshToken.for_user(self.user)
+        first = self.refresh(token)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("refresh", first.data)
+        self.assertTrue(RevokedToken.objects.filter(jti=token["jti"]).exists())
+
+        again = self.refresh(token)
+        self.assertEqual(again.status_code, 401)
+        self.assertEqual(self.refresh(first.data["refresh"]).status_code, 200)
+
+    def test_check_skips_db_after_sync(self):
+        self.store.sync(force=True)
+        with self.assertNumQueries(0):
+            for n in range(50):
+                self.assertFalse(self.store.is_revoked(f"jti-{n}"))
+
+    def test_picks_up_other_process_revocations(self):
+        self.store.sync(force=True)
+        RevokedToken.objects.create(
+            jti="from-elsewhere", expires_at=timezone.now() + timedelta(hours=1)
+        )
+        self.assertFalse(self.store.is_revoked("from-elsewhere"))     # not synced yet
+        self.store.sync(force=True)
+        self.assertTrue(self.store.is_revoked("from-elsewhere"))
+
+    def test_expired_entries_purged(self):
+        past = timezone.now() - timedelta(seconds=1)
+        self.store.revoke("old", past)
+        self.store.revoke("live", timezone.now() + timedelta(hours=1))
+        self.assertFalse(self.store.is_revoked("old"))
+        self.assertEqual(self.store.purge_expired(), 1)
+        self.assertEqual(list(RevokedToken.objects.values_list("jti", flat=True)), ["live"])
+
+    def test_bloom_filter(self):
+        bloom = revocation.BloomFilter(1000, 0.01)
+        for n in range(1000):
+            bloom.add(f"in-{n}")
+        self.assertTrue(all(f"in-{n}" in bloom for n in range(1000)))
+        false_hits = sum(f"out-{n}" in bloom for n in range(10000))
+        self.assertLess(false_hits, 300)
+
+
+class CachedJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.cache = user_cache.UserCache(ttl=60)
+        patcher = mock.patch.object(user_cache, "_user_cache", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = make_user(1)
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_warm_request_skips_auth_query(self):
+        url = reverse("permission-list")
+        with self.assertNumQueries(2):            # auth user + permissions
+            self.assertEqual(self.client.get(url).status_code, 200)
+        with self.assertNumQueries(0):            # user cache + response cache
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_fresh_instance_per_request(self):
+        first = self.cache.get(self.user.pk)
+        first._perm_cache = {"leak.me"}
+        self.assertFalse(hasattr(self.cache.get(self.user.pk), "_perm_cache"))
+
+    def test_deactivation_invalidates(self):
+        url = reverse("permission-list")
+        self.client.get(url)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+    def test_delete_invalidates(self):
+        self.client.get(reverse("permission-list"))
+        self.user.delete()
+        self.assertEqual(self.client.get(reverse("permission-list")).status_code, 401)
+
+    def test_group_change_invalidates(self):
+        self.cache.get(self.user.pk)
+        group = Group.objects.create(name="ops")
+        group.user_set.add(self.user)
+        with self.assertNumQueries(1):
+            self.cache.get(self.user.pk)
+
+    def test_other_process_bumps_invalidate(self):
+        self.cache.get(self.user.pk)
+        stamps = [self.cache._stamp(str(self.user.pk))]
+        elsewhere = user_cache.UserCache()            # another worker's process-local cache
+        with mock.patch.object(user_cache, "_user_cache", elsewhere):
+            for _ in range(2):                        # back to back: still two distinct versions
+                user_cache.bump_user(self.user.pk)
+                stamps.append(self.cache._stamp(str(self.user.pk)))
+                user_cache.bump_all_users()
+                stamps.append(self.cache._stamp(str(self.user.pk)))
+        self.assertEqual(len(set(stamps)), 5)
+        with self.assertNumQueries(1):
+            self.cache.get(self.user.pk)
+
+
+class SharedPermissionCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.perms = list(Permission.objects.order_by("id")[:3])
+        self.group = Group.objects.create(name="editors")
+        self.group.permissions.set(self.perms[:1])
+        self.user = make_user(1)
+        self.user.groups.add(self.group)
+
+    def fresh(self):
+        return User.objects.get(pk=self.user.pk)
+
+    def test_has_perm_served_from_cache(self):
+        perm = "%s.%s" % (self.perms[0].content_type.app_label, self.perms[0].codename)
+        self.assertTrue(self.fresh().has_perm(perm))
+        user = self.fresh()
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_perm(perm))
+
+    def test_warm_user_list(self):
+        admin = make_user(0, is_staff=True)
+        self.client.force_authenticate(admin)
+        self.client.get(reverse("user-list"))
+        # count, page, groups — permission sets come from the cache
+        with self.assertNumQueries(3):
+            self.client.get(reverse("user-list"))
+
+    def test_group_permission_change_bumps_version(self):
+        before = auth_version()
+        self.assertEqual(len(self.fresh().get_all_permissions()), 1)
+        self.group.permissions.add(self.perms[1])
+        self.assertGreater(auth_version(), before)
+        self.assertEqual(len(self.fresh().get_all_permissions()), 2)
+
+    def test_revocation_seen_by_other_processes(self):
+        perm = "%s.%s" % (self.perms[0].content_type.app_label, self.perms[0].codename)
+        self.assertTrue(self.fresh().has_perm(perm))            # cached under the current version
+        # another worker: its own cache client on the same backend location
+        other = caches.create_connection("default")
+        before = other.get(perms.AUTH_VERSION_KEY)
+        self.group.permissions.remove(self.perms[0])
+        self.assertNotEqual(other.get(perms.AUTH_VERSION_KEY), before)
+        self.assertFalse(self.fresh().has_perm(perm))
+
+    def test_bumped_again_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            perms.bump_auth_version()
+        self.assertEqual(len(callbacks), 1)
+        version = auth_version()
+        callbacks[0]()
+        self.assertGreater(auth_version(), version)
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_per_process_cache_refused(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, "shared by every worker process"):
+            perms.require_shared_cache()
+
+    def test_membership_and_group_delete_bump(self):
+        admin = make_user(0, is_staff=True)
+        self.client.force_authenticate(admin)
+        self.assertEqual(len(self.fresh().get_all_permissions()), 1)
+
+        self.client.patch(
+            reverse("user-update", args=[self.user.pk]),
+            {"permissions": [self.perms[2].pk]}, format="json",
+        )
+        self.assertEqual(len(self.fresh().get_all_permissions()), 2)
+
+        self.client.delete(reverse("group-delete", args=[self.group.pk]))
+        self.assertEqual(len(self.fresh().get_all_permissions()), 1)
+
+
+class ResponseCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = make_user(0, is_staff=True)
+        self.client.force_authenticate(self.admin)
+        self.group = Group.objects.create(name="editors")
+        self.group.permissions.set(Permission.objects.order_by("id")[:2])
+        # last change a minute ago, so responses carry Last-Modified
+        cache.set(perms.AUTH_VERSION_KEY, time.time_ns() - 60 * 10**9, None)
+
+    def test_warm_requests_skip_the_orm(self):
+        for url in (
+            reverse("permission-list"),
+            reverse("group-list"),
+            reverse("group-detail", args=[self.group.pk]),
+        ):
+            first = self.client.get(url)
+            with self.assertNumQueries(0):
+                second = self.client.get(url)
+            self.assertEqual(second.status_code, 200)
+            self.assertEqual(second.json(), first.json())
+            self.assertEqual(second["ETag"], first["ETag"])
+            self.assertIn("Last-Modified", second)
+
+    def test_conditional_requests(self):
+        url = reverse("permission-list")
+        res = self.client.get(url)
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=res["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified["ETag"], res["ETag"])
+
+        not_modified = self.client.get(url, HTTP_IF_MODIFIED_SINCE=res["Last-Modified"])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_change_in_the_same_second_is_not_hidden(self):
+        url = reverse("permission-list")
+        perms.bump_auth_version()
+        res = self.client.get(url)
+        self.assertNotIn("Last-Modified", res)
+
+        # a client holding a date from this second must not get a 304 for
+        # data that changed again within it
+        Permission.objects.filter(pk=res.json()[0]["id"]).delete()
+        after = self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(time.time()))
+        self.assertEqual(after.status_code, 200)
+        self.assertEqual(len(after.json()), len(res.json()) - 1)
+
+    def test_version_is_shared_by_workers(self):
+        url   = reverse("permission-list")
+        first = self.client.get(url)
+        other = caches.create_connection("default")     # another worker's cache client
+        self.assertEqual(perms.auth_version_info()[0], other.get(perms.AUTH_VERSION_KEY))
+        other.set(perms.AUTH_VERSION_KEY, time.time_ns(), None)
+        self.assertNotEqual(self.client.get(url)["ETag"], first["ETag"])
+
+    def test_group_change_invalidates(self):
+        url = reverse("group-detail", args=[self.group.pk])
+        before = self.client.get(url)
+        self.client.patch(
+            reverse("group-update", args=[self.group.pk]), {"name": "writers"}, format="json",
+        )
+        after = self.client.get(url, HTTP_IF_NONE_MATCH=before["ETag"])
+        self.assertEqual(after.status_code, 200)
+        self.assertNotEqual(after["ETag"], before["ETag"])
+        self.assertEqual(after.json()["detail"]["name"], "writers")
+
+    def test_permission_rows_change_invalidates(self):
+        url = reverse("permission-list")
+        before = self.client.get(url)
+        Permission.objects.filter(pk=before.json()[0]["id"]).delete()
+        after = self.client.get(url)
+        self.assertEqual(len(after.json()), len(before.json()) - 1)
+
+    def test_still_requires_auth(self):
+        self.client.get(reverse("permission-list"))
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(reverse("permission-list")).status_code, 401)
+
+
+class GroupListTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(make_user(0, is_staff=True))
+        self.perms = list(Permission.objects.order_by("id")[:6])
+
+    def make_groups(self, count, start=0):
+        for n in range(start, start + count):
+            group = Group.objects.create(name=f"team{n:03d}")
+            group.permissions.set(self.perms[: n % 6 + 1])
+            for m in range(n % 3):
+                make_user(1000 + n * 10 + m).groups.add(group)
+
+    def list_queries(self, params):
+        cache.clear()                              # skip the response cache
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(reverse("group-list"), params)
+        self.assertEqual(res.status_code, 200)
+        return res, ctx.captured_queries
+
+    def test_fixed_query_count(self):
+        self.make_groups(3)
+        _, few = self.list_queries({"page_size": 50})
+        self.make_groups(30, start=3)
+        _, many = self.list_queries({"page_size": 50})
+        # count, page (with both counts), permissions prefetch
+        self.assertEqual(len(few), 3)
+        self.assertEqual(len(many), 3)
+
+    def test_counts(self):
+        self.make_groups(6)
+        res, _ = self.list_queries({"page_size": 50})
+        for row in res.data["results"]["groups"]:
+            group = Group.objects.get(pk=row["id"])
+            self.assertEqual(row["member_count"], group.user_set.count())
+            self.assertEqual(row["permission_count"], group.permissions.count())
+            self.assertEqual(len(row["permissions"]), row["permission_count"])
+
+    def test_permission_filter_uses_exists(self):
+        self.make_groups(6)
+        wanted = [self.perms[0].pk, self.perms[5].pk]
+        res, queries = self.list_queries({"permissions": f"{wanted[0]},{wanted[1]}", "page_size": 50})
+        self.assertEqual(
+            sorted(g["name"] for g in res.data["results"]["groups"]),
+            sorted(Group.objects.filter(permissions__in=wanted).distinct().values_list("name", flat=True)),
+        )
+        page_sql = queries[1]["sql"].upper()
+        self.assertIn("EXISTS", page_sql)
+        self.assertNotIn("DISTINCT", page_sql)
+
+    def test_detail_counts_and_delete_user(self):
+        self.make_groups(3)
+        group = Group.objects.get(name="team002")
+        url = reverse("group-detail", args=[group.pk])
+        self.assertEqual(self.client.get(url).data["detail"]["member_count"], 2)
+        group.user_set.first().delete()
+        self.assertEqual(self.client.get(url).data["detail"]["member_count"], 1)
+
+
+class UserFilterTests(TestCase):
+    def setUp(self):
+        yangon = ZoneInfo("Asia/Yangon")
+        joined = [
+            datetime(2024, 1, 31, 23, 59, tzinfo=yangon),
+            datetime(2024, 2, 1, 0, 0, tzinfo=yangon),
+            datetime(2024, 2, 29, 23, 59, 59, tzinfo=yangon),
+            datetime(2024, 3, 1, 0, 0, tzinfo=yangon),
+        ]
+        for n, when in enumerate(joined):
+            make_user(n, date_joined=when, is_staff=n % 2 == 0)
+
+    def usernames(self, query):
+        return sorted(filter_users(User.objects.all(), QueryDict(query)).values_list("username", flat=True))
+
+    def test_half_open_myanmar_days(self):
+        self.assertEqual(self.usernames("start_date=2024-02-01&end_date=2024-02-29"), ["user1", "user2"])
+        self.assertEqual(self.usernames("start_date=2024-03-01"), ["user3"])
+        self.assertEqual(self.usernames("end_date=2024-01-31"), ["user0"])
+
+    def test_dates_at_the_ends_of_the_calendar(self):
+        # 0001-01-01 00:00 MMT is before datetime.min in UTC, 9999-12-31 has no next day
+        everyone = ["user0", "user1", "user2", "user3"]
+        self.assertEqual(self.usernames("start_date=0001-01-01"), everyone)
+        self.assertEqual(self.usernames("end_date=9999-12-31"), everyone)
+        self.assertEqual(self.usernames("start_date=0001-01-01&end_date=9999-12-31"), everyone)
+        self.assertEqual(self.usernames("start_date=9999-12-31"), [])
+        self.assertEqual(self.usernames("end_date=0001-01-01"), [])
+
+    def test_no_date_function_in_sql(self):
+        sql = str(filter_users(User.objects.all(), QueryDict("start_date=2024-02-01&end_date=2024-02-29")).query)
+        self.assertNotIn("django_datetime_cast_date", sql)
+
+    def test_common_filters_use_indexes(self):
+        shapes = {
+            "status=active&start_date=2024-01-01&end_date=2024-02-01": "user_active_joined_idx",
+            "is_active=false":                                       "user_active_joined_idx",
+            "role=staff&start_date=2024-01-01":                      "user_role_joined_idx",
+            "role=admin":                                            "user_role_joined_idx",
+            "role=user&end_date=2024-02-01":                         "user_role_joined_idx",
+            "start_date=2024-01-01&end_date=2024-01-31":             "user_joined_id_idx",
+        }
+        for query, index in shapes.items():
+            with self.subTest(query):
+                qs = filter_users(User.objects.all(), QueryDict(query)).order_by("-date_joined", "-id")
+                self.assertIn(index, qs.explain())
+
+
+class UserSearchIndexTests(APITestCase):
+    def setUp(self):
+        names = ["Aung_Kyaw", "aungmyo", "Su%Su", "Thandar", 'quo"te', "MgMg"]
+        for n, name in enumerate(names):
+            User.objects.create_user(
+                username=name, email=f"{name.lower()}@mail{n}.com", phone=f"+9597{n:08d}",
+            )
+
+    def found(self, q):
+        return sorted(filter_users(User.objects.all(), {"search": q}).values_list("username", flat=True))
+
+    def expected(self, q):
+        return sorted(User.objects.filter(icontains_filter(q)).values_list("username", flat=True))
+
+    def test_same_results_as_icontains(self):
+        for q in ["aung", "AUNG", "kyaw", "_ky", "g_k", "%su", "su%", 'o"t', "mail3", "97000", "zz9", "ng", "m", "@mail"]:
+            with self.subTest(q):
+                self.assertEqual(self.found(q), self.expected(q))
+        self.assertEqual(self.found("aung"), ["Aung_Kyaw", "aungmyo"])
+
+    def test_fts_used_for_three_chars_and_up(self):
+        self.assertIn("accounts_user_fts", str(User.objects.filter(search_filter("aung")).query))
+        self.assertNotIn("accounts_user_fts", str(User.objects.filter(search_filter("au")).query))
+
+    def test_broad_terms_keep_plain_scan(self):
+        with mock.patch.object(user_search, "MIN_CANDIDATES", 2):
+            self.assertNotIn("accounts_user_fts", str(User.objects.filter(search_filter("@mail")).query))
+            self.assertIn("accounts_user_fts", str(User.objects.filter(search_filter("kyaw")).query))
+            self.assertEqual(self.found("@mail"), self.expected("@mail"))
+
+    def test_index_follows_writes(self):
+        user = User.objects.get(username="Thandar")
+        user.username, user.email = "Zawgyi", "zawgyi@mail3.com"
+        user.save()
+        self.assertEqual(self.found("zawg"), ["Zawgyi"])
+        self.assertEqual(self.found("thand"), [])
+
+        User.objects.filter(username="MgMg").update(email="renamed@example.org")
+        self.assertEqual(self.found("renamed"), ["MgMg"])
+
+        User.objects.bulk_create([User(username="bulkperson", email="b@x.com", phone="+959700000099")])
+        self.assertEqual(self.found("kperso"), ["bulkperson"])
+
+        User.objects.filter(username__in=["Zawgyi", "bulkperson"]).delete()
+        self.assertEqual(self.found("zawg"), [])
+        self.assertEqual(self.found("kperso"), [])
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM accounts_user_fts")
+            self.assertEqual(cursor.fetchone()[0], User.objects.count())
+
+    def test_lost_triggers_fall_back_then_get_rebuilt(self):
+        # what SQLite's copy / drop / rename of accounts_user does to them
+        with connection.cursor() as cursor:
+            for name in user_search.TRIGGERS:
+                cursor.execute(f"DROP TRIGGER {name}")
+        User.objects.create_user(username="Newcomer", email="new@mail9.com", phone="+959700000077")
+        User.objects.filter(username="MgMg").update(username="Renamed")
+
+        self.assertNotIn("accounts_user_fts", str(User.objects.filter(search_filter("newcomer")).query))
+        self.assertEqual(self.found("newcomer"), ["Newcomer"])
+
+        self.assertTrue(user_search.ensure_search_index())      # post_migrate does this
+        self.assertFalse(user_search.ensure_search_index())
+        self.assertIn("accounts_user_fts", str(User.objects.filter(search_filter("newcomer")).query))
+        self.assertEqual(self.found("newcomer"), ["Newcomer"])
+        self.assertEqual(self.found("renamed"), ["Renamed"])
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM accounts_user_fts")
+            self.assertEqual(cursor.fetchone()[0], User.objects.count())
+
+    def test_user_list_search(self):
+        self.client.force_authenticate(make_user(99, is_staff=True))
+        response = self.client.get(reverse("user-list"), {"search": "AUNG"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 2)
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        cache.clear()
+        self.admin = make_user(0, is_staff=True)
+        for n in range(1, 4):
+            make_user(n)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_read_views_use_replica(self):
+        for name in ("user-list", "group-list", "permission-list"):
+            with self.subTest(name), \
+                    CaptureQueriesContext(connections["replica"]) as replica, \
+                    CaptureQueriesContext(connections["default"]) as default:
+                self.assertEqual(self.client.get(reverse(name)).status_code, 200)
+            self.assertTrue(replica.captured_queries)
+            self.assertFalse(default.captured_queries)
+
+    def test_writes_and_transactions_stay_on_default(self):
+        router = ReplicaRouter()
+        with replica_reads():
+            self.assertEqual(router.db_for_read(User), "replica")
+            self.assertEqual(router.db_for_write(User), "default")
+            with transaction.atomic():
+                self.assertIsNone(router.db_for_read(User))
+        self.assertIsNone(router.db_for_read(User))
+
+        with replica_reads(), CaptureQueriesContext(connections["replica"]) as replica:
+            user = User.objects.get(username="user1")
+            user.email = "mya@example.com"
+            user.save()
+        self.assertTrue(all(q["sql"].lstrip().startswith("SELECT") for q in replica.captured_queries))
+        self.assertEqual(User.objects.get(pk=user.pk).email, "mya@example.com")
+
+
+@override_settings(CACHES={
+    "default": {
+        "BACKEND":  "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "django_cache",
+    },
+})
+class DatabaseCacheTests(APITestCase):
+    """settings.CACHES as deployed (the test runner swaps in a file cache)"""
+    databases = {"default", "cache"}
+
+    @classmethod
+    def setUpTestData(cls):
+        migration = importlib.import_module("accounts.migrations.0008_cache_table")
+        migration.forward(apps, SimpleNamespace(connection=connection))
+
+    def setUp(self):
+        cache.clear()
+        self.admin = make_user(0, is_staff=True)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.admin).access_token}"
+        )
+
+    def test_cache_has_its_own_database(self):
+        with self.assertNumQueries(0, using="default"):
+            cache.set("accounts:test", 1)
+            self.assertEqual(cache.get("accounts:test"), 1)
+        with connections["cache"].cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM django_cache WHERE cache_key LIKE %s", ["%accounts:test"])
+            self.assertEqual(cursor.fetchone()[0], 1)
+        with replica_reads():                     # never a lagging replica
+            self.assertEqual(ReplicaRouter().db_for_read(cache.cache_model_class), "cache")
+
+    def test_async_views_reach_the_cache_off_the_event_loop(self):
+        make_user(1)
+        for name, args, params in (
+            ("async-user-list",   (),               {"search": "user"}),
+            ("async-user-detail", (self.admin.pk,), None),
+            ("async-group-list",  (),               None),
+        ):
+            with self.subTest(name=name):
+                self.assertEqual(self.client.get(reverse(name, args=args), params).status_code, 200)
+        self.assertIsNotNone(cache.get(perms.AUTH_VERSION_KEY))
+
+
+class SQLiteJournalModeTests(SimpleTestCase):
+    def scratch(self, options):
+        from django.db.backends.sqlite3.base import DatabaseWrapper
+
+        workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, workdir, ignore_errors=True)
+        path = f"{workdir}/db.sqlite3"
+        sqlite3.connect(path).close()
+        wrapper = DatabaseWrapper(
+            {**connections["default"].settings_dict, "NAME": path, "OPTIONS": options}, "scratch",
+        )
+        self.addCleanup(wrapper.close)
+        return path, wrapper
+
+    def journal_mode(self, path):
+        with closing(sqlite3.connect(path)) as db:
+            return db.execute("PRAGMA journal_mode").fetchone()[0]
+
+    def test_connections_leave_the_file_alone(self):
+        # a checked-in db.sqlite3 mustn't change because a command opened it
+        for alias in ("default", "replica"):
+            path, wrapper = self.scratch(settings.DATABASES[alias]["OPTIONS"])
+            with wrapper.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            self.assertEqual(self.journal_mode(path), "delete")
+
+    def test_migration_sets_wal_once(self):
+        migration = importlib.import_module("accounts.migrations.0007_sqlite_wal")
+        self.assertFalse(migration.Migration.atomic)
+        path, wrapper = self.scratch({})
+        migration.forward(apps, SimpleNamespace(connection=wrapper))
+        self.assertEqual(self.journal_mode(path), "wal")
+        migration.backward(apps, SimpleNamespace(connection=wrapper))
+        self.assertEqual(self.journal_mode(path), "delete")
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class EndpointQueryBudgetTests(APITestCase):
+    """accounts.benchmarks.ENDPOINTS budgets, at two sizes — a count that grows with the data fails"""
+
+    def setUp(self):
+        patcher = mock.patch.object(last_login, "_recorder", last_login.LastLoginRecorder(interval=0))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def check_budgets(self, scale):
+        cache.clear()
+        state = client_state(scale, seed(scale))
+        for name, spec in ENDPOINTS.items():
+            with self.subTest(endpoint=name):
+                result = run_in_process(name, state, 2 if spec["slow"] else 6)
+                self.assertEqual(result["errors"], 0)
+                self.assertLessEqual(result["max_queries"], spec["queries"])
+
+    def test_small(self):
+        self.check_budgets(5)
+
+    def test_larger(self):
+        self.check_budgets(120)
+
+
+@override_settings(
+    REQUEST_METRICS={"SAMPLE_RATE": 1.0, "N_PLUS_ONE": 5},
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+)
+class RequestMetricsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        request_metrics.reset()
+        self.admin = make_user(0, is_staff=True, password="s3cret-pass")
+        for n in range(1, 8):
+            make_user(n)
+        self.client.force_authenticate(self.admin)
+        patcher = mock.patch.object(last_login, "_recorder", last_login.LastLoginRecorder(interval=0))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def log_record(self, logs):
+        return json.loads(logs.records[-1].getMessage())
+
+    def test_server_timing_and_log_line(self):
+        with self.assertLogs("ecommerce_Api.requests", "INFO") as logs:
+            res = self.client.get(reverse("user-list"))
+        self.assertRegex(res["Server-Timing"], r'^db;dur=[\d.]+;desc="\d+ queries", serializer;dur=[\d.]+, total;dur=')
+        record = self.log_record(logs)
+        self.assertEqual(record["route"], "GET /api/users/")
+        self.assertEqual(record["status"], 200)
+        self.assertGreater(record["queries"], 0)
+        self.assertEqual(record["n_plus_one"], [])     # permissions are primed per page
+        self.assertEqual(logs.records[-1].levelname, "INFO")
+
+    def test_flags_per_row_permission_queries(self):
+        def unprimed_list(request):
+            data = UserListSerializer(User.objects.order_by("username"), many=True).data
+            return HttpResponse(json.dumps(data, default=str))
+
+        middleware = RequestMetricsMiddleware(unprimed_list)
+        with self.assertLogs("ecommerce_Api.requests", "WARNING") as logs:
+            res = middleware(RequestFactory().get("/users/"))
+        record = self.log_record(logs)
+        self.assertIn("N+1", res["Server-Timing"])
+        self.assertTrue(record["n_plus_one"])
+        self.assertGreaterEqual(record["n_plus_one"][0]["count"], User.objects.count())
+        self.assertGreater(record["serializer_ms"], 0)
+
+    def test_duplicates_counted(self):
+        def twice(request):
+            list(User.objects.filter(username="user1"))
+            list(User.objects.filter(username="user1"))
+            return HttpResponse("ok")
+
+        with self.assertLogs("ecommerce_Api.requests", "INFO") as logs:
+            RequestMetricsMiddleware(twice)(RequestFactory().get("/x/"))
+        self.assertEqual(self.log_record(logs)["duplicates"], 1)
+
+    def test_hash_time_on_login(self):
+        self.client.force_authenticate(None)
+        res = self.client.post(reverse("token_obtain_pair"), {"login": "user0", "password": "s3cret-pass"})
+        self.assertEqual(res.status_code, 200)
+        self.assertIn("hash;dur=", res["Server-Timing"])
+
+    async def test_async_stack_stays_async(self):
+        async def view(request):
+            # an ORM call from an async view, as the async_api endpoints make them
+            await sync_to_async(lambda: list(User.objects.filter(username="user1")))()
+            return HttpResponse("ok")
+
+        middleware = RequestMetricsMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        with self.assertLogs("ecommerce_Api.requests", "INFO") as logs:
+            res = await middleware(RequestFactory().get("/x/"))
+        self.assertIn('desc="1 queries"', res["Server-Timing"])
+        self.assertEqual(self.log_record(logs)["queries"], 1)
+
+        self.assertFalse(iscoroutinefunction(RequestMetricsMiddleware(lambda request: HttpResponse())))
+
+    @override_settings(REQUEST_METRICS={"SAMPLE_RATE": 0})
+    def test_unsampled_requests_only_feed_histograms(self):
+        res = self.client.get(reverse("group-list"))
+        self.assertNotIn("Server-Timing", res)
+        route = request_metrics.snapshot()["routes"]["GET /api/groups/"]
+        self.assertEqual((route["count"], route["sampled"]), (1, 0))
+
+    def test_metrics_endpoint(self):
+        for _ in range(3):
+            self.client.get(reverse("group-list"))
+        data = self.client.get(reverse("request-metrics")).data
+        route = data["routes"]["GET /api/groups/"]
+        self.assertEqual(route["count"], 3)
+        self.assertEqual(sum(route["histogram"].values()), 3)
+        self.assertIsNotNone(route["p95_ms"])
+
+        self.client.force_authenticate(make_user(50))
+        self.assertEqual(self.client.get(reverse("request-metrics")).status_code, 403)
+
+
+class BulkMembershipTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(make_user(0, is_staff=True))
+        self.groups = [Group.objects.create(name=f"team{n}") for n in range(3)]
+        self.perms  = list(Permission.objects.order_by("id")[:3])
+        self.users  = [make_user(n) for n in range(1, 41)]
+
+    def post(self, users, **ops):
+        return self.client.post(
+            reverse("user-bulk-membership"),
+            {"user_ids": [str(u.pk) for u in users], **ops}, format="json",
+        )
+
+    def test_add_remove_set(self):
+        self.users[0].groups.add(self.groups[0])
+        res = self.post(
+            self.users[:10],
+            groups={"add": [self.groups[0].pk, self.groups[1].pk]},
+            permissions={"add": [self.perms[0].pk]},
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["users"], 10)
+        self.assertEqual(res.data["groups"], {"added": 19, "removed": 0})
+        self.assertEqual(res.data["permissions"], {"added": 10, "removed": 0})
+        self.assertEqual(self.groups[1].user_set.count(), 10)
+
+        res = self.post(self.users[:5], groups={"remove": [self.groups[1].pk]})
+        self.assertEqual(res.data["groups"], {"added": 0, "removed": 5})
+
+        res = self.post(self.users[:10], groups={"set": [self.groups[2].pk]})
+        self.assertEqual(res.data["groups"], {"added": 10, "removed": 15})
+        for user in self.users[:10]:
+            self.assertEqual([g.pk for g in user.groups.all()], [self.groups[2].pk])
+
+    def test_queries_do_not_grow_with_users(self):
+        def count(users, group):
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.post(users, groups={"add": [group.pk]}, permissions={"set": [self.perms[1].pk]})
+            self.assertEqual(res.status_code, 200)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(count(self.users[:3], self.groups[0]), count(self.users[3:40], self.groups[1]))
+
+    def test_caches_are_invalidated(self):
+        user = self.users[0]
+        self.assertEqual(User.objects.get(pk=user.pk).get_all_permissions(), set())
+        group_url = reverse("group-detail", args=[self.groups[0].pk])
+        self.assertEqual(self.client.get(group_url).data["detail"]["member_count"], 0)
+
+        self.post([user], permissions={"add": [self.perms[0].pk]}, groups={"add": [self.groups[0].pk]})
+        self.assertEqual(len(User.objects.get(pk=user.pk).get_all_permissions()), 1)
+        self.assertEqual(self.client.get(group_url).data["detail"]["member_count"], 1)
+
+    def test_validation(self):
+        self.assertEqual(self.post(self.users[:1]).status_code, 400)
+        res = self.post(self.users[:1], groups={"add": [9999]})
+        self.assertIn("groups", res.data)
+        res = self.post(self.users[:1], groups={"set": [self.groups[0].pk], "add": [self.groups[1].pk]})
+        self.assertEqual(res.status_code, 400)
+        self.assertFalse(Group.objects.filter(user__in=self.users).exists())
+
+
+class MMTFormatterTests(TestCase):
+    def sample(self):
+        rng = random.Random(7)
+        start = datetime(1930, 1, 1, tzinfo=dt_timezone.utc)
+        dts = [start + timedelta(seconds=rng.randrange(110 * 365 * 86400)) for _ in range(3000)]
+        # midnight / noon edges in Yangon, and non-UTC aware inputs
+        dts += [
+            datetime(2025, 6, 26, 17, 30, tzinfo=dt_timezone.utc),      # 00:00 MMT
+            datetime(2025, 6, 26, 5, 30, tzinfo=dt_timezone.utc),       # 12:00 MMT
+            datetime(2025, 6, 26, 5, 29, 59, tzinfo=dt_timezone.utc),   # 11:59:59 AM
+            datetime(2025, 1, 1, 9, 0, tzinfo=dt_timezone(timedelta(hours=-5))),
+            datetime(1945, 5, 2, 18, 0, tzinfo=dt_timezone.utc),
+        ]
+        return dts
+
+    def test_byte_identical(self):
+        dts = self.sample()
+        expected = [mmt(d) for d in dts]
+        self.assertEqual([mmt_fast(d) for d in dts], expected)
+        self.assertEqual(mmt_many(dts + [None]), expected + [None])
+        self.assertIsNone(mmt_fast(None))
+
+    def test_other_zone_and_language(self):
+        dts = self.sample()[:200]
+        with timezone.override("Europe/Paris"):
+            self.assertEqual(mmt_many(dts), [mmt(d) for d in dts])
+        with translation.override("de"):
+            self.assertEqual([mmt_fast(d) for d in dts], [mmt(d) for d in dts])
+
+
+class PhoneValidationTests(TestCase):
+    def test_lazy_import(self):
+        code = (
+            "import sys, django; django.setup(); import accounts.validators; "
+            "print('phonenumbers' in sys.modules)"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=settings.BASE_DIR, capture_output=True, text=True,
+            env={"DJANGO_SETTINGS_MODULE": "ecommerce_Api.settings", "PATH": ""},
+        )
+        self.assertEqual(out.stdout.strip(), "False", out.stderr)
+
+    def test_messages_and_cache(self):
+        validators.check_phone.cache_clear()
+        validators.validate_phone_number("+959780000001")
+        with self.assertRaisesMessage(ValidationError, "Invalid phone number format."):
+            validators.validate_phone_number("0978")
+        with self.assertRaisesMessage(ValidationError, "Invalid Phone Number."):
+            validators.validate_phone_number("+95 12345")
+        validators.validate_phone_number("+959780000001")
+        self.assertEqual(validators.check_phone.cache_info().hits, 1)
+
+    def test_batch(self):
+        values = ["+959780000001", "nope", "+959780000001", "", "+1 650 253 0000"]
+        self.assertEqual(validators.check_phone_numbers(values), [
+            ("+959780000001", None),
+            (None, validators.INVALID_FORMAT),
+            ("+959780000001", None),
+            (None, validators.INVALID_FORMAT),
+            ("+16502530000", None),
+        ])
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class UserImportTests(APITestCase):
+    CSV = (
+        "username,email,phone,password\n"
+        "aung,aung@example.com,+959780000101,pw-aung\n"
+        "bad-phone,bp@example.com,12,pw\n"
+        "mya,mya@example.com,+959780000102,\n"
+        "aung,dup@example.com,+959780000103,pw\n"
+        "taken,taken@example.com,+959780000104,pw\n"
+    )
+
+    def setUp(self):
+        User.objects.create_user(username="user99", email="taken@example.com", phone="+959780000199")
+
+    def test_batches_and_report(self):
+        importer = UserImporter(batch_size=2, processes=0)
+        report = importer.run(read_rows(io.StringIO(self.CSV), "csv"))
+
+        self.assertEqual((report["processed"], report["created"], report["failed"]), (5, 2, 3))
+        self.assertEqual(
+            {e["row"]: sorted(e["errors"]) for e in report["errors"]},
+            {3: ["phone"], 5: ["username"], 6: ["email"]},
+        )
+        aung = User.objects.get(username="aung")
+        self.assertTrue(aung.check_password("pw-aung"))
+        self.assertEqual(aung.phone_e164, "+959780000101")
+        self.assertFalse(User.objects.get(username="mya").has_usable_password())
+
+    def test_jsonl(self):
+        lines = [
+            json.dumps({"username": "kyaw", "email": "kyaw@example.com", "phone": "+959780000201", "password": "x"}),
+            "not json",
+        ]
+        report = UserImporter(processes=0).run(read_rows(io.StringIO("\n".join(lines)), "jsonl"))
+        self.assertEqual((report["created"], report["failed"]), (1, 1))
+
+    def test_phone_duplicates_and_length(self):
+        csv_text = (
+            "username,email,phone,password\n"
+            "spaced,spaced@example.com,+95 9 780 000 199,pw\n"       # user99's number, formatted
+            "first,first@example.com,+959780000301,pw\n"
+            "again,again@example.com,+95 9780000301,pw\n"
+        )
+        report = UserImporter(processes=0).run(read_rows(io.StringIO(csv_text), "csv"))
+        self.assertEqual(report["created"], 1)
+        self.assertEqual(
+            {e["row"]: e["errors"]["phone"] for e in report["errors"]},
+            {
+                2: ["Ensure this field has no more than 15 characters."],
+                4: ["Duplicate value in import file."],
+            },
+        )
+
+        report = UserImporter(processes=0).run(read_rows(io.StringIO(
+            "username,email,phone,password\nnew,new@example.com,+95 9780000199,pw\n"
+        ), "csv"))
+        self.assertEqual(report["errors"][0]["errors"], {"phone": ["User with this phone already exists."]})
+
+    def test_conflict_fails_only_its_row(self):
+        importer = UserImporter(processes=0)
+        clean = importer._clean
+
+        def clean_then_race(batch):
+            valid = clean(batch)
+            # registered between the uniqueness check and the insert
+            User.objects.create_user(username="taken", email="racer@example.com", phone="+959780000198")
+            return valid
+
+        with mock.patch.object(importer, "_clean", clean_then_race):
+            report = importer.run(read_rows(io.StringIO(
+                "username,email,phone,password\n"
+                "ok1,ok1@example.com,+959780000401,pw\n"
+                "taken,t2@example.com,+959780000402,pw\n"
+                "ok2,ok2@example.com,+959780000403,pw\n"
+            ), "csv"))
+        self.assertEqual((report["created"], report["failed"]), (2, 1))
+        self.assertEqual(report["errors"][0]["row"], 3)
+        self.assertEqual(User.objects.filter(username__in=["ok1", "ok2"]).count(), 2)
+
+    def test_small_upload_hashes_in_process(self):
+        self.client.force_authenticate(make_user(1, is_staff=True))
+        upload = SimpleUploadedFile("users.csv", self.CSV.encode())
+        with mock.patch.object(importers, "_new_pool") as new_pool:
+            res = self.client.post(reverse("user-import"), {"file": upload}, format="multipart")
+        self.assertEqual(res.data["created"], 2)
+        new_pool.assert_not_called()
+        self.assertTrue(User.objects.get(username="aung").password.startswith("md5$"))
+
+    @override_settings(USER_IMPORT={"PROCESSES": 2, "POOL_MIN_ROWS": 0})
+    def test_endpoint_with_shared_process_pool(self):
+        self.addCleanup(setattr, importers, "_pool", None)
+        self.addCleanup(lambda: importers._pool and importers._pool[0].shutdown())
+        self.client.force_authenticate(make_user(1, is_staff=True))
+        for n in (1, 2):
+            upload = SimpleUploadedFile("users.csv", (
+                f"username,email,phone,password\npooled{n},pooled{n}@example.com,+95978000050{n},pw\n"
+            ).encode())
+            res = self.client.post(reverse("user-import"), {"file": upload}, format="multipart")
+            self.assertEqual(res.data["created"], 1)
+        pool = importers._pool
+        self.assertEqual(pool[1], 2)
+        self.assertIs(importers.get_import_pool(), pool)      # one pool, reused by every upload
+        # hashed in spawned workers → real settings, not this test's override
+        self.assertTrue(User.objects.get(username="pooled2").password.startswith("pbkdf2_sha256$"))
+
+
+class UserExportTests(APITestCase):
+    def setUp(self):
+        self.admin = make_user(0, is_staff=True)
+        self.client.force_authenticate(self.admin)
+        group = Group.objects.create(name="sales")
+        group.permissions.set(Permission.objects.all()[:2])
+        for n in range(1, 6):
+            user = make_user(n, is_active=n != 3)
+            user.groups.add(group)
+
+    def body(self, res):
+        return b"".join(res.streaming_content).decode()
+
+    def test_csv_with_filters(self):
+        res = self.client.get(reverse("user-export"), {"status": "active", "role": "user"})
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.streaming)
+        rows = list(csv.DictReader(io.StringIO(self.body(res))))
+        self.assertEqual([r["username"] for r in rows], ["user1", "user2", "user4", "user5"])
+        self.assertEqual(rows[0]["groups"], "sales")
+        self.assertEqual(len(rows[0]["permissions"].split("|")), 2)
+
+    def test_ndjson_matches_user_list(self):
+        res = self.client.get(reverse("user-export"), {"output": "ndjson", "search": "user2"})
+        exported = [json.loads(line) for line in self.body(res).splitlines()]
+        listed = self.client.get(reverse("user-list"), {"search": "user2"}).data["results"]["users"]
+        self.assertEqual(len(exported), 1)
+        for key in ("username", "date_joined", "last_login", "status", "role", "groups"):
+            self.assertEqual(exported[0][key], json.loads(json.dumps(listed[0][key])))
+        self.assertEqual(exported[0]["permissions"], sorted(listed[0]["permissions"]))
+
+    def test_queries_per_chunk_not_per_row(self):
+        cache.clear()
+        queryset = User.objects.order_by("date_joined", "id")
+        # one streamed users query + per chunk of 2: groups, direct perms, group perms
+        with self.assertNumQueries(1 + 3 * 3):
+            rows = list(export_rows(queryset, chunk_size=2))
+        self.assertEqual(len(rows), 6)
+
+    def test_bad_output(self):
+        self.assertEqual(self.client.get(reverse("user-export"), {"output": "xml"}).status_code, 400)
+
+
+class AsyncViewTests(APITestCase):
+    def setUp(self):
+        self.admin = make_user(0, is_staff=True)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.admin).access_token}"
+        )
+        group = Group.objects.create(name="support")
+        group.permissions.set(Permission.objects.order_by("id")[:3])
+        for n in range(1, 6):
+            user = make_user(n)
+            user.groups.add(group)
+            user.user_permissions.add(Permission.objects.order_by("id")[5 + n])
+        Group.objects.create(name="empty")
+
+    def assertSameAsSync(self, name, args=(), params=None):
+        sync_res  = self.client.get(reverse(name, args=args), params)
+        async_res = self.client.get(reverse(f"async-{name}", args=args), params)
+        self.assertEqual(async_res.status_code, sync_res.status_code)
+        sync_body = json.loads(sync_res.content.decode().replace("/async/", "/"))
+        self.assertEqual(json.loads(async_res.content.decode().replace("/async/", "/")), sync_body)
+        return async_res
+
+    def test_same_bodies_as_sync_views(self):
+        user = User.objects.get(username="user3")
+        group = Group.objects.get(name="support")
+        self.assertSameAsSync("user-list", params={"page": 2})
+        self.assertSameAsSync("user-list", params={"pagination": "cursor", "role": "user"})
+        # 3+ characters → the FTS probe (a DB query) runs, off the event loop
+        self.assertEqual(self.assertSameAsSync("user-list", params={"search": "user"}).json()["count"], 6)
+        self.assertSameAsSync("user-list", params={"search": "user4", "pagination": "cursor"})
+        self.assertSameAsSync("user-list", params={"search": "us"})
+        self.assertSameAsSync("user-detail", args=[user.pk])
+        self.assertSameAsSync("group-list", params={"page_size": 1, "page": 2})
+        self.assertSameAsSync("group-list", params={"pagination": "cursor", "search": "sup"})
+        self.assertSameAsSync("group-detail", args=[group.pk])
+        self.assertSameAsSync("permission-list")
+
+    def test_errors_match_sync_views(self):
+        self.assertSameAsSync("user-list", params={"page": 99})
+        self.assertSameAsSync("user-list", params={"start_date": "nope"})
+        self.assertSameAsSync("group-list", params={"permissions": "x"})
+        self.assertSameAsSync("group-detail", args=[9999])
+
+        res = self.client.post(reverse("async-user-list"))
+        self.assertEqual(res.status_code, 405)
+
+        self.client.credentials()
+        res = self.client.get(reverse("async-user-list"))
+        self.assertEqual(res.status_code, 401)
+        self.assertIn("WWW-Authenticate", res.headers)
+
+    def test_user_list_queries(self):
+        self.client.get(reverse("async-user-list"))        # warm the user cache
+        # count, page, groups, direct perms, group perms
+        with self.assertNumQueries(5):
+            res = self.client.get(reverse("async-user-list"), {"page": 2})
+        self.assertEqual(res.status_code, 200)
+
+    async def test_runs_on_the_event_loop(self):
+        token = await sync_to_async(lambda: str(RefreshToken.for_user(self.admin).access_token))()
+        res = await self.async_client.get(
+            reverse("async-permission-list"), headers={"Authorization": f"Bearer {token}"}
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.json()), await Permission.objects.acount())
+
+
+class StartupBudgetTests(SimpleTestCase):
+    def test_import_phases(self):
+        # deterministic: which modules load when, whatever the host's load
+        report  = startup.probe()
+        imports = report["imports"]
+        self.assertEqual(startup.check_budget(report, limits=False), [])
+        self.assertEqual(imports["accounts.models"]["phase"], "boot")
+        self.assertEqual(imports["rest_framework_simplejwt.settings"]["phase"], "urls")
+        self.assertNotIn("phonenumbers", imports)
+        self.assertNotIn("ckeditor.fields", imports)
+
+    @skipUnless(os.environ.get("STARTUP_BUDGET_CHECK"),
+                "wall-clock / RSS budget: STARTUP_BUDGET_CHECK=1 or `manage.py profile_startup --check`")
+    def test_cold_start_within_budget(self):
+        report = startup.profile(repeat=3, memory=False)            # median run
+        self.assertEqual(startup.check_budget(report), [])
+
+    def test_check_budget(self):
+        report = {
+            "boot_ms": 120.0, "total_ms": 900.0, "rss_mb": 40.0, "boot_modules": 700,
+            "imports": {
+                "django.test":  {"phase": "boot"},
+                "phonenumbers": {"phase": "urls"},
+                "js_asset":     {"phase": "urls"},
+            },
+        }
+        budget = {"BOOT_MS": 200, "TOTAL_MS": 800, "RSS_MB": 64, "BOOT_MODULES": 680,
+                  "DEFERRED": ["django.test", "phonenumbers"], "ON_DEMAND": ["js_asset", "ckeditor.fields"]}
+        self.assertEqual(startup.check_budget(report, budget), [
+            "boot + urls: 900.0 > budget 800",
+            "boot modules: 700 > budget 680",
+            "django.test imported at boot (listed in DEFERRED)",
+            "js_asset imported by startup + URLconf (listed in ON_DEMAND)",
+        ])
+        self.assertEqual(startup.check_budget(report, budget, limits=False), [
+            "django.test imported at boot (listed in DEFERRED)",
+            "js_asset imported by startup + URLconf (listed in ON_DEMAND)",
+        ])
+
+    def test_simplejwt_still_installed(self):
+        # translations keep working; only the eager models import is skipped
+        self.assertTrue(apps.is_installed("rest_framework_simplejwt"))
+        self.assertIsNone(apps.get_app_config("rest_framework_simplejwt").models_module)
@@ -3,6 +3,7 @@ from django.urls import path
 from accounts.views import CustomTokenObtainPairView
 from rest_framework_simplejwt.views import TokenRefreshView
 from .views import *
+from . import async_views
 
 urlpatterns = [
     path("auth/login/", CustomTokenObtainPairView.as_view(), name="token_obtain_pair"),
@@ -10,6 +11,9 @@ urlpatterns = [
 
     path("register/", register_user, name="register"),
     path('users/', user_list, name='user-list'),
+    path('users/import/', user_import, name='user-import'),
+    path('users/export/', user_export, name='user-export'),
+    path('users/bulk-membership/', user_bulk_membership, name='user-bulk-membership'),
     path('users/<uuid:pk>/', user_detail, name='user-detail'),
     path('users/<uuid:pk>/update/', user_update, name='user-update'),
     path('users/<uuid:pk>/delete/', user_delete, name='user-delete'),
@@ -21,4 +25,14 @@ urlpatterns = [
     path('groups/<int:pk>/delete/', group_delete, name='group-delete'),
 
     path('permissions/', permission_list_view, name='permission-list'),
+
+    path('metrics/hashing/', hashing_metrics, name='hashing-metrics'),
+    path('metrics/requests/', request_metrics, name='request-metrics'),
+
+    # ⚡ native async (ASGI) versions of the read endpoints
+    path('async/users/', async_views.user_list, name='async-user-list'),
+    path('async/users/<uuid:pk>/', async_views.user_detail, name='async-user-detail'),
+    path('async/groups/', async_views.group_list, name='async-group-list'),
+    path('async/groups/<int:pk>/', async_views.group_detail, name='async-group-detail'),
+    path('async/permissions/', async_views.permission_list_view, name='async-permission-list'),
 ]
\ No newline at end of file
@@ -0,0 +1,154 @@
+# accounts/user_cache.py
+"""
+Short-lived, process-local cache of User rows for request authentication.
+
+Entries hold raw column values (a fresh User instance is built per request,
+so per-request state like `_perm_cache` never leaks between requests) plus
+the version they were loaded at.  Versions live in Django's cache framework:
+
+    accounts:user-ver:<id>   bumped when that user changes
+    accounts:user-gen        bumped for changes we can't pin to one user
+
+That cache is shared by every worker (settings.CACHES, checked at startup
+by perms.require_shared_cache), so an invalidation in one process is seen
+by all of them on their next lookup.  A bump writes a fresh time_ns()
+token rather than incr()ing: incr isn't atomic on every backend, and two
+bumps landing on the same number could leave a stale row looking current.
+
+    settings.USER_CACHE = {"TTL": 30, "MAX_SIZE": 10_000}
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router
+
+GEN_KEY = "accounts:user-gen"
+
+
+def _ver_key(user_id):
+    return f"accounts:user-ver:{user_id}"
+
+
+def _version_ttl():
+    # a per-user version only has to outlive the entries stamped before it
+    # (USER_CACHE TTL); once it expires it reads as 0 again, which no live
+    # entry loaded before the bump can still carry
+    return max(3600, 10 * get_user_cache().ttl)
+
+
+def bump_user(*user_ids):
+    """Invalidate cached rows for these users (every process)."""
+    if user_ids:
+        token = time.time_ns()
+        cache.set_many({_ver_key(user_id): token for user_id in user_ids}, _version_ttl())
+    get_user_cache().discard(*user_ids)
+
+
+def bump_all_users():
+    cache.set(GEN_KEY, time.time_ns(), None)
+    get_user_cache().clear()
+
+
+class UserCache:
+    def __init__(self, ttl=30, max_size=10_000):
+        self.ttl      = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()       # str(user_id) → (stamp, loaded_at, values)
+        self._lock    = threading.Lock()
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def _model():
+        from .models import User
+        return User
+
+    @staticmethod
+    def _stamp_of(key, versions):
+        return versions.get(GEN_KEY, 0), versions.get(_ver_key(key), 0)
+
+    def _stamp(self, key):
+        return self._stamp_of(key, cache.get_many([GEN_KEY, _ver_key(key)]))
+
+    async def _astamp(self, key):
+        # the cache may be a database (settings.CACHES): async code goes through aget_many
+        return self._stamp_of(key, await cache.aget_many([GEN_KEY, _ver_key(key)]))
+
+    def _build(self, values):
+        User = self._model()
+        attnames = [f.attname for f in User._meta.concrete_fields]
+        return User.from_db(router.db_for_read(User), attnames, values)
+
+    def _hit(self, key, stamp, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == stamp and now - entry[1] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+        return None
+
+    def _store(self, key, stamp, now, values):
+        with self._lock:
+            self._entries[key] = (stamp, now, values)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _row_query(self, user_id):
+        User = self._model()
+        attnames = [f.attname for f in User._meta.concrete_fields]
+        return User.objects.filter(pk=user_id).values_list(*attnames)
+
+    def get(self, user_id):
+        """Return a User for `user_id` (fresh instance), or None if it doesn't exist."""
+        key, now = str(user_id), time.monotonic()
+        stamp  = self._stamp(key)
+        values = self._hit(key, stamp, now)
+        if values is None:
+            values = self._row_query(user_id).first()
+            if values is None:
+                return None
+            self._store(key, stamp, now, values)
+        return self._build(values)
+
+    async def aget(self, user_id):
+        """`get` for async views — a hit costs one version lookup, no row query."""
+        key, now = str(user_id), time.monotonic()
+        stamp  = await self._astamp(key)
+        values = self._hit(key, stamp, now)
+        if values is None:
+            values = await self._row_query(user_id).afirst()
+            if values is None:
+                return None
+            self._store(key, stamp, now, values)
+        return self._build(values)
+
+    def discard(self, *user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_user_cache = None
+_user_cache_lock = threading.Lock()
+
+
+def get_user_cache():
+    global _user_cache
+    if _user_cache is None:
+        with _user_cache_lock:
+            if _user_cache is None:
+                conf = getattr(settings, "USER_CACHE", {})
+                _user_cache = UserCache(
+                    ttl=conf.get("TTL", 30),
+                    max_size=conf.get("MAX_SIZE", 10_000),
+                )
+    return _user_cache
@@ -0,0 +1,131 @@
+# accounts/user_search.py
+"""
+?search= for user_list / user_export without a full table scan.
+
+`icontains` over username / email / phone is a leading-wildcard LIKE, so
+every row is read.  On SQLite the 0006 migration keeps an FTS5 trigram
+table in sync with accounts_user; a search first asks it for candidate
+ids (an index lookup), then the usual icontains runs on those candidates
+only — so results are exactly what icontains alone would return (the
+trigram match folds case more widely than LIKE, never more narrowly).
+
+The index only pays off for selective terms: joining ~10k+ candidates
+back to accounts_user costs more than one sequential LIKE scan.  So a
+capped probe (≤ 2% of the table, at least 1000 rows) asks the FTS table
+first and broad terms ("gmail") keep the plain scan.
+
+Trigrams need 3+ characters; shorter terms and other backends use plain
+icontains (on PostgreSQL the pg_trgm indexes from 0006 serve it directly).
+
+SQLite rebuilds accounts_user for most ALTERs (copy, drop, rename), and the
+drop takes the sync triggers with it.  The probe only answers "selective"
+while all three triggers exist, so a search falls back to icontains rather
+than miss new rows; post_migrate (accounts/signals.py) recreates them with
+ensure_search_index(), which also re-fills the index from the table.
+"""
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import User
+
+MIN_FTS_LENGTH = 3
+MIN_CANDIDATES = 1000       # always use the index below this many matches
+CANDIDATE_SHARE = 50        # ... or below 1/50 of the table
+
+TRIGGERS = {
+    "accounts_user_search_ai": """CREATE TRIGGER IF NOT EXISTS accounts_user_search_ai AFTER INSERT ON accounts_user BEGIN
+        INSERT INTO accounts_user_search_ids (user_id) VALUES (new.id);
+        INSERT INTO accounts_user_fts (rowid, username, email, phone)
+        VALUES ((SELECT id FROM accounts_user_search_ids WHERE user_id = new.id),
+                new.username, new.email, new.phone);
+    END""",
+    "accounts_user_search_ad": """CREATE TRIGGER IF NOT EXISTS accounts_user_search_ad AFTER DELETE ON accounts_user BEGIN
+        DELETE FROM accounts_user_fts
+        WHERE rowid = (SELECT id FROM accounts_user_search_ids WHERE user_id = old.id);
+        DELETE FROM accounts_user_search_ids WHERE user_id = old.id;
+    END""",
+    "accounts_user_search_au": """CREATE TRIGGER IF NOT EXISTS accounts_user_search_au AFTER UPDATE OF username, email, phone ON accounts_user BEGIN
+        UPDATE accounts_user_fts
+        SET username = new.username, email = new.email, phone = new.phone
+        WHERE rowid = (SELECT id FROM accounts_user_search_ids WHERE user_id = old.id);
+    END""",
+}
+
+_TRIGGERS_SQL = (
+    "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'accounts_user' "
+    f"AND name IN ({', '.join(repr(name) for name in TRIGGERS)})"
+)
+
+# writes made while the triggers were missing are unknown: re-fill from the table
+_REFILL = [
+    "DELETE FROM accounts_user_search_ids WHERE user_id NOT IN (SELECT id FROM accounts_user)",
+    "INSERT INTO accounts_user_search_ids (user_id) "
+    "SELECT id FROM accounts_user WHERE id NOT IN (SELECT user_id FROM accounts_user_search_ids)",
+    "DELETE FROM accounts_user_fts",
+    """INSERT INTO accounts_user_fts (rowid, username, email, phone)
+       SELECT s.id, u.username, u.email, u.phone
+       FROM accounts_user u JOIN accounts_user_search_ids s ON s.user_id = u.id""",
+]
+
+# 1 if the sync triggers are all there and the term matches fewer rows than
+# the cap; MAX(id) of the rowid table is an O(1) estimate of the table size
+_SELECTIVE_SQL = (
+    "WITH cap(n) AS (SELECT MAX(%s, COALESCE(MAX(id), 0) / %s) FROM accounts_user_search_ids) "
+    f"SELECT ({_TRIGGERS_SQL}) = {len(TRIGGERS)} "
+    "AND (SELECT COUNT(*) FROM (SELECT rowid FROM accounts_user_fts "
+    "WHERE accounts_user_fts MATCH %s LIMIT (SELECT n FROM cap))) < (SELECT n FROM cap)"
+)
+
+_CANDIDATES_SQL = (
+    "SELECT user_id FROM accounts_user_search_ids WHERE id IN ("
+    "SELECT rowid FROM accounts_user_fts WHERE accounts_user_fts MATCH %s)"
+)
+
+
+def _fts_phrase(term):
+    """term as one FTS5 string: matched as a substring, no query syntax"""
+    return '"' + term.replace('"', '""') + '"'
+
+
+def icontains_filter(term):
+    return Q(username__icontains=term) | Q(email__icontains=term) | Q(phone__icontains=term)
+
+
+def ensure_search_index(using=None):
+    """
+    Recreate missing sync triggers (SQLite, once 0006 has run) and re-fill
+    the index → True if anything had to be repaired.
+    """
+    connection = connections[using or router.db_for_write(User)]
+    if connection.vendor != "sqlite":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'accounts_user_fts'")
+        if cursor.fetchone() is None:
+            return False                        # not migrated that far (yet)
+        cursor.execute(_TRIGGERS_SQL)
+        if cursor.fetchone()[0] == len(TRIGGERS):
+            return False
+        with transaction.atomic(using=connection.alias):
+            for sql in [*TRIGGERS.values(), *_REFILL]:
+                cursor.execute(sql)
+    return True
+
+
+def uses_fts(term, using=None):
+    """SQLite, 3+ characters, sync triggers in place and a selective term (one small probe query)"""
+    connection = connections[using or router.db_for_read(User)]
+    if connection.vendor != "sqlite" or len(term) < MIN_FTS_LENGTH:
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(_SELECTIVE_SQL, [MIN_CANDIDATES, CANDIDATE_SHARE, _fts_phrase(term)])
+        return bool(cursor.fetchone()[0])
+
+
+def search_filter(term, using=None):
+    """Q for users whose username, email or phone contains `term` (case-insensitive)."""
+    like = icontains_filter(term)
+    if not uses_fts(term, using):
+        return like
+    return Q(pk__in=RawSQL(_CANDIDATES_SQL, [_fts_phrase(term)])) & like
@@ -1,10 +1,63 @@
-import phonenumbers
+from functools import lru_cache
+
 from django.core.exceptions import ValidationError
 
-def validate_phone_number(value):
+# phonenumbers pulls in large metadata tables — it is imported on first use,
+# and results are memoized so repeat numbers never get parsed twice.
+PHONE_CACHE_SIZE = 8192
+
+INVALID_NUMBER = "Invalid Phone Number."
+INVALID_FORMAT = "Invalid phone number format."
+
+
+def _phonenumbers():
+    import phonenumbers
+    return phonenumbers
+
+
+@lru_cache(maxsize=PHONE_CACHE_SIZE)
+def check_phone(value):
+    """
+    Parse + validate once per distinct value.
+    Returns (e164, None) for a valid number, (None, error message) otherwise.
+    """
+    phonenumbers = _phonenumbers()
     try:
         z = phonenumbers.parse(value, None)
-        if not phonenumbers.is_valid_number(z):
-            raise ValidationError("Invalid Phone Number.")
     except phonenumbers.NumberParseException:
-        raise ValidationError("Invalid phone number format.")
\ No newline at end of file
+        return None, INVALID_FORMAT
+    if not phonenumbers.is_valid_number(z):
+        return None, INVALID_NUMBER
+    return phonenumbers.format_number(z, phonenumbers.PhoneNumberFormat.E164), None
+
+
+def check_phone_numbers(values):
+    """
+    Batch form of `check_phone` for bulk registration / imports:
+    returns [(e164, error), ...] in input order, each distinct value parsed once.
+    """
+    results = {}
+    for value in values:
+        if value not in results:
+            results[value] = check_phone(value) if value else (None, INVALID_FORMAT)
+    return [results[value] for value in values]
+
+
+def validate_phone_number(value):
+    _, error = check_phone(value)
+    if error:
+        raise ValidationError(error)
+
+
+def normalize_phone(value):
+    """
+    Return the E.164 form of `value` ("+959xxxxxxxxx") or None when it is
+    not a parseable, valid phone number.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if not (value[0] == "+" or value[0].isdigit()):
+        return None
+    e164, _ = check_phone(value)
+    return e164
@@ -6,15 +6,29 @@ from .serializers import CustomTokenObtainPairSerializer
 from rest_framework_simplejwt.tokens import RefreshToken
 from .serializers import *
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny,IsAuthenticated
+from rest_framework.permissions import AllowAny,IsAuthenticated,IsAdminUser
 from .models import User
-from .helpers import mmt  
+from .helpers import mmt_fast as mmt, mmt_day_start
+from .perms import prime_permissions, bump_auth_version
+from .hashing import get_pool as get_hashing_pool
+from .membership import apply_membership
+from .importers import FORMATS as IMPORT_FORMATS, UserImporter, guess_format, read_rows, text_stream
+from .exporters import EXPORT_FORMATS, export_rows, stream_csv, stream_ndjson
+from django.conf import settings
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from datetime import datetime
+from datetime import datetime, timedelta, timezone as dt_timezone
 from rest_framework.pagination import PageNumberPagination
-from django.db.models import Q
+from .pagination import KeysetPagination, wants_cursor
+from .response_cache import cached_auth_response
+from .user_search import search_filter
+from ecommerce_Api.middleware import metrics as request_metrics_store
+from ecommerce_Api.routers import use_replica
+from django.db.models import Count, Exists, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
 import json
 from rest_framework import permissions
+from rest_framework.exceptions import ParseError
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
@@ -115,18 +129,32 @@ def register_user(request):
 #     })
 
 
-@api_view(["GET"])
-def user_list(request):
-    queryset = User.objects.all()
+def _flags(**flags):
+    """
+    Boolean filters as explicit `col = %s` comparisons.  A plain
+    filter(is_active=True) renders as a bare `WHERE "is_active"`, which
+    SQLite won't match against the (is_active, date_joined) style indexes.
+    """
+    return Q(**{field: Value(value) for field, value in flags.items()})
+
+
+def _utc_day_start(day, days=0):
+    """00:00 Myanmar time on `day` + `days`, in UTC; None when that's outside datetime's range"""
+    try:
+        return mmt_day_start(day + timedelta(days=days)).astimezone(dt_timezone.utc)
+    except OverflowError:
+        return None
+
 
-    # 🔍 search
-    q = request.query_params.get("search")
+def filter_users(queryset, params):
+    """
+    user_list filters (search / booleans / status / role / date range),
+    shared with user_export.  Bad dates raise ParseError → 400 {"detail": ...}.
+    """
+    # 🔍 search — icontains, narrowed by the trigram index first (user_search.py)
+    q = params.get("search")
     if q:
-        queryset = queryset.filter(
-            Q(username__icontains=q) |
-            Q(email__icontains=q) |
-            Q(phone__icontains=q)
-        )
+        queryset = queryset.filter(search_filter(q, using=queryset.db))
 
     # 🔧 boolean filters
     bool_params = {
@@ -135,48 +163,68 @@ def user_list(request):
         "is_superuser": "is_superuser",
     }
     for param, field in bool_params.items():
-        val = request.query_params.get(param)
+        val = params.get(param)
         if val is not None:
-            queryset = queryset.filter(**{field: val.lower() == "true"})
+            queryset = queryset.filter(_flags(**{field: val.lower() == "true"}))
 
     # status (derived)
-    status_param = request.query_params.get("status")
+    status_param = params.get("status")
     if status_param:
-        queryset = queryset.filter(is_active=(status_param.lower() == "active"))
+        queryset = queryset.filter(_flags(is_active=(status_param.lower() == "active")))
 
     # role (derived)
-    role = request.query_params.get("role")
+    role = params.get("role")
     if role:
         role = role.lower()
         if role == "admin":
-            queryset = queryset.filter(is_superuser=True)
+            queryset = queryset.filter(_flags(is_superuser=True))
         elif role == "staff":
-            queryset = queryset.filter(is_staff=True, is_superuser=False)
+            queryset = queryset.filter(_flags(is_superuser=False, is_staff=True))
         elif role == "user":
-            queryset = queryset.filter(is_staff=False, is_superuser=False)
+            queryset = queryset.filter(_flags(is_superuser=False, is_staff=False))
 
-    # 📅 date range filter — start_date & end_date on date_joined
-    start_date = request.query_params.get("start_date")
-    end_date   = request.query_params.get("end_date")
+    # 📅 date range filter — start_date & end_date on date_joined (Myanmar days)
+    # half-open range [start 00:00, end+1 00:00) on the raw column, so the
+    # date_joined indexes can be used (no DATE() per row).  A bound past
+    # datetime's range (0001-01-01 in UTC, the day after 9999-12-31) excludes
+    # nothing and is dropped.
+    start_date = params.get("start_date")
+    end_date   = params.get("end_date")
 
     if start_date:
         try:
             sd = datetime.fromisoformat(start_date).date()
-            queryset = queryset.filter(date_joined__date__gte=sd)
         except ValueError:
-            return Response({"detail": "start_date format must be YYYY-MM-DD"}, status=400)
+            raise ParseError("start_date format must be YYYY-MM-DD")
+        since = _utc_day_start(sd)
+        if since is not None:
+            queryset = queryset.filter(date_joined__gte=since)
 
     if end_date:
         try:
             ed = datetime.fromisoformat(end_date).date()
-            queryset = queryset.filter(date_joined__date__lte=ed)
         except ValueError:
-            return Response({"detail": "end_date format must be YYYY-MM-DD"}, status=400)
+            raise ParseError("end_date format must be YYYY-MM-DD")
+        until = _utc_day_start(ed, days=1)
+        if until is not None:
+            queryset = queryset.filter(date_joined__lt=until)
+
+    return queryset
+
+
+@api_view(["GET"])
+@use_replica
+def user_list(request):
+    queryset = filter_users(User.objects.all(), request.query_params)
 
-    # 📄 pagination
-    paginator = PageNumberPagination()
+    # 📄 pagination — ?pagination=cursor → keyset on (date_joined, id), no COUNT
+    if wants_cursor(request):
+        paginator = KeysetPagination(ordering=("-date_joined", "-id"))
+    else:
+        paginator = PageNumberPagination()
     paginator.page_size = 2
     page = paginator.paginate_queryset(queryset, request)
+    prime_permissions(page)         # groups + perms for the whole page in fixed queries
 
     serializer = UserListSerializer(page, many=True)
 
@@ -186,9 +234,54 @@ def user_list(request):
     })
 
 
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def user_export(request):
+    """
+    Stream every user matching the user_list filters as CSV (default) or
+    NDJSON (?output=ndjson).  No pagination, no COUNT.
+    """
+    output = request.query_params.get("output", "csv").lower()
+    if output not in EXPORT_FORMATS:
+        return Response({"detail": "output must be csv or ndjson"},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    queryset = filter_users(User.objects.all(), request.query_params).order_by("date_joined", "id")
+    rows = export_rows(queryset)
+    body = stream_csv(rows) if output == "csv" else stream_ndjson(rows)
+
+    response = StreamingHttpResponse(body, content_type=EXPORT_FORMATS[output])
+    response["Content-Disposition"] = f'attachment; filename="users.{output}"'
+    return response
+
+
+@api_view(["POST"])
+@permission_classes([IsAdminUser])
+def user_import(request):
+    """
+    Bulk create users from an uploaded CSV / JSON Lines file (`file`).
+    `file_format` (csv|jsonl) overrides the guess from the file name.
+    """
+    upload = request.FILES.get("file")
+    if upload is None:
+        return Response({"detail": "file is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+    fmt = request.data.get("file_format") or guess_format(upload.name)
+    if fmt not in IMPORT_FORMATS:
+        return Response({"detail": "file_format must be csv or jsonl"},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    # shared, bounded pool; a small file never starts it
+    importer = UserImporter(pool_min_rows=getattr(settings, "USER_IMPORT", {}).get("POOL_MIN_ROWS", 500))
+    report   = importer.run(read_rows(text_stream(upload.file), fmt))
+    return Response({"message": "User import finished.", **report}, status=status.HTTP_200_OK)
+
+
 @api_view(['GET'])
+@use_replica
 def user_detail(request, pk):
     user = get_object_or_404(User, pk=pk)
+    prime_permissions([user])
     serializer = UserListSerializer(user)
     return Response({
         "message": "User detail retrieved successfully.",
@@ -241,6 +334,8 @@ def user_update(request, pk):
             user.groups.set(group_ids)
         if perm_ids is not None:
             user.user_permissions.set(perm_ids)
+        if group_ids is not None or perm_ids is not None:
+            bump_auth_version()                # shared permission cache
 
         return Response({"message": "User updated successfully.",
                          "data": serializer.data})
@@ -250,6 +345,27 @@ def user_update(request, pk):
 
 
 
+@api_view(["POST"])
+@permission_classes([IsAdminUser])
+def user_bulk_membership(request):
+    """
+    Add / remove / replace groups and direct permissions for many users in
+    one transaction:
+
+        {"user_ids": [...],
+         "groups":      {"add": [1, 2], "remove": [3]},
+         "permissions": {"set": [10, 11]}}
+    """
+    serializer = BulkMembershipSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    data    = serializer.validated_data
+    summary = apply_membership(data["user_ids"], data)
+    return Response({"message": "Memberships updated successfully.", **summary},
+                    status=status.HTTP_200_OK)
+
+
 @api_view(['DELETE'])
 def user_delete(request, pk):
     user = get_object_or_404(User, pk=pk)
@@ -259,33 +375,67 @@ def user_delete(request, pk):
 
 
 
-@api_view(["GET"])
-def group_list(request):
-    queryset = Group.objects.all()
+def _count_of(through, fk):
+    """correlated COUNT(*) over an m2m through table, 0 when there are no rows"""
+    rows = (
+        through.objects.filter(**{fk: OuterRef("pk")})
+        .order_by().values(fk).annotate(n=Count("*")).values("n")
+    )
+    return Coalesce(Subquery(rows, output_field=IntegerField()), 0)
+
+
+def group_queryset():
+    """
+    Groups with member_count / permission_count annotated in the same
+    SELECT and the nested permissions loaded by one prefetch — a page of
+    groups always costs the same number of queries.
+    """
+    return Group.objects.annotate(
+        member_count=_count_of(User.groups.through, "group_id"),
+        permission_count=_count_of(Group.permissions.through, "group_id"),
+    ).prefetch_related("permissions").order_by("id")
 
+
+def filter_groups(queryset, params):
+    """group_list filters, shared with the async views"""
     # 🔍 search by name
-    search = request.query_params.get("search")
+    search = params.get("search")
     if search:
         queryset = queryset.filter(name__icontains=search)
 
     # 🔧 filter by permission IDs (?permissions=5,6 or ?permissions=5&permissions=6)
-    perm_param = request.query_params.get("permissions")
-    perm_list  = request.query_params.getlist("permissions")
-
     # handle both comma‑string & repeated params
-    if perm_param and not perm_list:
-        # e.g. permissions=5,6
-        perm_list = [x.strip() for x in perm_param.split(",") if x.strip()]
+    perm_list = [
+        x.strip() for value in params.getlist("permissions")
+        for x in value.split(",") if x.strip()
+    ]
 
     if perm_list:
         try:
             perm_ids = [int(p) for p in perm_list]
-            queryset = queryset.filter(permissions__id__in=perm_ids).distinct()
         except ValueError:
-            return Response({"detail": "permissions must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+            raise ParseError("permissions must be integers")
+        # EXISTS instead of JOIN + DISTINCT — one row per group, no dedup pass
+        queryset = queryset.filter(Exists(
+            Group.permissions.through.objects.filter(
+                group_id=OuterRef("pk"), permission_id__in=perm_ids,
+            )
+        ))
+
+    return queryset
 
-    # 📄 pagination
-    paginator = PageNumberPagination()
+
+@api_view(["GET"])
+@cached_auth_response
+@use_replica
+def group_list(request):
+    queryset = filter_groups(group_queryset(), request.query_params)
+
+    # 📄 pagination — ?pagination=cursor → keyset on id, no COUNT
+    if wants_cursor(request):
+        paginator = KeysetPagination(ordering=("id",))
+    else:
+        paginator = PageNumberPagination()
     paginator.page_size = 2                       # default page size
     paginator.page_size_query_param = "page_size"  # allow ?page_size=xx
     page = paginator.paginate_queryset(queryset, request)
@@ -311,8 +461,10 @@ def group_create(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['GET'])
+@cached_auth_response
+@use_replica
 def group_detail(request, pk):
-    group = get_object_or_404(Group, pk=pk)
+    group = get_object_or_404(group_queryset(), pk=pk)
     serializer = GroupSerializer(group)
     return Response({
         "message": "Group detail fetched successfully.",
@@ -342,6 +494,7 @@ def group_update(request, pk):
 def group_delete(request, pk):
     group = get_object_or_404(Group, pk=pk)
     group.delete()
+    bump_auth_version()                        # cascade deletes skip m2m_changed
     return Response(
         {"message": "Group deleted successfully."},
         status=200
@@ -350,7 +503,23 @@ def group_delete(request, pk):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])  # လိုအပ်သလို permission များပြောင်းလဲနိုင်ပါသည်
+@cached_auth_response                               # ETag / 304, no ORM on a warm hit
+@use_replica
 def permission_list_view(request):
     permissions_qs = Permission.objects.all()
     serializer = PermissionSerializer(permissions_qs, many=True)
     return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def hashing_metrics(request):
+    """Password-hashing pool: queue depth, rejections, hash/wait latency (ms)"""
+    return Response(get_hashing_pool().stats(), status=status.HTTP_200_OK)
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def request_metrics(request):
+    """Per-route latency histograms + sampled query / N+1 counts (RequestMetricsMiddleware)"""
+    return Response(request_metrics_store.snapshot(), status=status.HTTP_200_OK)
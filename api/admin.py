@@ -1,3 +1,17 @@
 from django.contrib import admin
 
+from .models import Categories, Product
+
 # Register your models here.
+@admin.register(Categories)
+class CategoriesAdmin(admin.ModelAdmin):
+    list_display    = ["plain_name", "slug", "updated_at"]
+    search_fields   = ["plain_name", "slug"]
+    readonly_fields = ["plain_name", "slug", "short_description", "created_at", "updated_at"]
+
+
+@admin.register(Product)
+class ProductAdmin(admin.ModelAdmin):
+    list_display  = ["name", "category", "price", "is_active", "updated_at"]
+    list_filter   = ["is_active", "category"]
+    search_fields = ["name"]
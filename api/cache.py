@@ -0,0 +1,32 @@
+# api/cache.py
+from django.db.models import Count, Max
+
+from .models import Categories
+
+# Category responses are validated (and their bodies cached) by what is in
+# the table, so every worker derives the same ETag / Last-Modified without
+# a shared counter:
+#     list    newest updated_at + number of rows (a delete changes the count)
+#     detail  the row's updated_at
+# updated_at is auto_now; writes that skip save() set it themselves
+# (api/images.py).
+
+
+def _stamp(updated_at):
+    return int(updated_at.timestamp() * 1_000_000)     # µs, as stored
+
+
+def category_list_info(**kwargs):
+    """(version, modified) of the whole catalog — one aggregate query"""
+    row = Categories.objects.aggregate(newest=Max("updated_at"), count=Count("pk"))
+    if row["newest"] is None:
+        return "0-0", 0
+    return f"{_stamp(row['newest'])}-{row['count']}", row["newest"].timestamp()
+
+
+def category_detail_info(**lookup):
+    """(version, modified) of one category; None when it doesn't exist (→ the view's 404)"""
+    updated_at = Categories.objects.filter(**lookup).values_list("updated_at", flat=True).first()
+    if updated_at is None:
+        return None
+    return _stamp(updated_at), updated_at.timestamp()
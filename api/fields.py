@@ -0,0 +1,28 @@
+# api/fields.py
+from django.db import models
+
+
+class RichTextField(models.TextField):
+    """
+    ckeditor's RichTextField, minus the import: ckeditor.fields pulls in the
+    widget, its configs and js_asset at model-load time, but only the admin's
+    forms ever use them.  The form field is imported on first formfield().
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.config_name               = kwargs.pop("config_name", "default")
+        self.extra_plugins             = kwargs.pop("extra_plugins", [])
+        self.external_plugin_resources = kwargs.pop("external_plugin_resources", [])
+        super().__init__(*args, **kwargs)
+
+    def formfield(self, **kwargs):
+        from ckeditor.fields import RichTextFormField
+
+        defaults = {
+            "form_class":                RichTextFormField,
+            "config_name":               self.config_name,
+            "extra_plugins":             self.extra_plugins,
+            "external_plugin_resources": self.external_plugin_resources,
+        }
+        defaults.update(kwargs)
+        return super().formfield(**defaults)
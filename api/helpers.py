@@ -0,0 +1,47 @@
+# api/helpers.py
+import html
+import re
+import unicodedata
+
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+_SPACES = re.compile(r"\s+")
+
+
+def html_to_text(value):
+    """CKEditor HTML → plain text (tags dropped, entities decoded, whitespace collapsed)"""
+    if not value:
+        return ""
+    return _SPACES.sub(" ", html.unescape(strip_tags(value))).strip()
+
+
+def tokenize(value):
+    """
+    Lower-cased words of `value`.  A word is a run of letters, marks and
+    digits, so Myanmar combining marks stay inside their word (\\w splits
+    on them).
+    """
+    value = unicodedata.normalize("NFKC", value or "").lower()
+    words, word = [], []
+    for ch in value:
+        if unicodedata.category(ch)[0] in "LMN":
+            word.append(ch)
+        elif word:
+            words.append("".join(word))
+            word = []
+    if word:
+        words.append("".join(word))
+    return words
+
+
+def slugify_text(value):
+    """
+    Like django's slugify(allow_unicode=True), but keeps combining marks so
+    Myanmar text survives ("မြန်မာ" → "မြန်မာ", not "မနမ").
+    """
+    return "-".join(tokenize(value))
+
+
+def short_text(value, length=200):
+    return Truncator(value or "").chars(length)
@@ -0,0 +1,143 @@
+# api/images.py
+"""
+Resized WebP / JPEG variants of Categories.image.
+
+After an upload, the work runs on a small local thread pool (Pillow drops
+the GIL while decoding, resizing and encoding), off the request thread.
+Variants are stored as
+
+    categories/variants/<sha256 of the original, 16 hex>-<width>w.<ext>
+
+so a URL always means the same bytes and can be cached forever. The
+same original uploaded twice reuses the files that already exist.
+
+    settings.IMAGE_VARIANTS = {
+        "WIDTHS":  [160, 480, 960],   # never upscaled
+        "FORMATS": ["webp", "jpeg"],
+        "QUALITY": 80,
+        "WORKERS": 2,                 # background threads
+        "ASYNC":   True,              # False → build inline (tests, scripts)
+    }
+"""
+import hashlib
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+VARIANT_DIR = "categories/variants"
+PIL_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+
+
+def _conf():
+    conf = getattr(settings, "IMAGE_VARIANTS", {})
+    return {
+        "WIDTHS":  conf.get("WIDTHS", [160, 480, 960]),
+        "FORMATS": conf.get("FORMATS", ["webp", "jpeg"]),
+        "QUALITY": conf.get("QUALITY", 80),
+        "WORKERS": conf.get("WORKERS", 2),
+        "ASYNC":   conf.get("ASYNC", True),
+    }
+
+
+def _encode(image, fmt, quality):
+    from PIL import Image
+
+    if fmt == "jpeg" and image.mode != "RGB":
+        # JPEG has no alpha: flatten onto white
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        rgba = image.convert("RGBA")
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        image = background
+    elif fmt == "webp" and image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+    buf = io.BytesIO()
+    image.save(buf, PIL_FORMATS[fmt], quality=quality, optimize=True)
+    return buf.getvalue()
+
+
+def build_variants(source_name, storage=None):
+    """
+    Build every width × format for one stored original (no DB access).
+    Returns {"source": name, "hash": h, "variants": [{"width", "height", "<fmt>": path}, ...]}.
+    """
+    from PIL import Image, ImageOps
+
+    storage = storage or default_storage
+    conf = _conf()
+    with storage.open(source_name, "rb") as fh:
+        data = fh.read()
+    digest = hashlib.sha256(data).hexdigest()[:16]
+
+    with Image.open(io.BytesIO(data)) as original:
+        original = ImageOps.exif_transpose(original)
+        original.load()
+
+    widths = [w for w in sorted(conf["WIDTHS"]) if w < original.width] or [original.width]
+    variants = []
+    for width in widths:
+        height = max(1, round(original.height * width / original.width))
+        resized = original.resize((width, height), Image.Resampling.LANCZOS)
+        entry = {"width": width, "height": height}
+        for fmt in conf["FORMATS"]:
+            name = f"{VARIANT_DIR}/{digest}-{width}w.{'jpg' if fmt == 'jpeg' else fmt}"
+            if not storage.exists(name):
+                storage.save(name, ContentFile(_encode(resized, fmt, conf["QUALITY"])))
+            entry[fmt] = name
+        variants.append(entry)
+    return {"source": source_name, "hash": digest, "variants": variants}
+
+
+def store_variants(category_id, result):
+    """Save a build result on the row — unless the image was replaced meanwhile."""
+    from django.utils import timezone
+
+    from .models import Categories
+
+    # update() skips auto_now: set updated_at so cached responses revalidate
+    return Categories.objects.filter(pk=category_id, image=result["source"]).update(
+        image_variants=result, updated_at=timezone.now(),
+    )
+
+
+def _job(category_id, source_name):
+    try:
+        store_variants(category_id, build_variants(source_name))
+    except Exception:
+        logger.exception("image variants failed for category %s (%s)", category_id, source_name)
+    finally:
+        if _conf()["ASYNC"]:
+            connections.close_all()            # this worker thread's connections
+
+
+# ---------- background pool ----------
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=_conf()["WORKERS"], thread_name_prefix="imgvariants",
+                )
+    return _pool
+
+
+def schedule_variants(category):
+    """Queue variant building for a freshly saved image (after the transaction commits)."""
+    category_id, source_name = category.pk, category.image.name
+    if not _conf()["ASYNC"]:
+        transaction.on_commit(lambda: _job(category_id, source_name))
+        return
+    transaction.on_commit(lambda: get_pool().submit(_job, category_id, source_name))
@@ -0,0 +1,81 @@
+import random
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+
+from api.models import Categories, Product
+from api.search import PRICE_BUCKETS, ProductIndex
+
+WORDS = (
+    "shoe running leather canvas bag travel shirt cotton denim jacket rain "
+    "watch steel phone case charger cable kitchen knife pan rice cooker"
+).split()
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Benchmark: in-memory product index vs ORM icontains (+ facet COUNTs)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=0,
+                            help="create N throwaway products (rolled back afterwards)")
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                if options["seed"]:
+                    self._seed(options["seed"])
+                self._bench(options["repeat"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, count):
+        rng = random.Random(42)
+        categories = [
+            Categories.objects.create(name=f"<p>Bench category {n}</p>") for n in range(8)
+        ]
+        Product.objects.bulk_create(
+            [
+                Product(
+                    category=rng.choice(categories),
+                    name=" ".join(rng.sample(WORDS, 3)).title(),
+                    description=" ".join(rng.choices(WORDS, k=12)),
+                    price=rng.randrange(1000, 900_000),
+                )
+                for _ in range(count)
+            ],
+            batch_size=1000,
+        )
+
+    def _orm(self, q):
+        qs = Product.objects.filter(is_active=True)
+        for word in q.split():
+            qs = qs.filter(Q(name__icontains=word) | Q(description__icontains=word))
+        hits = list(qs.order_by("name", "id").values_list("pk", flat=True)[:20])
+        categories = list(qs.values("category").annotate(n=Count("id")))
+        buckets = {
+            label: qs.filter(price__gte=low, **({"price__lt": high} if high else {})).count()
+            for label, low, high in PRICE_BUCKETS
+        }
+        return hits, categories, buckets
+
+    def _bench(self, repeat):
+        index = ProductIndex(sync_interval=3600)
+        started = timeit.default_timer()
+        count = index.rebuild()
+        self.stdout.write(f"indexed {count} products in {(timeit.default_timer() - started) * 1000:.1f} ms")
+
+        for q in ("shoe", "leather bag", "cotton", "zzz"):
+            orm = min(timeit.repeat(lambda: self._orm(q), number=1, repeat=repeat))
+            mem = min(timeit.repeat(lambda: index.search(q), number=1, repeat=repeat))
+            self.stdout.write(
+                f"q={q!r:<14} hits={index.search(q)['count']:<6} "
+                f"orm {orm * 1000:8.2f} ms   index {mem * 1000:8.2f} ms   x{orm / mem:6.1f}"
+            )
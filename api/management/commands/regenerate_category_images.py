@@ -0,0 +1,45 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+
+from api.images import _conf, build_variants, store_variants
+from api.models import Categories
+
+
+class Command(BaseCommand):
+    help = "Build resized WebP/JPEG variants for existing category images, in parallel."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true",
+                            help="rebuild every image (default: only ones without current variants)")
+        parser.add_argument("--workers", type=int, default=None,
+                            help="parallel builds (default: IMAGE_VARIANTS['WORKERS'])")
+
+    def handle(self, *args, **options):
+        rows = Categories.objects.exclude(image="").exclude(image__isnull=True).values_list(
+            "pk", "image", "image_variants",
+        )
+        todo = [
+            (pk, image) for pk, image, variants in rows
+            if options["all"] or (variants or {}).get("source") != image
+        ]
+        if not todo:
+            self.stdout.write("Nothing to do.")
+            return
+
+        workers = options["workers"] or _conf()["WORKERS"]
+        done = failed = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(build_variants, image): (pk, image) for pk, image in todo}
+            for future in as_completed(futures):
+                pk, image = futures[future]
+                try:
+                    store_variants(pk, future.result())       # DB writes stay on this thread
+                    done += 1
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(self.style.ERROR(f"{pk} ({image}): {exc}"))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Built variants for {done} image(s) with {workers} worker(s); {failed} failed."
+        ))
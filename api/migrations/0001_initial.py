@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:57
+
+import ckeditor.fields
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Categories',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', ckeditor.fields.RichTextField()),
+                ('image', models.ImageField(blank=True, null=True, upload_to='categories')),
+                ('description', ckeditor.fields.RichTextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('plain_name', models.CharField(default='', editable=False, max_length=255)),
+                ('slug', models.SlugField(allow_unicode=True, editable=False, max_length=255, unique=True)),
+                ('short_description', models.CharField(blank=True, default='', editable=False, max_length=255)),
+            ],
+            options={
+                'verbose_name_plural': 'Categories',
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:31
+
+import api.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_product'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='categories',
+            name='description',
+            field=api.fields.RichTextField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='categories',
+            name='name',
+            field=api.fields.RichTextField(),
+        ),
+    ]
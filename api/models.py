@@ -1,6 +1,8 @@
 import uuid
 from django.db import models
-from ckeditor.fields import RichTextField
+
+from .fields import RichTextField     # ckeditor's, imported lazily
+from .helpers import html_to_text, short_text, slugify_text
 # Create your models here.
 
 class Categories(models.Model):
@@ -9,4 +11,68 @@ class Categories(models.Model):
     image = models.ImageField(null=True,blank=True, upload_to='categories')
     description = RichTextField(null=True,blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    updated_at = models.DateTimeField(auto_now=True)          # changes on every edit (cache validation)
+
+    # ---------- precomputed from the HTML on save (listings never parse HTML) ----------
+    plain_name        = models.CharField(max_length=255, editable=False, default="")
+    slug              = models.SlugField(max_length=255, unique=True, allow_unicode=True, editable=False)
+    short_description = models.CharField(max_length=255, blank=True, editable=False, default="")
+
+    # resized WebP / JPEG copies of `image`, filled in by api/images.py
+    image_variants    = models.JSONField(default=dict, blank=True, editable=False)
+
+    PLAIN_SOURCE_FIELDS = {"name", "description"}
+    PLAIN_FIELDS        = ["plain_name", "slug", "short_description"]
+
+    class Meta:
+        verbose_name_plural = "Categories"
+
+    def __str__(self):
+        return self.plain_name or html_to_text(self.name)
+
+    def refresh_plain_fields(self):
+        """Recompute plain_name / slug / short_description from the HTML fields"""
+        self.plain_name        = html_to_text(self.name)[:255]
+        self.short_description = short_text(html_to_text(self.description))
+
+        slug = slugify_text(self.plain_name)[:200] or "category"
+        if Categories.objects.filter(slug=slug).exclude(pk=self.pk).exists():
+            slug = f"{slug}-{self.id.hex[:8]}"
+        self.slug = slug
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            self.refresh_plain_fields()
+        elif self.PLAIN_SOURCE_FIELDS.intersection(update_fields):
+            self.refresh_plain_fields()
+            kwargs["update_fields"] = {*update_fields, *self.PLAIN_FIELDS, "updated_at"}
+        super().save(*args, **kwargs)
+
+
+class Product(models.Model):
+    id          = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    category    = models.ForeignKey(Categories, on_delete=models.PROTECT, related_name="products")
+    name        = models.CharField(max_length=255)
+    description = models.TextField(blank=True, default="")
+    price       = models.DecimalField(max_digits=12, decimal_places=2)
+    is_active   = models.BooleanField(default=True)
+    created_at  = models.DateTimeField(auto_now_add=True)
+    updated_at  = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
+
+class ProductChange(models.Model):
+    """
+    Change log of the product search index (api/search.py): one row per
+    saved / deleted product or category, written in the same transaction
+    (api/signals.py).  Other processes re-read what the rows point at.
+    SQLite runs one write transaction at a time, so seq order is commit
+    order and "seq > last applied" never skips a late commit.
+    """
+    seq         = models.BigAutoField(primary_key=True)
+    product_id  = models.UUIDField(null=True)       # no FK: the row may be gone
+    category_id = models.UUIDField(null=True)
+    created_at  = models.DateTimeField(auto_now_add=True, db_index=True)
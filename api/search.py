@@ -0,0 +1,384 @@
+# api/search.py
+"""
+In-process inverted index over active products, with facet counts by
+category and price bucket (product_search).
+
+    postings   token → {doc number}   (plus category → docs, price bucket → docs)
+    vocabulary sorted tokens, so a query word matches every token it
+               prefixes ("sho" → shoe, shoes, shop) with two bisects
+
+A query is the AND of its words; facet filters are ORs inside a facet and
+ANDs across facets.  Facet counts are "disjunctive": each facet is counted
+with every filter applied except its own, so picking a category still
+shows the other categories' counts.
+
+Keeping it fresh:
+  * this process — post_save / post_delete on Product and Categories
+    update the index in place (api/signals.py)
+  * other processes — the same signals append to a change log
+    (models.ProductChange, in the writing transaction) and, once it
+    commits, set a new change token in the shared cache.  At most every
+    SYNC_INTERVAL seconds the index reads that token; when it moved, it
+    re-reads the products / categories named by the log rows past the
+    last one it applied (gone or inactive → removed).  Writes that
+    bypass save() call record_changes() themselves.
+  * rebuild_product_index sets a new generation in the shared cache →
+    every process reloads fully on its next check
+
+    settings.PRODUCT_SEARCH = {
+        "SYNC_INTERVAL":  2,        # seconds between change-token checks
+        "REPLAY_LIMIT":   5000,     # more pending log rows than this → full reload
+        "LOG_RETENTION":  86400,    # seconds change-log rows are kept
+    }
+"""
+import heapq
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .helpers import tokenize
+
+GEN_KEY     = "api:products-gen"
+CHANGES_KEY = "api:products-changed"            # time_ns() of the last committed change
+
+PRUNE_EVERY = 1000                              # change-log rows between prunes
+
+# (label, low, high) — low inclusive, high exclusive, None = open
+PRICE_BUCKETS = [
+    ("0-10000",        Decimal("0"),      Decimal("10000")),
+    ("10000-50000",    Decimal("10000"),  Decimal("50000")),
+    ("50000-100000",   Decimal("50000"),  Decimal("100000")),
+    ("100000-500000",  Decimal("100000"), Decimal("500000")),
+    ("500000+",        Decimal("500000"), None),
+]
+PRICE_BUCKET_LABELS = [label for label, _, _ in PRICE_BUCKETS]
+
+
+def price_bucket(price):
+    for label, low, high in PRICE_BUCKETS:
+        if price >= low and (high is None or price < high):
+            return label
+    return PRICE_BUCKETS[0][0]                  # negative prices (shouldn't happen)
+
+
+def bump_product_generation():
+    """Make every process reload its index fully (Django's cache is shared, see settings.CACHES)."""
+    generation = time.time_ns()
+    cache.set(GEN_KEY, generation, None)
+    return generation
+
+
+def _conf(name, default):
+    return getattr(settings, "PRODUCT_SEARCH", {}).get(name, default)
+
+
+def record_changes(products=(), categories=()):
+    """
+    Log changed product / category pks for the other processes' indexes.
+    Runs in the caller's transaction; the change token is set once it commits.
+    """
+    from .models import ProductChange
+
+    rows = ProductChange.objects.bulk_create(
+        [ProductChange(product_id=pk) for pk in products]
+        + [ProductChange(category_id=pk) for pk in categories]
+    )
+    transaction.on_commit(lambda: cache.set(CHANGES_KEY, time.time_ns(), None))
+    if any(row.seq and row.seq % PRUNE_EVERY == 0 for row in rows):
+        # an index that hasn't synced for this long reloads instead (ensure_fresh)
+        ProductChange.objects.filter(
+            created_at__lt=timezone.now() - timedelta(seconds=_conf("LOG_RETENTION", 86400))
+        ).delete()
+
+
+PRODUCT_FIELDS = ("pk", "name", "description", "price", "category_id")
+
+
+class ProductIndex:
+    def __init__(self, sync_interval=2, replay_limit=5000, log_retention=86400):
+        self.sync_interval = sync_interval
+        self.replay_limit  = replay_limit
+        self.log_retention = log_retention
+        self._lock = threading.RLock()
+        self._reset()
+        self.loaded        = False
+        self.generation    = None
+        self.changes_token = None               # CHANGES_KEY as of the last sync
+        self.last_seq      = 0                  # last change-log row applied
+        self.synced_at     = 0.0                # wall clock of the last sync
+        self._checked_at   = 0.0
+
+    def _reset(self):
+        # documents are numbered internally: sets of small ints hash and
+        # intersect far faster than sets of UUIDs
+        self._doc_ids     = {}                  # product pk → doc number
+        self._next_doc    = 0
+        self._docs        = {}                  # doc number → doc dict
+        self._postings    = defaultdict(set)    # token → {doc number}
+        self._by_category = defaultdict(set)    # category pk → {doc number}
+        self._by_bucket   = defaultdict(set)    # price bucket → {doc number}
+        self._vocabulary  = []
+        self._vocab_dirty = False
+        self._order       = []                  # every doc number by sort_key (lazy)
+        self._order_dirty = False
+        self._categories  = {}                  # category pk → plain_name
+
+    # ---------- documents ----------
+    def _doc(self, pk, name, description, price, category_id):
+        return {
+            "id":          pk,
+            "name":        name,
+            "price":       price,
+            "category_id": category_id,
+            "bucket":      price_bucket(price),
+            "sort_key":    (name.lower(), str(pk)),
+            "tokens":      frozenset(tokenize(name) + tokenize(description)),
+        }
+
+    def _add(self, doc):
+        self._remove(doc["id"])
+        n = self._next_doc
+        self._next_doc += 1
+        self._doc_ids[doc["id"]] = n
+        self._docs[n] = doc
+        for token in doc["tokens"]:
+            if token not in self._postings:
+                self._vocab_dirty = True
+            self._postings[token].add(n)
+        self._by_category[doc["category_id"]].add(n)
+        self._by_bucket[doc["bucket"]].add(n)
+        self._order_dirty = True
+
+    def _remove(self, pk):
+        n = self._doc_ids.pop(pk, None)
+        if n is None:
+            return
+        doc = self._docs.pop(n)
+        for token in doc["tokens"]:
+            ids = self._postings.get(token)
+            if ids is not None:
+                ids.discard(n)
+                if not ids:
+                    del self._postings[token]
+                    self._vocab_dirty = True
+        self._by_category[doc["category_id"]].discard(n)
+        self._by_bucket[doc["bucket"]].discard(n)
+        self._order_dirty = True
+
+    # ---------- loading ----------
+    def _rows(self, queryset):
+        return queryset.filter(is_active=True).values_list(*PRODUCT_FIELDS).iterator(chunk_size=2000)
+
+    def rebuild(self):
+        """Full load from the database."""
+        from .models import Categories, Product, ProductChange
+
+        with self._lock:
+            # tokens and log position first: anything committed after them is replayed
+            tokens = cache.get_many([GEN_KEY, CHANGES_KEY])
+            self.last_seq = ProductChange.objects.order_by("-seq").values_list("seq", flat=True).first() or 0
+            self.generation    = tokens.get(GEN_KEY)
+            self.changes_token = tokens.get(CHANGES_KEY)
+            self._reset()
+            self._categories = dict(Categories.objects.values_list("pk", "plain_name"))
+            for pk, name, description, price, category_id in self._rows(Product.objects.all()):
+                self._add(self._doc(pk, name, description, price, category_id))
+            self.synced_at   = time.time()
+            self.loaded      = True
+            self._checked_at = time.monotonic()
+        return len(self._docs)
+
+    def _replay(self):
+        """Apply other processes' changes: the change-log rows past last_seq."""
+        from .models import Categories, Product, ProductChange
+
+        rows = list(
+            ProductChange.objects.filter(seq__gt=self.last_seq).order_by("seq")
+            .values_list("seq", "product_id", "category_id")[:self.replay_limit + 1]
+        )
+        if len(rows) > self.replay_limit:
+            self.rebuild()
+            return
+        if not rows:
+            self.synced_at = time.time()
+            return
+
+        product_ids  = {product_id for _, product_id, _ in rows if product_id}
+        category_ids = {category_id for _, _, category_id in rows if category_id}
+        if product_ids:
+            found = {
+                pk: (is_active, row) for pk, is_active, *row in Product.objects.filter(pk__in=product_ids)
+                .values_list("pk", "is_active", "name", "description", "price", "category_id")
+            }
+            for pk in product_ids:
+                is_active, row = found.get(pk, (False, None))
+                if is_active:
+                    self._add(self._doc(pk, *row))
+                else:
+                    self._remove(pk)
+        if category_ids:
+            names = dict(Categories.objects.filter(pk__in=category_ids).values_list("pk", "plain_name"))
+            for pk in category_ids:
+                if pk in names:
+                    self._categories[pk] = names[pk]
+                else:
+                    self._categories.pop(pk, None)
+        self.last_seq  = rows[-1][0]
+        self.synced_at = time.time()
+
+    def ensure_fresh(self, force=False):
+        now = time.monotonic()
+        if self.loaded and not force and now - self._checked_at < self.sync_interval:
+            return
+        with self._lock:
+            if not self.loaded:
+                self.rebuild()
+                return
+            self._checked_at = now
+            tokens = cache.get_many([GEN_KEY, CHANGES_KEY])
+            generation = tokens.get(GEN_KEY)
+            if generation is not None and generation != self.generation:
+                self.rebuild()
+            elif tokens.get(CHANGES_KEY) == self.changes_token:
+                self.synced_at = time.time()    # nothing committed since the last check
+            elif time.time() - self.synced_at > self.log_retention / 2:
+                self.rebuild()                  # the rows it missed may have been pruned
+            else:
+                self.changes_token = tokens.get(CHANGES_KEY)
+                self._replay()
+
+    # ---------- signal hooks (this process) ----------
+    # applied in place straight away; the change token they set brings the
+    # same rows back on the next check, already indexed
+
+    def upsert(self, product):
+        with self._lock:
+            if self.loaded:
+                if product.is_active:
+                    self._add(self._doc(
+                        product.pk, product.name, product.description,
+                        product.price, product.category_id,
+                    ))
+                else:
+                    self._remove(product.pk)
+
+    def remove(self, pk):
+        with self._lock:
+            if self.loaded:
+                self._remove(pk)
+
+    def set_category(self, pk, plain_name):
+        with self._lock:
+            if self.loaded:
+                self._categories[pk] = plain_name
+
+    def drop_category(self, pk):
+        with self._lock:
+            self._categories.pop(pk, None)
+
+    # ---------- querying ----------
+    def _matching(self, word):
+        """ids of docs with a token starting with `word`"""
+        if self._vocab_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocab_dirty = False
+        vocab = self._vocabulary
+        i = bisect_left(vocab, word)
+        sets = []
+        while i < len(vocab) and vocab[i].startswith(word):
+            sets.append(self._postings[vocab[i]])
+            i += 1
+        return set().union(*sets)
+
+    def _facet_ids(self, table, keys):
+        return set().union(*(table.get(key, ()) for key in keys))
+
+    def _page(self, hits, offset, limit):
+        """hits ordered by (name, id), only as far as the requested page"""
+        want = offset + limit
+        if len(hits) * 8 < len(self._docs):
+            return heapq.nsmallest(want, hits, key=lambda n: self._docs[n]["sort_key"])[offset:]
+        # dense result: walk the global order instead of sorting the hits
+        if self._order_dirty:
+            self._order = sorted(self._docs, key=lambda n: self._docs[n]["sort_key"])
+            self._order_dirty = False
+        page = []
+        for n in self._order:
+            if n in hits:
+                page.append(n)
+                if len(page) == want:
+                    break
+        return page[offset:]
+
+    def search(self, q="", categories=(), buckets=(), offset=0, limit=20):
+        """
+        → {"count", "results": [doc, ...], "facets": {"category": [...], "price": [...]}}
+        categories / buckets: iterables of category pks / PRICE_BUCKETS labels
+        """
+        self.ensure_fresh()
+        with self._lock:
+            matched = None                              # None = every doc
+            for word in sorted(tokenize(q), key=len, reverse=True):
+                ids = self._matching(word)
+                matched = ids if matched is None else matched & ids
+                if not matched:
+                    break
+            if matched is None:
+                matched = set(self._docs)
+
+            # disjunctive facets: each facet is counted without its own filter
+            in_category = matched & self._facet_ids(self._by_category, categories) if categories else matched
+            in_bucket   = matched & self._facet_ids(self._by_bucket, buckets) if buckets else matched
+            hits = in_category & in_bucket if buckets else in_category
+
+            docs = self._docs
+            category_counts = {pk: len(in_bucket & ids) for pk, ids in self._by_category.items()}
+            bucket_counts   = {label: len(in_category & self._by_bucket.get(label, set()))
+                               for label in PRICE_BUCKET_LABELS}
+
+            return {
+                "count":   len(hits),
+                "results": [
+                    dict(docs[n], category_name=self._categories.get(docs[n]["category_id"], ""))
+                    for n in self._page(hits, offset, limit)
+                ],
+                "facets": {
+                    "category": [
+                        {"id": pk, "name": self._categories.get(pk, ""), "count": n}
+                        for pk, n in sorted(category_counts.items(), key=lambda kv: (-kv[1], str(kv[0])))
+                        if n
+                    ],
+                    "price": [
+                        {"bucket": label, "count": bucket_counts[label]}
+                        for label in PRICE_BUCKET_LABELS
+                    ],
+                },
+            }
+
+    def __len__(self):
+        return len(self._docs)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = ProductIndex(
+                    sync_interval=_conf("SYNC_INTERVAL", 2),
+                    replay_limit=_conf("REPLAY_LIMIT", 5000),
+                    log_retention=_conf("LOG_RETENTION", 86400),
+                )
+    return _index
@@ -0,0 +1,68 @@
+# api/serializers.py
+from django.core.files.storage import default_storage
+from rest_framework import serializers
+
+from accounts.helpers import mmt_fast as mmt  # ✅ Myanmar time formatter
+from .images import PIL_FORMATS as IMAGE_FORMATS
+from .models import Categories
+
+
+class CategoryListSerializer(serializers.ModelSerializer):
+    """Listing — plain-text fields only, no HTML"""
+    name       = serializers.CharField(source="plain_name")
+    image      = serializers.SerializerMethodField()
+    images     = serializers.SerializerMethodField()
+    updated_at = serializers.SerializerMethodField()
+
+    class Meta:
+        model  = Categories
+        fields = ["id", "name", "slug", "short_description", "image", "images", "updated_at"]
+
+    def _url(self, url):
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+    def get_image(self, obj):
+        return self._url(obj.image.url) if obj.image else None
+
+    def get_images(self, obj):
+        """resized variants, smallest first: [{"width", "height", "webp", "jpeg"}] ([] until built)"""
+        if not obj.image:
+            return []
+        variants = obj.image_variants or {}
+        if variants.get("source") != obj.image.name:
+            return []                                   # still being built
+        return [
+            {
+                key: (self._url(default_storage.url(value)) if key in IMAGE_FORMATS else value)
+                for key, value in variant.items()
+            }
+            for variant in variants.get("variants", [])
+        ]
+
+    def get_updated_at(self, obj):
+        return mmt(obj.updated_at)
+
+
+class CategoryDetailSerializer(CategoryListSerializer):
+    """Detail — plain fields plus the original CKEditor HTML"""
+    name_html   = serializers.CharField(source="name")
+    description = serializers.CharField(allow_null=True)
+    created_at  = serializers.SerializerMethodField()
+
+    class Meta(CategoryListSerializer.Meta):
+        fields = CategoryListSerializer.Meta.fields + ["name_html", "description", "created_at"]
+
+    def get_created_at(self, obj):
+        return mmt(obj.created_at)
+
+
+class ProductSearchSerializer(serializers.Serializer):
+    """Search hits come from the in-memory index (dicts), not model instances"""
+    id       = serializers.UUIDField()
+    name     = serializers.CharField()
+    price    = serializers.DecimalField(max_digits=12, decimal_places=2)
+    category = serializers.SerializerMethodField()
+
+    def get_category(self, doc):
+        return {"id": doc["category_id"], "name": doc["category_name"]}
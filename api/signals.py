@@ -0,0 +1,44 @@
+# api/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .images import schedule_variants
+from .models import Categories, Product
+from .search import get_index, record_changes
+
+
+@receiver(post_save, sender=Categories, dispatch_uid="api.category_saved")
+def category_saved(sender, instance, **kwargs):
+    built_for = (instance.image_variants or {}).get("source")
+    if instance.image and built_for != instance.image.name:
+        schedule_variants(instance)            # new / replaced image → background resize
+    elif not instance.image and built_for:
+        Categories.objects.filter(pk=instance.pk).update(image_variants={})
+        instance.image_variants = {}
+    plain_name = instance.plain_name
+    record_changes(categories=[instance.pk])
+    transaction.on_commit(lambda: get_index().set_category(instance.pk, plain_name))
+
+
+@receiver(post_delete, sender=Categories, dispatch_uid="api.category_deleted")
+def category_deleted(sender, instance, **kwargs):
+    pk = instance.pk
+    record_changes(categories=[pk])
+    transaction.on_commit(lambda: get_index().drop_category(pk))
+
+
+# ---------- product search index (api/search.py) ----------
+# logged in the write's transaction for the other processes; this process's
+# index is updated once the write commits
+@receiver(post_save, sender=Product, dispatch_uid="api.product_saved")
+def product_saved(sender, instance, **kwargs):
+    record_changes(products=[instance.pk])
+    transaction.on_commit(lambda: get_index().upsert(instance))
+
+
+@receiver(post_delete, sender=Product, dispatch_uid="api.product_deleted")
+def product_deleted(sender, instance, **kwargs):
+    pk = instance.pk
+    record_changes(products=[pk])
+    transaction.on_commit(lambda: get_index().remove(pk))
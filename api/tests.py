@@ -1,3 +1,360 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.test import APITestCase
+
+from . import images, search
+from .helpers import html_to_text, slugify_text
+from .models import Categories, Product, ProductChange
 
 # Create your tests here.
+
+
+class CategoryModelTests(TestCase):
+    def test_plain_fields_on_save(self):
+        category = Categories.objects.create(
+            name="<p><strong>Men&#39;s</strong> Shoes</p>",
+            description="<p>" + "Leather &amp; canvas. " * 20 + "</p>",
+        )
+        self.assertEqual(category.plain_name, "Men's Shoes")
+        self.assertEqual(category.slug, "men-s-shoes")
+        self.assertTrue(category.short_description.startswith("Leather & canvas."))
+        self.assertLessEqual(len(category.short_description), 200)
+
+    def test_myanmar_slug_and_duplicates(self):
+        first  = Categories.objects.create(name="<p>မြန်မာ အစားအစာ</p>")
+        second = Categories.objects.create(name="<p>မြန်မာ  အစားအစာ</p>")
+        self.assertEqual(first.slug, "မြန်မာ-အစားအစာ")
+        self.assertEqual(second.slug, f"{first.slug}-{second.id.hex[:8]}")
+
+    def test_updated_at_changes_on_edit(self):
+        category = Categories.objects.create(name="<p>Bags</p>")
+        Categories.objects.filter(pk=category.pk).update(updated_at=timezone.now() - timedelta(days=1))
+        category.refresh_from_db()
+        before = category.updated_at
+
+        category.name = "<p>Hand bags</p>"
+        category.save(update_fields=["name"])
+        category.refresh_from_db()
+        self.assertGreater(category.updated_at, before)
+        self.assertEqual(category.plain_name, "Hand bags")
+
+    def test_rich_text_form_field(self):
+        # api.fields.RichTextField imports ckeditor only here, but hands out the same widget
+        from ckeditor.widgets import CKEditorWidget
+
+        field = Categories._meta.get_field("description").formfield()
+        self.assertIsInstance(field.widget, CKEditorWidget)
+        self.assertEqual(field.widget.config_name, "default")
+        self.assertFalse(field.required)
+
+    def test_helpers(self):
+        self.assertEqual(html_to_text("<p>a</p>\n<p>b &amp; c</p>"), "a b & c")
+        self.assertEqual(slugify_text("  Hello,  World!  "), "hello-world")
+
+
+class CategoryAPITests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.shoes = Categories.objects.create(name="<p>Shoes</p>", description="<p>All <em>shoes</em></p>")
+        self.bags  = Categories.objects.create(name="<p>Bags</p>")
+
+    def test_list_is_plain_text(self):
+        res = self.client.get(reverse("category-list"))
+        self.assertEqual(res.status_code, 200)
+        rows = res.data["results"]["categories"]
+        self.assertEqual([r["name"] for r in rows], ["Bags", "Shoes"])
+        self.assertEqual(rows[1]["short_description"], "All shoes")
+
+    def test_detail_by_id_and_slug(self):
+        by_id   = self.client.get(reverse("category-detail", args=[self.shoes.pk]))
+        by_slug = self.client.get(reverse("category-detail-slug", args=["shoes"]))
+        self.assertEqual(by_id.data, by_slug.data)
+        self.assertEqual(by_id.data["detail"]["name_html"], "<p>Shoes</p>")
+        self.assertEqual(self.client.get(reverse("category-detail-slug", args=["nope"])).status_code, 404)
+
+    def test_warm_list_is_cached_and_saves_invalidate(self):
+        url = reverse("category-list")
+        first = self.client.get(url)
+        with self.assertNumQueries(1):                  # the validator aggregate only
+            self.assertEqual(self.client.get(url).data, first.data)
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+
+        self.bags.name = "<p>Hand bags</p>"
+        self.bags.save()
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(res.status_code, 200)
+        self.assertIn("Hand bags", [r["name"] for r in res.data["results"]["categories"]])
+
+        self.shoes.delete()
+        res = self.client.get(url)
+        self.assertEqual(len(res.data["results"]["categories"]), 1)
+
+    def test_validators_come_from_the_rows(self):
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        Categories.objects.update(updated_at=an_hour_ago)
+        url = reverse("category-list")
+        first = self.client.get(url)
+        self.assertEqual(first["Last-Modified"], http_date(int(an_hour_ago.timestamp())))
+
+        # nothing per-process: a worker with an empty cache agrees
+        cache.clear()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]).status_code, 304)
+
+        # a delete doesn't move the newest updated_at, the row count changes the ETag
+        self.bags.delete()
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res["Last-Modified"], first["Last-Modified"])
+
+    def test_detail_validated_by_its_row(self):
+        Categories.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+        url = reverse("category-detail", args=[self.shoes.pk])
+        first = self.client.get(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]).status_code, 304)
+
+        # another category's edit leaves this one's validators alone
+        self.bags.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+
+        self.shoes.save()
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(res.status_code, 200)
+        self.assertNotIn("Last-Modified", res)          # changed this second
+
+        self.shoes.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 404)
+
+
+def png(width, height, mode="RGBA"):
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new(mode, (width, height), (200, 30, 30, 128)[: len(mode)]).save(buf, "PNG")
+    return SimpleUploadedFile("photo.png", buf.getvalue(), content_type="image/png")
+
+
+class CategoryImageTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        settings = override_settings(
+            MEDIA_ROOT=media,
+            IMAGE_VARIANTS={"WIDTHS": [160, 480, 960], "FORMATS": ["webp", "jpeg"], "ASYNC": False},
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def create(self, image):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Categories.objects.create(name="<p>Shoes</p>", image=image)
+
+    def test_variants_built_on_upload(self):
+        category = self.create(png(1200, 800))
+        category.refresh_from_db()
+        variants = category.image_variants
+        self.assertEqual(variants["source"], category.image.name)
+        self.assertEqual([v["width"] for v in variants["variants"]], [160, 480, 960])
+        self.assertEqual(variants["variants"][0]["height"], 107)
+        for variant in variants["variants"]:
+            for fmt in ("webp", "jpeg"):
+                self.assertTrue(default_storage.exists(variant[fmt]))
+                self.assertIn(variants["hash"], variant[fmt])
+
+    def test_never_upscales(self):
+        category = self.create(png(100, 50, mode="RGB"))
+        category.refresh_from_db()
+        self.assertEqual([v["width"] for v in category.image_variants["variants"]], [100])
+
+    def test_api_exposes_variant_urls(self):
+        category = self.create(png(600, 600))
+        res = self.client.get(reverse("category-detail", args=[category.pk]))
+        images_ = res.data["detail"]["images"]
+        self.assertEqual([v["width"] for v in images_], [160, 480])
+        self.assertTrue(images_[0]["webp"].startswith("http://testserver/media/categories/variants/"))
+
+        listed = self.client.get(reverse("category-list")).data["results"]["categories"][0]
+        self.assertEqual(listed["images"], images_)
+
+    def test_pool_matches_inline_build(self):
+        category = Categories.objects.create(name="<p>Bags</p>", image=png(500, 300))
+        inline = images.build_variants(category.image.name)
+        pooled = images.get_pool().submit(images.build_variants, category.image.name).result()
+        self.assertEqual(pooled, inline)
+
+    def test_regenerate_command(self):
+        # on_commit callbacks not run → no variants yet
+        category = Categories.objects.create(name="<p>Bags</p>", image=png(800, 400))
+        self.assertEqual(Categories.objects.get(pk=category.pk).image_variants, {})
+
+        out = io.StringIO()
+        call_command("regenerate_category_images", "--workers", "2", stdout=out)
+        self.assertIn("Built variants for 1 image(s)", out.getvalue())
+        variants = Categories.objects.get(pk=category.pk).image_variants
+        self.assertEqual([v["width"] for v in variants["variants"]], [160, 480])
+
+
+class ProductSearchTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.index = search.ProductIndex(sync_interval=0)
+        patcher = mock.patch.object(search, "_index", self.index)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.shoes = Categories.objects.create(name="<p>Shoes</p>")
+            self.bags  = Categories.objects.create(name="<p>Bags</p>")
+            self.items = {
+                name: Product.objects.create(category=category, name=name, price=Decimal(price), description=desc)
+                for name, category, price, desc in [
+                    ("Running Shoe",  self.shoes, "45000",  "light mesh"),
+                    ("Leather Shoe",  self.shoes, "120000", "brown leather"),
+                    ("Leather Bag",   self.bags,  "80000",  "travel bag"),
+                    ("Canvas Tote",   self.bags,  "9000",   "cotton canvas"),
+                    ("ဖိနပ် အနက်",     self.shoes, "15000",  "မြန်မာ ဖိနပ်"),
+                ]
+            }
+
+    def names(self, result):
+        return [doc["name"] for doc in result["results"]]
+
+    def test_keywords_prefix_and_and(self):
+        self.assertEqual(self.names(self.index.search("leath")), ["Leather Bag", "Leather Shoe"])
+        self.assertEqual(self.names(self.index.search("leather shoe")), ["Leather Shoe"])
+        self.assertEqual(self.names(self.index.search("cotton")), ["Canvas Tote"])
+        self.assertEqual(self.names(self.index.search("ဖိနပ်")), ["ဖိနပ် အနက်"])
+        self.assertEqual(self.index.search("nothing")["count"], 0)
+
+    def test_facets_are_disjunctive(self):
+        result = self.index.search("", categories=[self.shoes.pk], buckets=["10000-50000"])
+        self.assertEqual(self.names(result), ["Running Shoe", "ဖိနပ် အနက်"])
+        categories = {f["name"]: f["count"] for f in result["facets"]["category"]}
+        self.assertEqual(categories, {"Shoes": 2})                    # price filter applied
+        prices = {f["bucket"]: f["count"] for f in result["facets"]["price"]}
+        self.assertEqual(prices["100000-500000"], 1)                  # own filter not applied
+        self.assertEqual(prices["0-10000"], 0)
+
+    def test_warm_search_runs_no_sql(self):
+        self.index.sync_interval = 60
+        self.index.search("shoe")
+        with self.assertNumQueries(0):
+            self.index.search("leather", buckets=["50000-100000"])
+
+    def test_signals_keep_index_current(self):
+        product = self.items["Canvas Tote"]
+        with self.captureOnCommitCallbacks(execute=True):
+            product.name = "Canvas Backpack"
+            product.save()
+        self.assertEqual(self.names(self.index.search("backpack")), ["Canvas Backpack"])
+        self.assertEqual(self.index.search("tote")["count"], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            product.is_active = False
+            product.save()
+            self.items["Leather Bag"].delete()
+        self.assertEqual(self.index.search("")["count"], 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.shoes.name = "<p>Footwear</p>"
+            self.shoes.save()
+        self.assertEqual(self.index.search("running")["results"][0]["category_name"], "Footwear")
+
+    def other_process(self):
+        """signals fire as in another worker: its own index gets the in-place updates"""
+        return mock.patch.object(search, "_index", search.ProductIndex())
+
+    def test_changes_from_other_processes(self):
+        self.index.search("")
+        with self.other_process(), self.captureOnCommitCallbacks(execute=True):
+            trail = self.items["Running Shoe"]
+            trail.name = "Trail Runner"
+            trail.save()
+            self.items["Leather Bag"].delete()
+            self.items["Canvas Tote"].is_active = False
+            self.items["Canvas Tote"].save()
+            self.bags.name = "<p>Luggage</p>"
+            self.bags.save()
+        self.assertEqual(self.names(self.index.search("trail")), ["Trail Runner"])
+        self.assertEqual(self.index.search("bag")["count"], 0)
+        self.assertEqual(self.index.search("tote")["count"], 0)
+        self.assertEqual(self.index.search("")["count"], 3)
+
+        with self.other_process(), self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(category=self.bags, name="Duffel", price=Decimal("30000"))
+        self.assertEqual(self.index.search("duffel")["results"][0]["category_name"], "Luggage")
+
+    def test_writes_that_bypass_save_record_changes(self):
+        self.index.search("")
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.filter(pk=self.items["Canvas Tote"].pk).update(name="Canvas Backpack")
+            search.record_changes(products=[self.items["Canvas Tote"].pk])
+        self.assertEqual(self.names(self.index.search("backpack")), ["Canvas Backpack"])
+
+    def test_unchanged_tables_skip_the_sync(self):
+        self.index.search("")
+        with self.assertNumQueries(0):                  # the change token lives in the cache
+            self.index.search("shoe")
+
+    def test_replay_reads_only_the_changed_rows(self):
+        self.index.search("")
+        with self.other_process(), self.captureOnCommitCallbacks(execute=True):
+            for product in self.items.values():
+                product.price += 1
+                product.save()
+        with self.assertNumQueries(2):                  # log rows + the products they name
+            self.index.search("shoe")
+
+    def test_long_backlog_reloads_instead(self):
+        self.index.search("")
+        self.index.replay_limit = 2
+        with self.other_process(), self.captureOnCommitCallbacks(execute=True):
+            for product in self.items.values():
+                product.save()
+        with mock.patch.object(self.index, "rebuild", wraps=self.index.rebuild) as rebuild:
+            self.assertEqual(self.index.search("")["count"], 5)
+        rebuild.assert_called_once()
+        self.assertEqual(self.index.last_seq, ProductChange.objects.order_by("-seq")[0].seq)
+
+    def test_log_is_pruned(self):
+        old = timezone.now() - timedelta(days=2)
+        ProductChange.objects.update(created_at=old)
+        with mock.patch.object(search, "PRUNE_EVERY", 1):
+            search.record_changes(products=[self.items["Canvas Tote"].pk])
+        self.assertEqual(ProductChange.objects.count(), 1)
+
+    def test_rebuild_command_reloads_everyone(self):
+        self.index.search("")
+        # no save(), no record_changes(): only a full reload sees it
+        Product.objects.filter(pk=self.items["Canvas Tote"].pk).update(name="Renamed Tote")
+        self.assertEqual(self.index.search("renamed")["count"], 0)
+        call_command("rebuild_product_index", stdout=io.StringIO())
+        self.assertEqual(self.names(self.index.search("renamed")), ["Renamed Tote"])
+
+    def test_endpoint(self):
+        res = self.client.get(reverse("product-search"), {"q": "shoe", "page_size": 1})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["count"], 2)
+        self.assertEqual(res.data["results"][0]["name"], "Leather Shoe")
+        self.assertEqual(res.data["results"][0]["price"], "120000.00")
+        self.assertEqual(res.data["results"][0]["category"]["name"], "Shoes")
+        self.assertIn("page=2", res.data["next"])
+        self.assertEqual(len(res.data["facets"]["price"]), len(search.PRICE_BUCKETS))
+
+        self.assertEqual(self.client.get(reverse("product-search"), {"price": "cheap"}).status_code, 400)
+        self.assertEqual(self.client.get(reverse("product-search"), {"category": "x"}).status_code, 400)
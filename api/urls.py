@@ -1,5 +1,11 @@
 from django.urls import path
 
+from .views import category_detail, category_detail_by_slug, category_list, product_search
+
 urlpatterns = [
-    
-]
\ No newline at end of file
+    path('categories/', category_list, name='category-list'),
+    path('categories/<uuid:pk>/', category_detail, name='category-detail'),
+    path('categories/<str:slug>/', category_detail_by_slug, name='category-detail-slug'),
+
+    path('products/search/', product_search, name='product-search'),
+]
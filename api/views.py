@@ -1,3 +1,120 @@
-from django.shortcuts import render
+# api/views.py
+import uuid
 
-# Create your views here.
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.permissions import AllowAny
+from rest_framework.exceptions import ParseError
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from accounts.response_cache import versioned_response
+from .cache import category_detail_info, category_list_info
+from .models import Categories
+from .search import PRICE_BUCKET_LABELS, get_index
+from .serializers import CategoryDetailSerializer, CategoryListSerializer, ProductSearchSerializer
+
+# ETag / Last-Modified / 304 + cached body, validated against the rows themselves
+cached_category_list   = versioned_response(category_list_info, "api:categories")
+cached_category_detail = versioned_response(category_detail_info, "api:category")
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+@cached_category_list
+def category_list(request):
+    queryset = Categories.objects.only(
+        "id", "plain_name", "slug", "short_description", "image", "image_variants", "updated_at",
+    ).order_by("plain_name", "id")
+
+    # 🔍 search on the plain-text name
+    q = request.query_params.get("search")
+    if q:
+        queryset = queryset.filter(plain_name__icontains=q)
+
+    # 📄 pagination
+    paginator = PageNumberPagination()
+    paginator.page_size = 20
+    paginator.page_size_query_param = "page_size"
+    paginator.max_page_size = 100
+    page = paginator.paginate_queryset(queryset, request)
+
+    serializer = CategoryListSerializer(page, many=True, context={"request": request})
+    return paginator.get_paginated_response({
+        "message": "Category list fetched successfully.",
+        "categories": serializer.data
+    })
+
+
+def _category_detail(request, **lookup):
+    category = get_object_or_404(Categories, **lookup)
+    serializer = CategoryDetailSerializer(category, context={"request": request})
+    return Response({
+        "message": "Category detail fetched successfully.",
+        "detail": serializer.data
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+@cached_category_detail
+def category_detail(request, pk):
+    return _category_detail(request, pk=pk)
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+@cached_category_detail
+def category_detail_by_slug(request, slug):
+    return _category_detail(request, slug=slug)
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def product_search(request):
+    """
+    Keyword + facet search served from the in-memory index (api/search.py):
+
+        ?q=running shoes        every word must match (prefix match)
+        ?category=<uuid>        repeatable, OR-ed
+        ?price=10000-50000      repeatable, OR-ed (see PRICE_BUCKETS)
+        ?page=2&page_size=20
+    """
+    params = request.query_params
+    try:
+        categories = [uuid.UUID(value) for value in params.getlist("category")]
+    except ValueError:
+        raise ParseError("category must be a category id (UUID)")
+    buckets = params.getlist("price")
+    unknown = set(buckets) - set(PRICE_BUCKET_LABELS)
+    if unknown:
+        raise ParseError(f"price must be one of {', '.join(PRICE_BUCKET_LABELS)}")
+
+    try:
+        page      = max(1, int(params.get("page", 1)))
+        page_size = min(100, max(1, int(params.get("page_size", 20))))
+    except ValueError:
+        raise ParseError("page and page_size must be integers")
+
+    result = get_index().search(
+        params.get("q", ""), categories=categories, buckets=buckets,
+        offset=(page - 1) * page_size, limit=page_size,
+    )
+
+    url = request.build_absolute_uri()
+    next_link = previous_link = None
+    if page * page_size < result["count"]:
+        next_link = replace_query_param(url, "page", page + 1)
+    if page > 1:
+        previous_link = remove_query_param(url, "page") if page == 2 else replace_query_param(url, "page", page - 1)
+
+    return Response({
+        "message":  "Product search results.",
+        "count":    result["count"],
+        "next":     next_link,
+        "previous": previous_link,
+        "results":  ProductSearchSerializer(result["results"], many=True).data,
+        "facets":   result["facets"],
+    }, status=status.HTTP_200_OK)
@@ -0,0 +1,15 @@
+# ecommerce_Api/apps.py
+from django.apps import AppConfig
+
+
+class SimpleJWTConfig(AppConfig):
+    """
+    rest_framework_simplejwt is installed for its translations only.  Its
+    models.py holds TokenUser (no tables) and imports simplejwt's settings,
+    which import django.test (+ unittest) — skip it at startup; the JWT
+    stack loads with the first authenticated request instead.
+    """
+    name = 'rest_framework_simplejwt'
+
+    def import_models(self):
+        self.models = self.apps.all_models[self.label]
@@ -0,0 +1,311 @@
+# ecommerce_Api/middleware.py
+"""
+Per-request instrumentation.
+
+Every request: its latency goes into a per-route histogram (one
+perf_counter pair and a dict update).
+
+A sampled request (SAMPLE_RATE) additionally records:
+    db          SQL statements and their time, on every alias
+    duplicates  the same statement with the same params run again
+    N+1         one SQL shape run N_PLUS_ONE+ times (e.g. a per-row
+                get_all_permissions() in a list serializer)
+    serializer  time inside serializer.data (includes the queries it triggers)
+    hash        time waiting for password hashes (accounts/hashing.py)
+and returns them in a Server-Timing header plus one JSON log line on the
+"ecommerce_Api.requests" logger (WARNING when an N+1 is found).
+
+Histograms: RequestMetrics.snapshot(), served by /api/metrics/requests/.
+
+    settings.REQUEST_METRICS = {
+        "SAMPLE_RATE":   0.05,   # share of requests with full detail (0 → histograms only)
+        "N_PLUS_ONE":    5,
+        "SERVER_TIMING": True,
+    }
+"""
+import contextvars
+import json
+import logging
+import random
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger("ecommerce_Api.requests")
+
+BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]      # + overflow
+
+_current = contextvars.ContextVar("request_stats", default=None)
+
+
+def _conf():
+    conf = getattr(settings, "REQUEST_METRICS", {})
+    return {
+        "SAMPLE_RATE":   conf.get("SAMPLE_RATE", 0.05),
+        "N_PLUS_ONE":    conf.get("N_PLUS_ONE", 5),
+        "SERVER_TIMING": conf.get("SERVER_TIMING", True),
+    }
+
+
+class RequestStats:
+    def __init__(self):
+        self.queries = []                       # (sql template, params, seconds)
+        self.timings = {}                       # name → seconds
+        self.in_serializer = False
+
+    def add(self, name, seconds):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def timer(name):
+    """Add the block's wall time to `name` on the current sampled request (no-op otherwise)."""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.add(name, time.perf_counter() - started)
+
+
+# ---------- hooks ----------
+def _record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries.append((sql, params, time.perf_counter() - started))
+
+
+def _install_query_hook(connection, **kwargs):
+    # first, not last: connection.execute_wrapper() blocks pop() the last entry
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _record_query)
+
+
+def _install_serializer_hook():
+    # called on the first sampled request, not at startup: rest_framework.serializers
+    # (and the yaml / pygments probing in rest_framework.compat) stays off the boot path
+    from rest_framework.serializers import BaseSerializer
+
+    original = BaseSerializer.data.fget
+    if getattr(original, "instrumented", False):
+        return
+
+    def data(self):
+        stats = _current.get()
+        if stats is None or stats.in_serializer:
+            return original(self)
+        stats.in_serializer = True
+        started = time.perf_counter()
+        try:
+            return original(self)
+        finally:
+            stats.in_serializer = False
+            stats.add("serializer", time.perf_counter() - started)
+
+    data.instrumented = True
+    BaseSerializer.data = property(data)
+
+
+def _install_hooks():
+    """on this thread's connections (+ the serializer hook, once)"""
+    _install_serializer_hook()
+    for connection in connections.all():
+        _install_query_hook(connection)
+
+
+def analyze(queries, threshold):
+    """→ (duplicate count, [{"sql", "count"}] shapes run `threshold`+ times)"""
+    exact = Counter((sql, repr(params)) for sql, params, _ in queries)
+    shapes = Counter(sql for sql, _, _ in queries)
+    duplicates = sum(n - 1 for n in exact.values() if n > 1)
+    n_plus_one = [
+        {"sql": sql[:300], "count": n}
+        for sql, n in shapes.most_common() if n >= threshold
+    ]
+    return duplicates, n_plus_one
+
+
+# ---------- histograms ----------
+class RequestMetrics:
+    def __init__(self):
+        self._lock   = threading.Lock()
+        self._routes = {}
+
+    def observe(self, route, seconds, stats=None, n_plus_one=False):
+        ms = seconds * 1000
+        with self._lock:
+            entry = self._routes.get(route)
+            if entry is None:
+                entry = self._routes[route] = {
+                    "count": 0, "sum_ms": 0.0, "max_ms": 0.0,
+                    "buckets": [0] * (len(BUCKETS_MS) + 1),
+                    "sampled": 0, "queries": 0, "db_ms": 0.0, "n_plus_one": 0,
+                }
+            entry["count"]  += 1
+            entry["sum_ms"] += ms
+            entry["max_ms"]  = max(entry["max_ms"], ms)
+            entry["buckets"][bisect_left(BUCKETS_MS, ms)] += 1
+            if stats is not None:
+                entry["sampled"]    += 1
+                entry["queries"]    += len(stats.queries)
+                entry["db_ms"]      += sum(q[2] for q in stats.queries) * 1000
+                entry["n_plus_one"] += int(n_plus_one)
+
+    def _quantile(self, buckets, count, q):
+        """upper bound of the bucket holding the q-th request"""
+        rank, seen = q * count, 0
+        for bound, n in zip(BUCKETS_MS + [None], buckets):
+            seen += n
+            if seen >= rank:
+                return bound
+        return None
+
+    def snapshot(self):
+        labels = [f"le_{bound}" for bound in BUCKETS_MS] + ["overflow"]
+        with self._lock:
+            routes = {route: dict(entry, buckets=list(entry["buckets"]))
+                      for route, entry in self._routes.items()}
+        return {
+            "buckets_ms": BUCKETS_MS,
+            "routes": {
+                route: {
+                    "count":       e["count"],
+                    "avg_ms":      round(e["sum_ms"] / e["count"], 2),
+                    "max_ms":      round(e["max_ms"], 2),
+                    "p50_ms":      self._quantile(e["buckets"], e["count"], 0.50),
+                    "p95_ms":      self._quantile(e["buckets"], e["count"], 0.95),
+                    "p99_ms":      self._quantile(e["buckets"], e["count"], 0.99),
+                    "histogram":   dict(zip(labels, e["buckets"])),
+                    "sampled":     e["sampled"],
+                    "avg_queries": round(e["queries"] / e["sampled"], 2) if e["sampled"] else None,
+                    "avg_db_ms":   round(e["db_ms"] / e["sampled"], 2) if e["sampled"] else None,
+                    "n_plus_one":  e["n_plus_one"],
+                }
+                for route, e in sorted(routes.items())
+            },
+        }
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+metrics = RequestMetrics()
+
+
+# ---------- middleware ----------
+def _route(request):
+    match = getattr(request, "resolver_match", None)
+    return f"{request.method} /{match.route}" if match else f"{request.method} <unresolved>"
+
+
+def _server_timing(stats, total, duplicates, n_plus_one):
+    db_ms = sum(q[2] for q in stats.queries) * 1000
+    desc  = f"{len(stats.queries)} queries"
+    if duplicates:
+        desc += f", {duplicates} duplicate"
+    if n_plus_one:
+        desc += ", N+1"
+    parts = [f'db;dur={db_ms:.2f};desc="{desc}"']
+    for name in ("serializer", "hash"):
+        if name in stats.timings:
+            parts.append(f"{name};dur={stats.timings[name] * 1000:.2f}")
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+
+class RequestMetricsMiddleware:
+    # outermost: a sync-only middleware here would make ASGI wrap the whole
+    # stack in sync_to_async on every request
+    sync_capable  = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode   = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        conf = _conf()
+        self.sample_rate   = conf["SAMPLE_RATE"]
+        self.threshold     = conf["N_PLUS_ONE"]
+        self.server_timing = conf["SERVER_TIMING"]
+        connection_created.connect(_install_query_hook, dispatch_uid="request-metrics")
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        stats = token = None
+        if self._sampled():
+            _install_hooks()
+            stats = RequestStats()
+            token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            total = time.perf_counter() - started
+            if token is not None:
+                _current.reset(token)
+        return self._finish(request, response, total, stats)
+
+    async def __acall__(self, request):
+        # the stats travel in a contextvar, so sync_to_async code still
+        # records into them; its queries run on the thread-sensitive worker's
+        # connections, so the hooks go on those (one hop, sampled requests only)
+        stats = token = None
+        if self._sampled():
+            await sync_to_async(_install_hooks)()
+            stats = RequestStats()
+            token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            total = time.perf_counter() - started
+            if token is not None:
+                _current.reset(token)
+        return self._finish(request, response, total, stats)
+
+    def _sampled(self):
+        return bool(self.sample_rate and random.random() < self.sample_rate)
+
+    def _finish(self, request, response, total, stats):
+        if stats is None:
+            metrics.observe(_route(request), total)
+            return response
+
+        duplicates, n_plus_one = analyze(stats.queries, self.threshold)
+        route = _route(request)
+        metrics.observe(route, total, stats, bool(n_plus_one))
+        if self.server_timing:
+            response["Server-Timing"] = _server_timing(stats, total, duplicates, n_plus_one)
+
+        record = {
+            "route":         route,
+            "path":          request.path,
+            "status":        response.status_code,
+            "duration_ms":   round(total * 1000, 2),
+            "queries":       len(stats.queries),
+            "db_ms":         round(sum(q[2] for q in stats.queries) * 1000, 2),
+            "duplicates":    duplicates,
+            "n_plus_one":    n_plus_one,
+            "serializer_ms": round(stats.timings.get("serializer", 0.0) * 1000, 2),
+            "hash_ms":       round(stats.timings.get("hash", 0.0) * 1000, 2),
+        }
+        logger.log(logging.WARNING if n_plus_one else logging.INFO, json.dumps(record))
+        return response
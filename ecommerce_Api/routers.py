@@ -0,0 +1,88 @@
+# ecommerce_Api/routers.py
+"""
+Read-replica routing.
+
+Views wrapped in @use_replica (the read-only user / group / permission
+endpoints) send their ORM reads to the "replica" alias.  Everything else
+stays on "default": writes, authentication (it runs before the view), and
+any read made while "default" is inside a transaction, so a request always
+sees its own writes.
+
+With SQLite in WAL mode the replica is a second, query_only connection to
+the same file: readers never wait for the writer.  Point
+DATABASES["replica"] at a real replica when moving to a server database.
+
+The DatabaseCache table (settings.CACHES) lives in its own "cache"
+database: cache round trips stay out of the app's transactions, write lock
+and query counts, and are never served from a lagging replica.
+"""
+import contextvars
+from contextlib import contextmanager
+from functools import wraps
+from inspect import iscoroutinefunction
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA = "replica"
+CACHE   = "cache"
+CACHE_APP_LABEL = "django_cache"        # DatabaseCache's internal model
+
+_replica_reads = contextvars.ContextVar("replica_reads", default=False)
+
+
+@contextmanager
+def replica_reads():
+    """Route ORM reads in this block (and tasks / threads it starts) to the replica."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def use_replica(view):
+    """View decorator (sync or async) — put it under @api_view / @async_api."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            with replica_reads():
+                return await view(*args, **kwargs)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with replica_reads():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+def cache_db():
+    """alias holding the DatabaseCache table ("cache", or "default" without one)"""
+    return CACHE if CACHE in settings.DATABASES else DEFAULT_DB_ALIAS
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == CACHE_APP_LABEL:
+            return cache_db()
+        if (
+            _replica_reads.get()
+            and REPLICA in settings.DATABASES
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return REPLICA
+        return None                             # → default / the instance's db
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label == CACHE_APP_LABEL:
+            return cache_db()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True                             # same data on both aliases
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if app_label == CACHE_APP_LABEL:
+            return db == cache_db()            # createcachetable
+        return db == DEFAULT_DB_ALIAS
@@ -41,7 +41,7 @@ INSTALLED_APPS = [
     'api',
     'accounts',
     'rest_framework',
-    'rest_framework_simplejwt',
+    'ecommerce_Api.apps.SimpleJWTConfig',    # rest_framework_simplejwt, without the eager models import
     'corsheaders',
 
     'ckeditor',
@@ -50,8 +50,9 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = "accounts.User"
 
 AUTHENTICATION_BACKENDS = [
+    # covers plain usernames too; no ModelBackend fallback — it would hash
+    # on the request thread, outside accounts/hashing.py's pool
     "accounts.backends.UsernameEmailPhoneBackend",
-    "django.contrib.auth.backends.ModelBackend",
 ]
 
 CORS_ALLOWED_ORIGINS = [
@@ -63,7 +64,7 @@ CORS_ALLOWED_CREDENTIALS = True
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -88,9 +89,72 @@ SIMPLE_JWT = {
 
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+
+    # rotated refresh tokens are revoked through accounts/revocation.py
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.RevocableTokenRefreshSerializer',
+}
+
+TOKEN_REVOCATION = {
+    'SYNC_INTERVAL': 2,         # seconds between incremental DB syncs per process
+    'BLOOM_CAPACITY': 100_000,
+    'BLOOM_ERROR_RATE': 0.001,
+}
+
+# Django's cache holds state every worker process must agree on: the permission
+# cache + auth version (accounts/perms.py), cached responses and their
+# versions.  DatabaseCache is shared by every worker and needs no extra
+# service: its table lives in DATABASES['cache'] and is created by `migrate`
+# (accounts/migrations/0008_cache_table).  Its per-write cull check is one
+# COUNT, and culling drops expired rows first — every versioned key has a
+# TTL, so superseded versions age out.  Point it at Redis / Memcached once
+# the app runs on more than one host.  Per-process backends (LocMem / Dummy)
+# are refused at startup; the test runner swaps in a throwaway directory
+# (ecommerce_Api/test_runner.py).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+        'OPTIONS': {'MAX_ENTRIES': 50_000},
+    },
+}
+
+# JWT auth resolves users from a short-lived per-process cache (accounts/user_cache.py)
+USER_CACHE = {
+    'TTL': 30,              # seconds
+    'MAX_SIZE': 10_000,
+}
+
+# Seconds a user's resolved permission set lives in the shared cache
+# (entries are invalidated earlier by the auth version, see accounts/perms.py)
+PERMISSION_CACHE_TTL = 300
+
+# Seconds cached permission / group responses live (accounts/response_cache.py)
+RESPONSE_CACHE_TTL = 600
+
+# Password hashing runs on a bounded thread pool (accounts/hashing.py);
+# requests get a 503 once WORKERS + MAX_QUEUE hashes are in flight.
+PASSWORD_HASHING = {
+    'WORKERS': None,        # None → os.cpu_count()
+    'MAX_QUEUE': 32,
+    'TIMEOUT': 10,
+}
+
+# Bulk user uploads hash passwords on one process pool per worker, shared by
+# concurrent uploads and started on first use; smaller files hash in-process
+# (accounts/importers.py)
+USER_IMPORT = {
+    'PROCESSES': None,      # None → os.cpu_count()
+    'POOL_MIN_ROWS': 500,
+}
+
+# last_login is buffered in memory and bulk-written (accounts/last_login.py)
+LAST_LOGIN = {
+    'FLUSH_INTERVAL': 5,    # seconds
+    'BATCH_SIZE': 100,
 }
 
 MIDDLEWARE = [
+    'ecommerce_Api.middleware.RequestMetricsMiddleware',     # outermost: times the whole stack
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -125,13 +189,65 @@ WSGI_APPLICATION = 'ecommerce_Api.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite tuned for concurrent requests:
+#   WAL              readers and the writer don't block each other; persistent,
+#                    so set once by accounts/migrations/0007_sqlite_wal.py
+#                    (run `manage.py migrate`), not per connection
+#   synchronous      NORMAL is durable enough with WAL (fsync at checkpoints)
+#   IMMEDIATE        transactions take the write lock at BEGIN, so two
+#                    writers queue on `timeout` instead of one failing with
+#                    "database is locked" when its read lock can't upgrade
+#   timeout          seconds to wait for the lock
+SQLITE_PRAGMAS = (
+    'PRAGMA synchronous=NORMAL;'
+    'PRAGMA temp_store=MEMORY;'
+    'PRAGMA cache_size=-20000;'             # ~20 MB page cache per connection
+    'PRAGMA mmap_size=134217728;'           # 128 MB
+)
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'CONN_MAX_AGE': 600,                # reuse connections across requests
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': SQLITE_PRAGMAS,
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+    },
+    # read-only endpoints (ecommerce_Api/routers.py); same file, read-only
+    # connection — swap NAME / ENGINE for a real replica
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': SQLITE_PRAGMAS + 'PRAGMA query_only=ON;',
+            'timeout': 20,
+        },
+        'TEST': {'MIRROR': 'default'},
+    },
+    # the DatabaseCache table (CACHES, ecommerce_Api/routers.py): a file of
+    # its own, so cache writes never wait on the app's write lock
+    'cache': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'cache.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': SQLITE_PRAGMAS,
+            'timeout': 20,
+        },
+    },
 }
 
+DATABASE_ROUTERS = ['ecommerce_Api.routers.ReplicaRouter']
+
+TEST_RUNNER = 'ecommerce_Api.test_runner.TestRunner'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -170,6 +286,62 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Uploaded files (Categories.image + generated variants)
+MEDIA_URL  = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Resized WebP/JPEG variants of Categories.image (api/images.py), built on a
+# background thread pool after upload.  ASYNC=False builds them inline.
+IMAGE_VARIANTS = {
+    "WIDTHS":  [160, 480, 960],
+    "FORMATS": ["webp", "jpeg"],
+    "QUALITY": 80,
+    "WORKERS": 2,
+    "ASYNC":   True,
+}
+
+# In-memory product search index (api/search.py)
+PRODUCT_SEARCH = {
+    "SYNC_INTERVAL": 2,          # seconds between checks for other processes' changes
+    "REPLAY_LIMIT":  5000,       # pending change-log rows before a full reload instead
+    "LOG_RETENTION": 86400,      # seconds change-log rows (api.ProductChange) are kept
+}
+
+# Per-request instrumentation (ecommerce_Api/middleware.py): latency
+# histograms per route for every request; SQL / N+1 / serializer / hashing
+# detail, Server-Timing header and a JSON log line for a sample
+REQUEST_METRICS = {
+    "SAMPLE_RATE":   0.05,
+    "N_PLUS_ONE":    5,         # same SQL shape this many times in one request
+    "SERVER_TIMING": True,
+}
+
+# Worker cold start (ecommerce_Api/startup.py, `manage.py profile_startup`).
+# Measured on the 1-CPU reference box, Python 3.11, .pyc cache warm:
+#   boot (django.setup + WSGI handler)  ≈ 225 ms median, 45 MB, 642 modules
+#   + URLconf (the first request)       ≈ 300 ms median, 52 MB, 802 modules
+# Time budgets leave ~2x for noisy CI hosts; the module lists don't.
+STARTUP_BUDGET = {
+    "BOOT_MS":      600,
+    "TOTAL_MS":     800,
+    "RSS_MB":       64,
+    "BOOT_MODULES": 680,
+    # the JWT stack (simplejwt's settings import django.test + unittest) and DRF's
+    # serializers load with the first request, not while the worker boots
+    "DEFERRED": [
+        "rest_framework_simplejwt.settings",
+        "django.test",
+        "rest_framework.serializers",
+    ],
+    # only loaded by the code that uses them: admin forms, phone validation, pooled imports
+    "ON_DEMAND": [
+        "ckeditor.fields",
+        "js_asset",
+        "phonenumbers",
+        "concurrent.futures.process",
+    ],
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
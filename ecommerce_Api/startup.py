@@ -0,0 +1,206 @@
+# ecommerce_Api/startup.py
+"""
+Worker cold-start profiling and budget (`manage.py profile_startup
+--check`).  The test suite only holds startup to the deterministic half:
+which modules load in which phase (check_budget(limits=False)); wall-clock
+and RSS limits depend on the host's load, so they're checked by the
+command (or the suite with STARTUP_BUDGET_CHECK=1).
+
+A probe runs in a fresh interpreter and times two phases:
+    boot   settings + django.setup() + the WSGI handler — what a worker
+           does before it accepts a connection
+    urls   the URLconf and every view module it imports — paid by the
+           worker's first request
+Every import is recorded with the same self / cumulative split as
+`python -X importtime`; a second, traced run (tracemalloc slows imports
+down, so its times are thrown away) adds the memory each import kept.
+
+    settings.STARTUP_BUDGET = {
+        "BOOT_MS":      600,        # boot, wall clock
+        "TOTAL_MS":     800,        # boot + urls
+        "RSS_MB":       64,         # peak RSS after urls
+        "BOOT_MODULES": 680,        # sys.modules after boot
+        "DEFERRED":     [...],      # not imported until the first request
+        "ON_DEMAND":    [...],      # not imported until something uses them
+    }
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+from django.apps import apps
+from django.conf import settings
+
+_MARKER = "startup-probe:"
+
+# runs in the child: argv = [marker] or [marker, "memory"] (tracemalloc on)
+_PROBE = r"""
+import json, os, resource, sys, time
+
+import _frozen_importlib as bootstrap
+
+trace = sys.argv[2:] == ["memory"]
+if trace:
+    import tracemalloc
+    tracemalloc.start()
+
+phase   = "boot"
+records = {}            # module → [phase, self s, cumulative s, self bytes, cumulative bytes]
+stack   = []            # [children's seconds, children's bytes] per import in progress
+load    = bootstrap._load_unlocked
+
+
+def traced():
+    return tracemalloc.get_traced_memory()[0] if trace else 0
+
+
+def timed_load(spec):
+    # _find_and_load → _load_unlocked(spec): one call per module actually executed
+    stack.append([0.0, 0])
+    started, before = time.perf_counter(), traced()
+    try:
+        return load(spec)
+    finally:
+        seconds, size = time.perf_counter() - started, traced() - before
+        children = stack.pop()
+        records[spec.name] = [phase, seconds - children[0], seconds, size - children[1], size]
+        if stack:
+            stack[-1][0] += seconds
+            stack[-1][1] += size
+
+
+def rss_mb():
+    # peak RSS; ru_maxrss survives exec, so on Linux it can report the parent's size
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+bootstrap._load_unlocked = timed_load
+started = time.perf_counter()
+
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+boot, boot_rss, boot_modules = time.perf_counter() - started, rss_mb(), len(sys.modules)
+
+phase = "urls"
+from django.urls import get_resolver
+get_resolver().url_patterns
+total = time.perf_counter() - started
+bootstrap._load_unlocked = load
+
+
+def stale(module):
+    # no usable .pyc → compiled from source on every start (read-only image / PYTHONDONTWRITEBYTECODE)
+    source, cached = getattr(module, "__file__", None), getattr(module, "__cached__", None)
+    if not source or not source.endswith(".py") or not cached:
+        return False
+    try:
+        return os.stat(cached).st_mtime < os.stat(source).st_mtime
+    except OSError:
+        return True
+
+
+print(sys.argv[1] + json.dumps({
+    "boot_ms":      boot * 1000,
+    "total_ms":     total * 1000,
+    "boot_rss_mb":  boot_rss,
+    "rss_mb":       rss_mb(),
+    "boot_modules": boot_modules,
+    "modules":      len(sys.modules),
+    "imports":      records,
+    "from_source":  sorted(name for name, module in list(sys.modules.items()) if stale(module)),
+}))
+"""
+
+
+def probe(memory=False):
+    """One cold start in a fresh interpreter → the probe's report (+ process_ms)."""
+    env = dict(os.environ)
+    env.setdefault("DJANGO_SETTINGS_MODULE", settings.SETTINGS_MODULE)
+    args = [sys.executable, "-c", _PROBE, _MARKER] + (["memory"] if memory else [])
+    started = time.perf_counter()
+    done = subprocess.run(args, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    lines = [line for line in done.stdout.splitlines() if line.startswith(_MARKER)]
+    if done.returncode or not lines:
+        raise RuntimeError(f"startup probe failed ({done.returncode}):\n{done.stderr[-3000:]}")
+    report = json.loads(lines[-1][len(_MARKER):])
+    report["process_ms"] = elapsed * 1000
+    report["imports"] = {
+        name: {"phase": phase, "self_ms": self_s * 1000, "cum_ms": cum_s * 1000,
+               "self_kb": self_b / 1024 if memory else None, "cum_kb": cum_b / 1024 if memory else None}
+        for name, (phase, self_s, cum_s, self_b, cum_b) in report["imports"].items()
+    }
+    return report
+
+
+def _owner(module, app_names):
+    """installed app the module belongs to (longest match), else its top-level package"""
+    best = None
+    for name in app_names:
+        if (module == name or module.startswith(name + ".")) and (best is None or len(name) > len(best)):
+            best = name
+    return best or module.split(".")[0]
+
+
+def profile(repeat=3, memory=True):
+    """
+    Median of `repeat` cold starts, per-module / per-app breakdown of the
+    median run, plus memory from one traced run.
+    """
+    runs   = sorted((probe() for _ in range(repeat)), key=lambda run: run["total_ms"])
+    report = runs[len(runs) // 2]
+    report["runs"] = [{key: run[key] for key in ("boot_ms", "total_ms", "rss_mb", "process_ms")}
+                      for run in runs]
+
+    if memory:
+        traced = probe(memory=True)["imports"]
+        for name, row in report["imports"].items():
+            if name in traced:
+                row["self_kb"], row["cum_kb"] = traced[name]["self_kb"], traced[name]["cum_kb"]
+
+    app_names = [config.name for config in apps.get_app_configs()]
+    groups = {}
+    for name, row in report["imports"].items():
+        group = groups.setdefault(_owner(name, app_names), {
+            "modules": 0, "boot_ms": 0.0, "urls_ms": 0.0, "memory_kb": 0.0,
+        })
+        group["modules"]           += 1
+        group[f"{row['phase']}_ms"] += row["self_ms"]
+        group["memory_kb"]         += row["self_kb"] or 0.0
+    report["groups"] = groups
+    return report
+
+
+def check_budget(report, budget=None, limits=True):
+    """
+    → list of human-readable violations of settings.STARTUP_BUDGET (empty =
+    within budget).  limits=False → only where modules load, not the
+    time / memory / module-count limits.
+    """
+    budget = getattr(settings, "STARTUP_BUDGET", {}) if budget is None else budget
+    problems = []
+    for key, label, value in (
+        ("BOOT_MS",      "boot",          report["boot_ms"]),
+        ("TOTAL_MS",     "boot + urls",   report["total_ms"]),
+        ("RSS_MB",       "peak RSS",      report["rss_mb"]),
+        ("BOOT_MODULES", "boot modules",  report["boot_modules"]),
+    ):
+        if limits and key in budget and value > budget[key]:
+            problems.append(f"{label}: {round(value, 1)} > budget {budget[key]}")
+
+    for key, phases, when in (("DEFERRED", {"boot"}, "at boot"),
+                              ("ON_DEMAND", {"boot", "urls"}, "by startup + URLconf")):
+        for name in budget.get(key, []):
+            if name in report["imports"] and report["imports"][name]["phase"] in phases:
+                problems.append(f"{name} imported {when} (listed in {key})")
+    return problems
@@ -0,0 +1,34 @@
+# ecommerce_Api/test_runner.py
+"""
+`manage.py test` with the default cache in a throwaway directory.
+
+Tests clear and fill the cache freely; they must never do that to the
+real one (settings.CACHES).  A file-based cache is still shared between
+connections — tests use `caches.create_connection("default")` as a second
+worker — and it runs no SQL, so the query-count assertions only see the
+app's own queries.  The DatabaseCache setup itself is covered by
+accounts.tests.DatabaseCacheTests.
+"""
+import shutil
+import tempfile
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._cache_dir = tempfile.mkdtemp(prefix="ecommerce-test-cache-")
+        self._caches = override_settings(CACHES={
+            "default": {
+                "BACKEND":  "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": self._cache_dir,
+            },
+        })
+        self._caches.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._caches.disable()
+        shutil.rmtree(self._cache_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)